@@ -1,10 +1,12 @@
 from pathlib import Path
 
 import pytest
+from django.core.cache import cache
 from django.core.management import call_command
 from django.test import Client
 from rest_framework.test import APIClient
 
+from legislative import metrics
 from legislative.models import Bill, Legislator, Vote, VoteResult
 
 
@@ -13,6 +15,27 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def nplusone_strict(settings):
+    """Fail any request that repeats a query shape (N+1) in every test."""
+    settings.NPLUSONE_MODE = "raise"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached responses are keyed by dataset version, which rolls back per test."""
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolated_output_dirs(settings, tmp_path, monkeypatch):
+    """Give each test an empty metrics store and its own metrics/profile dirs."""
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    settings.PROFILING_DIR = str(tmp_path / "profiles")
+    settings.LOAD_JOBS_DIR = str(tmp_path / "jobs")
+    monkeypatch.setattr(metrics, "store", metrics.MetricsStore())
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# Serve the async views; set DJANGO_ROOT_URLCONF=core.urls to keep the sync ones.
+os.environ.setdefault("DJANGO_ROOT_URLCONF", "core.asgi_urls")
 
 application = get_asgi_application()
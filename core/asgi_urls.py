@@ -0,0 +1,11 @@
+"""
+URL configuration for the ASGI deployment.
+
+Routes the same paths as ``core.urls`` to the async views.
+"""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("", include("legislative.async_urls")),
+]
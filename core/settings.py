@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .sqlite import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Keep first: its "total" covers every other middleware.
+    "legislative.middleware.ServerTimingMiddleware",
+    "legislative.middleware.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -49,13 +55,19 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # After AuthenticationMiddleware: on-demand profiling is staff-only.
+    "legislative.middleware.ProfilingMiddleware",
+    # Keep last: a cache hit short-circuits the view.
+    "legislative.middleware.PrecompressedResponseMiddleware",
 ]
 
-ROOT_URLCONF = "core.urls"
+# core/asgi.py switches this to "core.asgi_urls" (async views) under ASGI.
+ROOT_URLCONF = os.environ.get("DJANGO_ROOT_URLCONF", "core.urls")
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates reporting render time to ServerTimingMiddleware.
+        "BACKEND": "legislative.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -75,12 +87,33 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
-}
+# SQLITE_PROFILE selects the connection PRAGMAs (see core/sqlite.py):
+# "performance" (WAL, mmap, larger cache) or "default". Connections persist for
+# CONN_MAX_AGE seconds; request reads go to the "readonly" alias (see
+# legislative/routers.py) unless SQLITE_READ_ONLY_ALIAS=0. With
+# SQLITE_REPLICA_PATH set, that alias reads a copy of db.sqlite3 refreshed by
+# "sync_replica" (and after every load_data) instead of the primary file.
+
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "performance")
+SQLITE_READ_ONLY_ALIAS = os.environ.get("SQLITE_READ_ONLY_ALIAS", "1") == "1"
+SQLITE_REPLICA_PATH = os.environ.get("SQLITE_REPLICA_PATH", "")
+
+DATABASES = database_settings(
+    BASE_DIR / "db.sqlite3",
+    profile=SQLITE_PROFILE,
+    busy_timeout=float(os.environ.get("SQLITE_BUSY_TIMEOUT", "5")),
+    conn_max_age=int(os.environ.get("CONN_MAX_AGE", "600")),
+    read_only=SQLITE_READ_ONLY_ALIAS,
+    replica=SQLITE_REPLICA_PATH or None,
+)
+DATABASE_ROUTERS = (
+    ["legislative.routers.ReadOnlyRouter"] if SQLITE_READ_ONLY_ALIAS else []
+)
+# "load_data --shadow" keeps the database files it swaps between here and
+# turns db.sqlite3 into a symlink (see legislative/shadow.py).
+SQLITE_GENERATIONS_DIR = Path(
+    os.environ.get("SQLITE_GENERATIONS_DIR", BASE_DIR / "var" / "db")
+)
 
 
 # Password validation
@@ -132,5 +165,126 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Nested vote history in the detail endpoints (?votes_limit=&votes_offset=)
+VOTE_HISTORY_PAGE_SIZE = 100
+VOTE_HISTORY_MAX_PAGE_SIZE = 1000
+
+# Vote sessions with tallies (/api/votes/, /api/bills/{id}/votes/; ?limit=&offset=)
+VOTES_PAGE_SIZE = 100
+VOTES_MAX_PAGE_SIZE = 1000
+
+# Change feed (/api/changes/?since=&limit=&offset=): load_data keeps the
+# changes of the last CHANGE_LOG_VERSIONS dataset versions.
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_PAGE_SIZE = 5000
+CHANGE_LOG_VERSIONS = 100
+
+# Entries per leaderboard, ranked by load_data (legislative/leaderboards.py).
+LEADERBOARD_SIZE = 10
+
+# load_data renders the detail endpoints' default responses (the first
+# VOTE_HISTORY_PAGE_SIZE votes) in this many processes; see
+# legislative/documents.py. Reload after changing the page size.
+DETAIL_DOCUMENT_WORKERS = int(
+    os.environ.get("DETAIL_DOCUMENT_WORKERS", min(os.cpu_count() or 1, 8))
+)
+
+# Full-text search (/api/search/?q=&limit=&offset=)
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
 # CSV Data Path
 CSV_DATA_PATH = "csv_data/"
+
+# Pre-compressed responses: routes whose JSON is stored per dataset version in
+# Brotli, zstd and gzip. Use a shared cache backend (file-based,
+# Redis, ...) under PRECOMPRESSED_CACHE to share entries across workers.
+PRECOMPRESSED_URL_NAMES = [
+    "legislator-list",
+    "legislator-detail",
+    "bill-list",
+    "bill-detail",
+    "bill-breakdown",
+    "stats_by_party",
+    "vote-list",
+    "vote-detail",
+    "bill-votes",
+    "leaderboards",
+    "leaderboard",
+    "changes",
+]
+PRECOMPRESSED_CACHE = "default"
+PRECOMPRESSED_TIMEOUT = None
+
+# Background loads (POST /api/loads/, legislative/jobs.py): staff users or the
+# X-Load-Token header may queue one; progress files go to LOAD_JOBS_DIR.
+LOAD_JOBS_TOKEN = os.environ.get("LOAD_JOBS_TOKEN", "")
+LOAD_JOBS_DIR = os.environ.get("LOAD_JOBS_DIR", str(BASE_DIR / "var" / "jobs"))
+
+# Per-request instrumentation (ServerTimingMiddleware): send the breakdown as a
+# Server-Timing header; JSON lines go to the "legislative.performance" logger.
+SERVER_TIMING_HEADER = True
+
+# N+1 query detection (NPlusOneMiddleware): "off", "log" or "raise" when one
+# query shape runs NPLUSONE_THRESHOLD times in a request. Tests use "raise".
+NPLUSONE_MODE = os.environ.get("NPLUSONE_MODE", "log" if DEBUG else "off")
+NPLUSONE_THRESHOLD = 3
+
+# Prometheus metrics at /metrics. Each process writes its counters to
+# METRICS_DIR/<pid>-<start>.json (at most every METRICS_FLUSH_INTERVAL seconds,
+# and at exit) and a scrape merges them, so multi-worker servers and load_data are covered.
+# Files of exited processes are folded into METRICS_DIR/retired.json.
+METRICS_ENABLED = True
+METRICS_DIR = os.environ.get("METRICS_DIR", str(BASE_DIR / "var" / "metrics"))
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Database-free serving: with SNAPSHOT_SERVING=1 the legislator and bill
+# endpoints and /api/stats/ read the memory-mapped snapshot that
+# "export_snapshot" writes to SNAPSHOT_DIR (see legislative/snapshot.py).
+SNAPSHOT_SERVING = os.environ.get("SNAPSHOT_SERVING", "0") == "1"
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", str(BASE_DIR / "var" / "snapshot"))
+
+# Request profiling (ProfilingMiddleware): staff users, or clients sending
+# X-Profile-Token: PROFILING_TOKEN, profile a request with ?__profile=1
+# (cProfile) or ?__profile=stacks (flame graph stacks). PROFILING_SAMPLE_RATE = N
+# also profiles every N-th request to the PROFILING_SAMPLE_URL_NAMES routes.
+# Only WSGI requests are profiled. Captures are listed at /profiles/.
+PROFILING_DIR = os.environ.get("PROFILING_DIR", str(BASE_DIR / "var" / "profiles"))
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = int(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_SAMPLE_URL_NAMES = [
+    "legislator-list",
+    "legislator-detail",
+    "bill-list",
+    "bill-detail",
+    "bill-breakdown",
+    "bill-votes",
+    "vote-list",
+    "vote-detail",
+    "home",
+    "legislators",
+    "legislator_detail",
+    "bills",
+    "bill_detail",
+]
+PROFILING_SAMPLE_FORMAT = "cprofile"
+PROFILING_STACK_INTERVAL = 0.001
+PROFILING_MAX_PROFILES = 200
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "legislative.performance": {
+            "handlers": ["console"],
+            "level": os.environ.get("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "legislative.nplusone": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,89 @@
+"""
+SQLite connection profiles for ``DATABASES``.
+
+A profile is a set of PRAGMAs run on every new connection (through the
+backend's ``init_command`` option):
+
+* ``default``: SQLite's own defaults (rollback journal; readers wait while
+  ``load_data`` writes),
+* ``performance``: WAL journal so readers never block on the writer,
+  ``synchronous=NORMAL`` (durable at checkpoints, safe with WAL), a 256 MiB
+  memory map, a 64 MiB page cache and in-memory temp tables.
+
+``database_settings`` also adds a ``readonly`` alias opening the same file,
+or a replica copy of it (see ``legislative.replica``), with ``mode=ro`` and
+``query_only``, which ``legislative.routers`` sends request reads to.
+"""
+
+from pathlib import Path
+
+PROFILES = {
+    # Set explicitly: the journal mode is stored in the database file.
+    "default": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negative: KiB rather than pages
+        "temp_store": "MEMORY",
+    },
+}
+
+# Settings that only apply to (or can only be changed by) a writer.
+WRITER_ONLY_PRAGMAS = {"journal_mode", "synchronous"}
+
+
+def pragma_statements(pragmas, read_only=False):
+    """``PRAGMA`` statements for ``pragmas``, as one ``init_command`` string."""
+    statements = [
+        f"PRAGMA {name}={value}"
+        for name, value in pragmas.items()
+        if not (read_only and name in WRITER_ONLY_PRAGMAS)
+    ]
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+    return "; ".join(statements)
+
+
+def database_settings(
+    path,
+    profile="performance",
+    busy_timeout=5,
+    conn_max_age=600,
+    read_only=True,
+    replica=None,
+):
+    """``DATABASES`` for the SQLite file at ``path`` using ``profile``.
+
+    ``busy_timeout`` (seconds) is how long a connection waits for a lock
+    before raising "database is locked"; writers start transactions with
+    ``BEGIN IMMEDIATE`` so two writers queue instead of deadlocking. The
+    ``readonly`` alias opens ``replica`` instead of ``path`` when given.
+    """
+    pragmas = PROFILES[profile]
+    databases = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": path,
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": conn_max_age > 0,
+            "OPTIONS": {
+                "init_command": pragma_statements(pragmas),
+                "timeout": busy_timeout,
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+    if read_only:
+        databases["readonly"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": f"{Path(replica or path).absolute().as_uri()}?mode=ro",
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": conn_max_age > 0,
+            "OPTIONS": {
+                "init_command": pragma_statements(pragmas, read_only=True),
+                "timeout": busy_timeout,
+            },
+            "TEST": {"MIRROR": "default"},
+        }
+    return databases
@@ -0,0 +1,37 @@
+"""
+Aggregates precomputed by ``load_data`` after the vote results are loaded.
+
+Serving paths read these stored values (indexed) instead of grouping the
+whole ``VoteResult`` table per request.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Bill, Legislator, VoteResult
+
+
+def _vote_count(group_by, vote_type, **filters):
+    """Correlated COUNT of vote results of ``vote_type`` for the outer row."""
+    counts = (
+        VoteResult.objects.filter(vote_type=vote_type, **filters)
+        .order_by()
+        .values(group_by)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def refresh_vote_totals(using=DEFAULT_DB_ALIAS):
+    """Store per-legislator and per-bill Yea/Nay totals on their rows."""
+    yea, nay = VoteResult.VoteType.YEA, VoteResult.VoteType.NAY
+    Legislator.objects.using(using).update(
+        supported_bills_total=_vote_count("legislator", yea, legislator=OuterRef("pk")),
+        opposed_bills_total=_vote_count("legislator", nay, legislator=OuterRef("pk")),
+    )
+    Bill.objects.using(using).update(
+        supporters_total=_vote_count("vote__bill", yea, vote__bill=OuterRef("pk")),
+        opposers_total=_vote_count("vote__bill", nay, vote__bill=OuterRef("pk")),
+    )
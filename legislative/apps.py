@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class LegislativeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "legislative"
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import instrumentation, nplusone, shadow
+
+        connection_created.connect(instrumentation.install_db_execute_wrapper)
+        connection_created.connect(nplusone.install_db_execute_wrapper)
+        connection_created.connect(shadow.record_generation)
+        request_started.connect(shadow.close_swapped_connections)
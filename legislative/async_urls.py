@@ -0,0 +1,90 @@
+"""
+Async URL configuration for the legislative app, used under ASGI.
+
+Mirrors ``legislative.urls`` route for route; the DRF router is still
+included last so the browsable API root keeps working.
+"""
+
+from django.urls import include, path
+
+from . import async_views
+from .urls import router
+from .views import (
+    load_job_api_view,
+    load_jobs_api_view,
+    profile_detail_view,
+    profiles_view,
+)
+
+urlpatterns = [
+    # Web interface routes
+    path("", async_views.home_view, name="home"),
+    path("legislators/", async_views.legislators_view, name="legislators"),
+    path(
+        "legislators/<int:legislator_id>/",
+        async_views.legislator_detail_view,
+        name="legislator_detail",
+    ),
+    path("bills/", async_views.bills_view, name="bills"),
+    path("bills/<int:bill_id>/", async_views.bill_detail_view, name="bill_detail"),
+    # API routes
+    path("api/stats/", async_views.stats_api_view, name="stats_api"),
+    path(
+        "api/stats/by-party/",
+        async_views.stats_by_party_api_view,
+        name="stats_by_party",
+    ),
+    path("api/manifest/", async_views.manifest_api_view, name="manifest_api"),
+    path(
+        "api/leaderboards/",
+        async_views.leaderboards_api_view,
+        name="leaderboards",
+    ),
+    path(
+        "api/leaderboards/<slug:name>/",
+        async_views.leaderboard_api_view,
+        name="leaderboard",
+    ),
+    path("api/changes/", async_views.changes_api_view, name="changes"),
+    path("api/search/", async_views.search_api_view, name="search_api"),
+    # Operator endpoints; the sync views run in a thread and only queue work.
+    path("api/loads/", load_jobs_api_view, name="load_jobs"),
+    path("api/loads/<int:pk>/", load_job_api_view, name="load_job"),
+    path(
+        "api/legislators/",
+        async_views.legislator_list_api_view,
+        name="legislator-list",
+    ),
+    path(
+        "api/legislators/<int:pk>/",
+        async_views.legislator_detail_api_view,
+        name="legislator-detail",
+    ),
+    path("api/bills/", async_views.bill_list_api_view, name="bill-list"),
+    path(
+        "api/bills/<int:pk>/",
+        async_views.bill_detail_api_view,
+        name="bill-detail",
+    ),
+    path(
+        "api/bills/<int:pk>/breakdown/",
+        async_views.bill_breakdown_api_view,
+        name="bill-breakdown",
+    ),
+    path(
+        "api/bills/<int:pk>/votes/",
+        async_views.bill_votes_api_view,
+        name="bill-votes",
+    ),
+    path("api/votes/", async_views.vote_list_api_view, name="vote-list"),
+    path(
+        "api/votes/<int:pk>/",
+        async_views.vote_detail_api_view,
+        name="vote-detail",
+    ),
+    path("api/", include(router.urls)),
+    path("metrics", async_views.metrics_view, name="metrics"),
+    # Staff-only file browsing; the sync views run in a thread.
+    path("profiles/", profiles_view, name="profiles"),
+    path("profiles/<str:profile_id>/", profile_detail_view, name="profile_detail"),
+]
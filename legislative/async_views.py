@@ -0,0 +1,264 @@
+"""
+Async counterparts of the read endpoints, served under ASGI.
+
+Every database access goes through Django's async ORM (``acount``, ``aget``,
+``async for``); querysets are fully materialized before serialization or
+template rendering so no lazy query is evaluated inside the event loop.
+The viewsets stay the source of truth for querysets and serializers.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from . import documents, snapshot, views
+from .models import Bill, DatasetManifest, Leaderboard, Legislator
+from .pagination import VoteHistoryPagination, VotePagination
+from .queries import (
+    bill_vote_breakdown,
+    bill_vote_rows,
+    bills_with_counts,
+    changes_between,
+    legislator_vote_rows,
+    legislators_with_counts,
+    party_stats,
+    votes_with_tallies,
+)
+from .search import search
+from .serializers import VoteTallySerializer
+from .views import (
+    BillViewSet,
+    LegislatorViewSet,
+    bill_votes_or_none,
+    change_feed_version,
+    changes_response,
+    parse_changes_request,
+    parse_search_request,
+    search_response,
+)
+
+
+async def _collect(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _manifest():
+    return await DatasetManifest.current_values().afirst()
+
+
+def _build_viewset(viewset_class, request, action, **kwargs):
+    """Instantiate a viewset outside the DRF dispatch to reuse its queryset logic."""
+    view = viewset_class(action=action, kwargs=kwargs, format_kwarg=None)
+    view.request = Request(request)
+    return view
+
+
+async def _list_response(viewset_class, request):
+    view = _build_viewset(viewset_class, request, "list")
+    current = snapshot.current()
+    try:
+        if current is not None:
+            rows = snapshot.list_data(
+                current, viewset_class.snapshot_kind, view.request, view
+            )
+            return JsonResponse(rows, safe=False)
+        queryset = view.filter_queryset(view.get_queryset())
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+    rows = await _collect(queryset)
+    return JsonResponse(view.get_serializer(rows, many=True).data, safe=False)
+
+
+async def _get_object(viewset_class, request, pk):
+    view = _build_viewset(viewset_class, request, "retrieve", pk=pk)
+    try:
+        obj = await view.get_queryset().aget(pk=pk)
+    except ObjectDoesNotExist:
+        return view, None
+    return view, obj
+
+
+async def _detail_response(viewset_class, request, pk):
+    current = snapshot.current()
+    if current is not None:
+        try:
+            data = snapshot.detail_data(
+                current, viewset_class.snapshot_kind, request, pk
+            )
+        except Http404:
+            return _not_found()
+        return JsonResponse(data)
+    response = await documents.adocument_response(
+        viewset_class.document_model, request, pk
+    )
+    if response is not None:
+        return response
+    view, obj = await _get_object(viewset_class, request, pk)
+    if obj is None:
+        return _not_found()
+    paginator = VoteHistoryPagination(view.request)
+    rows = await _collect(paginator.page_queryset(view.get_vote_history_queryset(obj)))
+    view.attach_vote_history(obj, paginator, rows)
+    return JsonResponse(view.get_serializer(obj).data)
+
+
+def _not_found():
+    return JsonResponse({"detail": "Not found."}, status=404)
+
+
+async def _leaderboards():
+    rows = await _collect(Leaderboard.objects.values_list("name", "entries"))
+    return views.leaderboards_data(rows)
+
+
+async def home_view(request):
+    stats = views.manifest_stats(await _manifest())
+    context = views.home_context(stats, await _leaderboards())
+    return render(request, "legislative/home.html", context)
+
+
+async def legislators_view(request):
+    legislators = await _collect(legislators_with_counts().order_by("name"))
+    return render(request, "legislative/legislators.html", {"legislators": legislators})
+
+
+async def legislator_detail_view(request, legislator_id):
+    try:
+        legislator = await legislators_with_counts().aget(id=legislator_id)
+    except Legislator.DoesNotExist as e:
+        raise Http404("No Legislator matches the given query.") from e
+    paginator = VoteHistoryPagination(request)
+    rows = await _collect(paginator.page_queryset(legislator_vote_rows(legislator.id)))
+    return render(
+        request,
+        "legislative/legislator_detail.html",
+        {"legislator": legislator, **views.vote_history_context(paginator, rows)},
+    )
+
+
+async def bills_view(request):
+    bills = await _collect(bills_with_counts().order_by("title"))
+    return render(request, "legislative/bills.html", {"bills": bills})
+
+
+async def bill_detail_view(request, bill_id):
+    try:
+        bill = await bills_with_counts().aget(id=bill_id)
+    except Bill.DoesNotExist as e:
+        raise Http404("No Bill matches the given query.") from e
+    paginator = VoteHistoryPagination(request)
+    rows = await _collect(paginator.page_queryset(bill_vote_rows(bill.id)))
+    return render(
+        request,
+        "legislative/bill_detail.html",
+        {"bill": bill, **views.vote_history_context(paginator, rows)},
+    )
+
+
+async def stats_api_view(request):
+    current = snapshot.current()
+    if current is not None:
+        return JsonResponse(snapshot.stats_data(current))
+    return JsonResponse(views.manifest_stats(await _manifest()))
+
+
+async def manifest_api_view(request):
+    return JsonResponse(views.manifest_data(await _manifest()))
+
+
+async def changes_api_view(request):
+    since, paginator, error = parse_changes_request(request)
+    if error is not None:
+        return error
+    version, error = change_feed_version(await _manifest(), since)
+    if error is not None:
+        return error
+    queryset = paginator.page_queryset(changes_between(since, version))
+    rows = paginator.paginate_rows(await _collect(queryset))
+    return changes_response(paginator, since, version, rows)
+
+
+async def legislator_list_api_view(request):
+    return await _list_response(LegislatorViewSet, request)
+
+
+async def legislator_detail_api_view(request, pk):
+    return await _detail_response(LegislatorViewSet, request, pk)
+
+
+async def bill_list_api_view(request):
+    return await _list_response(BillViewSet, request)
+
+
+async def bill_detail_api_view(request, pk):
+    return await _detail_response(BillViewSet, request, pk)
+
+
+async def bill_breakdown_api_view(request, pk):
+    bill = await Bill.objects.values("id", "title").filter(pk=pk).afirst()
+    if bill is None:
+        return _not_found()
+    by_party = await _collect(bill_vote_breakdown(pk, "party"))
+    by_state = await _collect(bill_vote_breakdown(pk, "state"))
+    return JsonResponse(views.bill_breakdown(bill, by_party, by_state))
+
+
+async def _vote_page_response(request, queryset):
+    paginator = VotePagination(request)
+    rows = paginator.paginate_rows(await _collect(paginator.page_queryset(queryset)))
+    return rows, JsonResponse(
+        paginator.get_response_data(VoteTallySerializer(rows, many=True).data)
+    )
+
+
+async def vote_list_api_view(request):
+    _, response = await _vote_page_response(request, votes_with_tallies())
+    return response
+
+
+async def vote_detail_api_view(request, pk):
+    vote = await votes_with_tallies().filter(pk=pk).afirst()
+    if vote is None:
+        return _not_found()
+    return JsonResponse(VoteTallySerializer(vote).data)
+
+
+async def bill_votes_api_view(request, pk):
+    rows, response = await _vote_page_response(request, bill_votes_or_none(pk))
+    if not rows and not await Bill.objects.filter(pk=pk).aexists():
+        return _not_found()
+    return response
+
+
+async def leaderboards_api_view(request):
+    return JsonResponse({"leaderboards": await _leaderboards()})
+
+
+async def leaderboard_api_view(request, name):
+    board = await Leaderboard.objects.values("name", "entries").filter(pk=name).afirst()
+    if board is None:
+        return _not_found()
+    return JsonResponse(board)
+
+
+async def stats_by_party_api_view(request):
+    return views.party_stats_response(await _collect(party_stats()))
+
+
+async def search_api_view(request):
+    match, kind, paginator, error = parse_search_request(request)
+    if error is not None:
+        return error
+    # FTS5 needs raw SQL, which has no async ORM API.
+    count, hits = await sync_to_async(search)(
+        match, kind, paginator.limit, paginator.offset
+    )
+    return search_response(paginator, count, hits)
+
+
+async def metrics_view(request):
+    # Reads the other workers' snapshot files.
+    return await sync_to_async(views.metrics_view)(request)
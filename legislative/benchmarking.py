@@ -0,0 +1,39 @@
+"""
+Helpers shared by the ``benchmark_serving`` and ``loadtest`` commands.
+"""
+
+import io
+import re
+
+_DB_QUERIES_RE = re.compile(r'(?:^|,\s*)db;[^,]*desc="(\d+) queries"')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def wsgi_environ(path, query="", method="GET"):
+    """Minimal WSGI environ for an in-process request to ``path``."""
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": io.StringIO(),
+    }
+
+
+def db_queries_from_server_timing(header):
+    """Query count reported by ``ServerTimingMiddleware``, or ``None``."""
+    match = _DB_QUERIES_RE.search(header or "")
+    return int(match[1]) if match else None
@@ -0,0 +1,85 @@
+"""
+Change log written by ``load_data`` for the change feed (``/api/changes/``).
+
+A load replaces whole tables, so changes are found by comparison:
+``fingerprint`` reads the tracked fields of every legislator and bill
+before the load clears anything, and ``record_changes`` compares them with
+the loaded rows and stores one ``Change`` per inserted, updated or deleted
+entity under the new dataset version. The tracked fields include the Yea/Nay
+totals, so a new vote result also updates its legislator and bill.
+
+Only the last ``CHANGE_LOG_VERSIONS`` versions are kept;
+``DatasetManifest.changes_from`` is the oldest version a client can sync
+from.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Bill, Change, Legislator
+
+# entity: (model, fields whose change is an update)
+TRACKED = {
+    "legislator": (
+        Legislator,
+        (
+            "name",
+            "party",
+            "state",
+            "district",
+            "supported_bills_total",
+            "opposed_bills_total",
+        ),
+    ),
+    "bill": (
+        Bill,
+        ("title", "primary_sponsor_id", "supporters_total", "opposers_total"),
+    ),
+}
+
+
+def fingerprint(using=DEFAULT_DB_ALIAS):
+    """``{entity: {id: tracked values}}`` for every tracked row."""
+    return {
+        entity: {
+            row[0]: row[1:]
+            for row in model.objects.using(using).values_list("id", *fields).iterator()
+        }
+        for entity, (model, fields) in TRACKED.items()
+    }
+
+
+def diff(before, after):
+    """``(entity, id, op)`` for every row that differs, by entity then id."""
+    for entity in TRACKED:
+        old, new = before.get(entity, {}), after.get(entity, {})
+        for pk in sorted(old.keys() | new.keys()):
+            if pk not in old:
+                yield entity, pk, Change.Op.INSERT
+            elif pk not in new:
+                yield entity, pk, Change.Op.DELETE
+            elif old[pk] != new[pk]:
+                yield entity, pk, Change.Op.UPDATE
+
+
+def record_changes(before, manifest, using=DEFAULT_DB_ALIAS):
+    """Log the changes since ``before`` under ``manifest.version`` and drop
+    versions past the retention; returns the count per operation."""
+    counts = dict.fromkeys(Change.Op.values, 0)
+    changes = []
+    for entity, pk, op in diff(before, fingerprint(using)):
+        counts[op] += 1
+        changes.append(
+            Change(version=manifest.version, entity=entity, entity_id=pk, op=op)
+        )
+    Change.objects.using(using).bulk_create(changes, batch_size=1000)
+
+    if manifest.changes_from is None:
+        # First logged load: clients at the previous version can follow.
+        manifest.changes_from = manifest.version - 1
+    oldest = manifest.version - settings.CHANGE_LOG_VERSIONS
+    if oldest > manifest.changes_from:
+        Change.objects.using(using).filter(version__lte=oldest).delete()
+        manifest.changes_from = oldest
+    manifest.save(using=using, update_fields=["changes_from"])
+    return counts
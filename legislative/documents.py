@@ -0,0 +1,200 @@
+"""
+Detail endpoint responses pre-rendered by ``load_data``.
+
+Detail JSON only changes on reload, so ``build_documents`` serializes every
+legislator and bill once, with the API's own serializers and renderer, and
+stores the bytes in ``LegislatorDocument`` / ``BillDocument`` keyed by id.
+The queries (the annotated objects and their first vote history page, per
+chunk) run on the loading connection, inside its transaction; serializing
+and rendering the chunks, which is pure CPU work, is spread over
+``DETAIL_DOCUMENT_WORKERS`` processes (``render_pool``), with at most
+``IN_FLIGHT_PER_WORKER`` chunks per worker queued at a time.
+
+A retrieve request for the default vote history window is then answered
+with one primary-key lookup and no serialization. Other windows
+(``?votes_limit=`` / ``?votes_offset=``) and other renderers still go
+through the serializers.
+"""
+
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import groupby
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from .models import BillDocument, LegislatorDocument
+from .pagination import VoteHistoryPagination
+from .queries import (
+    bill_vote_pages,
+    bills_with_counts,
+    legislator_vote_pages,
+    legislators_with_counts,
+)
+from .serializers import BillDetailSerializer, LegislatorDetailSerializer
+
+CHUNK_SIZE = 500
+IN_FLIGHT_PER_WORKER = 2
+_NEXT_TAIL = b'"vote_results_next":null}'
+
+# document model: (annotated objects, first vote pages, detail serializer)
+KINDS = {
+    LegislatorDocument: (
+        legislators_with_counts,
+        legislator_vote_pages,
+        LegislatorDetailSerializer,
+    ),
+    BillDocument: (bills_with_counts, bill_vote_pages, BillDetailSerializer),
+}
+
+
+def _render_chunk(serializer_class, objects):
+    """``(id, body, has_next)`` for each object with its vote rows attached."""
+    renderer = JSONRenderer()
+    return [
+        (
+            obj.pk,
+            renderer.render(serializer_class(obj).data),
+            obj.has_next_vote_page,
+        )
+        for obj in objects
+    ]
+
+
+def _chunks(document_model, using, page_size):
+    """Annotated objects with one vote history page, ``CHUNK_SIZE`` at a time."""
+    objects_for, vote_pages, _ = KINDS[document_model]
+    queryset = objects_for().using(using).order_by("pk")
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        objects = list(page[:CHUNK_SIZE])
+        if not objects:
+            return
+        rows = vote_pages([obj.pk for obj in objects], page_size + 1, using)
+        by_owner = {
+            owner: list(owner_rows)
+            for owner, owner_rows in groupby(rows, key=lambda row: row["owner"])
+        }
+        for obj in objects:
+            obj_rows = by_owner.get(obj.pk, [])
+            obj.has_next_vote_page = len(obj_rows) > page_size
+            obj.prefetched_vote_results = obj_rows[:page_size]
+            obj.vote_results_next = None
+        yield objects
+        last_pk = objects[-1].pk
+
+
+@contextmanager
+def render_pool(workers=None):
+    """Worker processes for ``build_documents`` (``None`` for one worker).
+
+    Under fork, the first submit starts every worker, so the pool is warmed
+    up here: open it before the loading transaction so no worker is forked
+    while that transaction is open.
+    """
+    if workers is None:
+        workers = settings.DETAIL_DOCUMENT_WORKERS
+    if workers <= 1:
+        yield None
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pool.submit(int).result()
+        yield pool
+    finally:
+        pool.shutdown()
+
+
+def _render_in_pool(pool, serializer_class, chunks):
+    """Rendered chunks in order, keeping a bounded number in flight so only
+    a few chunks are pickled and held in memory at a time."""
+    in_flight = deque()
+    limit = pool._max_workers * IN_FLIGHT_PER_WORKER
+    for chunk in chunks:
+        if len(in_flight) >= limit:
+            yield in_flight.popleft().result()
+        in_flight.append(pool.submit(_render_chunk, serializer_class, chunk))
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def build_documents(using=DEFAULT_DB_ALIAS, pool=None, workers=None):
+    """Replace every stored detail document; returns counts per model.
+
+    Renders in ``pool`` when given (see ``render_pool``), otherwise in a
+    pool of ``workers`` processes opened for this call.
+    """
+    if pool is None:
+        with render_pool(workers) as pool:
+            return _build_documents(using, pool)
+    return _build_documents(using, pool)
+
+
+def _build_documents(using, pool):
+    page_size = settings.VOTE_HISTORY_PAGE_SIZE
+    counts = {}
+    for document_model, (_, _, serializer_class) in KINDS.items():
+        document_model.objects.using(using).all().delete()
+        chunks = _chunks(document_model, using, page_size)
+        if pool is None:
+            rendered = (_render_chunk(serializer_class, c) for c in chunks)
+        else:
+            rendered = _render_in_pool(pool, serializer_class, chunks)
+        counts[document_model] = 0
+        for documents in rendered:
+            document_model.objects.using(using).bulk_create(
+                document_model(id=pk, body=body, has_next=has_next)
+                for pk, body, has_next in documents
+            )
+            counts[document_model] += len(documents)
+    return counts
+
+
+def _wants_default_window(request):
+    return not any(
+        param in request.GET
+        for param in (
+            VoteHistoryPagination.limit_query_param,
+            VoteHistoryPagination.offset_query_param,
+        )
+    )
+
+
+def _response(request, body, has_next):
+    body = bytes(body)
+    if has_next:
+        paginator = VoteHistoryPagination(request)
+        paginator.has_next = True
+        link = json.dumps(paginator.get_next_link()).encode()
+        body = body[: -len(_NEXT_TAIL)] + b'"vote_results_next":' + link + b"}"
+    return HttpResponse(body, content_type="application/json")
+
+
+def _lookup(document_model, pk):
+    try:
+        return document_model.objects.filter(pk=pk).values_list("body", "has_next")
+    except (TypeError, ValueError):
+        return None
+
+
+def document_response(document_model, request, pk):
+    """Stored detail response for ``pk``, or ``None`` to serialize instead."""
+    if not _wants_default_window(request):
+        return None
+    lookup = _lookup(document_model, pk)
+    document = lookup.first() if lookup is not None else None
+    return None if document is None else _response(request, *document)
+
+
+async def adocument_response(document_model, request, pk):
+    """Async ``document_response`` for the ASGI views."""
+    if not _wants_default_window(request):
+        return None
+    lookup = _lookup(document_model, pk)
+    document = await lookup.afirst() if lookup is not None else None
+    return None if document is None else _response(request, *document)
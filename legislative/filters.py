@@ -0,0 +1,89 @@
+"""
+DRF filter backends for the list endpoints.
+"""
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte")
+
+
+class VoteCountFilterBackend(BaseFilterBackend):
+    """Range filters, ``?ordering=`` and ``?limit=`` over precomputed counts.
+
+    The view declares ``count_fields`` (public count name -> indexed model
+    field) and ``ordering_fields`` (other orderable public names -> model
+    field); only the ``list`` action is filtered. Supports
+    ``?<count>__gt|gte|lt|lte=<int>`` and a comma-separated ``?ordering=``
+    where ``-`` sorts descending; ties are broken by ``id`` in the direction
+    of the first term so a top-N query is one index scan.
+    """
+
+    ordering_param = "ordering"
+    limit_param = "limit"
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, "action", None) != "list":
+            return queryset
+        filters, ordering, limit = self.parse(request, view)
+        for field, lookup, value in filters:
+            queryset = queryset.filter(**{f"{field}__{lookup}": value})
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        if limit is not None:
+            queryset = queryset[:limit]
+        return queryset
+
+    def parse(self, request, view):
+        """Validated ``(filters, ordering, limit)`` from the query string.
+
+        ``filters`` are ``(model field, lookup, value)`` triples; ``ordering``
+        is empty or ends with the ``id`` tie-break; ``limit`` may be ``None``.
+        """
+        count_fields = getattr(view, "count_fields", {})
+        params = request.query_params
+
+        filters = []
+        for name, field in count_fields.items():
+            for lookup in RANGE_LOOKUPS:
+                param = f"{name}__{lookup}"
+                if param in params:
+                    value = self._parse_int(param, params[param])
+                    filters.append((field, lookup, value))
+
+        ordering = self._get_ordering(params, view, count_fields)
+        if ordering:
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+
+        limit = None
+        if self.limit_param in params:
+            limit = self._parse_int(self.limit_param, params[self.limit_param])
+            if limit < 1:
+                raise ValidationError({self.limit_param: "Must be a positive integer."})
+        return filters, ordering, limit
+
+    def _get_ordering(self, params, view, count_fields):
+        raw = params.get(self.ordering_param)
+        if not raw:
+            return []
+        fields = {**getattr(view, "ordering_fields", {}), **count_fields}
+        ordering = []
+        for term in (t.strip() for t in raw.split(",")):
+            descending = term.startswith("-")
+            name = term.lstrip("-")
+            if name not in fields:
+                raise ValidationError(
+                    {
+                        self.ordering_param: f"Invalid ordering '{name}' (expected one "
+                        f"of: {', '.join(sorted(fields))})."
+                    }
+                )
+            ordering.append(("-" if descending else "") + fields[name])
+        return ordering
+
+    @staticmethod
+    def _parse_int(param, value):
+        try:
+            return int(value)
+        except ValueError as e:
+            raise ValidationError({param: "A whole number is required."}) from e
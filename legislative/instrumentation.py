@@ -0,0 +1,131 @@
+"""
+Per-request performance instrumentation.
+
+``ServerTimingMiddleware`` opens a ``RequestTimings`` for each request in a
+context variable (so it follows the request into ``sync_to_async`` threads);
+the pieces below add to it when one is active and cost a single
+``ContextVar.get()`` otherwise:
+
+* ``db_execute_wrapper`` is installed on every database connection and
+  counts queries and their time,
+* ``timed("serialize")`` wraps serializer ``.data`` (see ``serializers.py``),
+* ``InstrumentedDjangoTemplates`` times template rendering.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates
+
+_current_timings = ContextVar("legislative_request_timings", default=None)
+
+
+class RequestTimings:
+    """Durations (seconds) and DB query count collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.durations = defaultdict(float)
+
+    def add(self, name, seconds):
+        self.durations[name] += seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        """Render a ``Server-Timing`` header value (durations in ms)."""
+        db_ms = self.durations["db"] * 1000
+        metrics = [f'db;dur={db_ms:.2f};desc="{self.db_queries} queries"']
+        metrics += [
+            f"{name};dur={seconds * 1000:.2f}"
+            for name, seconds in self.durations.items()
+            if name != "db"
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def as_dict(self, total):
+        data = {
+            "db_queries": self.db_queries,
+            "db_ms": round(self.durations["db"] * 1000, 3),
+        }
+        for name, seconds in self.durations.items():
+            data[f"{name}_ms"] = round(seconds * 1000, 3)
+        data["total_ms"] = round(total * 1000, 3)
+        return data
+
+
+@contextmanager
+def collect_timings():
+    """Make a fresh ``RequestTimings`` current for the enclosed block."""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Add the block's duration under ``name`` to the current request."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook counting queries and DB time."""
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_queries += 1
+        timings.add("db", time.perf_counter() - started)
+
+
+def install_db_execute_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver installing ``db_execute_wrapper``.
+
+    Installed per connection rather than per request because the async ORM
+    runs queries on another thread, with that thread's connection.
+    """
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+class InstrumentedTemplate:
+    """Template wrapper adding its render time under ``template``."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return self.template.render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend whose templates report their render time."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
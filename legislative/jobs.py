@@ -0,0 +1,207 @@
+"""
+Background ``load_data`` runs requested through the API.
+
+``enqueue`` records a ``LoadJob`` and hands it to this process's single
+worker thread, so the request returns at once. While a job is queued or
+running, further requests get that job back instead of starting another
+one; the ``single_active_load_job`` constraint settles races between
+processes.
+
+The worker runs ``load_data`` in-process. The load holds the database's
+write lock until it commits, so its progress (phase and CSV rows loaded)
+goes to ``LOAD_JOBS_DIR/<id>.json``, which any process can read while the
+job runs. Detail documents are rendered on the worker thread rather than
+in forked processes, since the server has other threads running.
+Authorized callers are staff users and requests with an ``X-Load-Token``
+header equal to ``LOAD_JOBS_TOKEN``.
+"""
+
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command, load_command_class
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import LoadJob
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def jobs_dir():
+    return Path(settings.LOAD_JOBS_DIR)
+
+
+def is_authorized(request, user):
+    """Whether ``request`` (made by ``user``) may queue and inspect loads."""
+    token = getattr(settings, "LOAD_JOBS_TOKEN", "")
+    header = request.headers.get("X-Load-Token", "")
+    if token and header and hmac.compare_digest(token, header):
+        return True
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def _jobs():
+    # Job state must not come from a read replica that lags the primary.
+    return LoadJob.objects.using(DEFAULT_DB_ALIAS)
+
+
+def _worker_alive(job):
+    if job.pid is None or job.host != socket.gethostname():
+        return True  # Cannot tell from here.
+    try:
+        os.kill(job.pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _finish(job, status, error=""):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(using=DEFAULT_DB_ALIAS)
+
+
+def active_job():
+    """The queued or running job, if any; jobs whose process died fail."""
+    for job in _jobs().filter(status__in=LoadJob.ACTIVE).order_by("id"):
+        if _worker_alive(job):
+            return job
+        _finish(job, LoadJob.Status.FAILED, "The process running the job exited.")
+    return None
+
+
+def recent_jobs(limit=20):
+    return _jobs().order_by("-id")[:limit]
+
+
+def get_job(job_id):
+    return _jobs().filter(pk=job_id).first()
+
+
+def enqueue(force=False, requested_by=""):
+    """``(job, created)``: a newly queued job, or the one already active."""
+    # A plain read, outside any transaction: a running load holds the write
+    # lock until it commits, and BEGIN IMMEDIATE would wait for it and fail
+    # with "database is locked" instead of returning the running job.
+    job = active_job()
+    if job is not None:
+        return job, False
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            job = _jobs().create(
+                force=force,
+                requested_by=requested_by,
+                host=socket.gethostname(),
+                pid=os.getpid(),
+            )
+    except IntegrityError:
+        # Another process queued one between our check and insert.
+        return active_job(), False
+    _submit(job.pk)
+    job.refresh_from_db(using=DEFAULT_DB_ALIAS)
+    return job, True
+
+
+def _eager():
+    # Tests set LOAD_JOBS_EAGER to run the job inside the request.
+    return getattr(settings, "LOAD_JOBS_EAGER", False)
+
+
+def _submit(job_id):
+    global _executor
+    if _eager():
+        run(job_id)
+        return
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="load-job")
+    _executor.submit(run, job_id)
+
+
+def _progress_path(job_id):
+    return jobs_dir() / f"{job_id}.json"
+
+
+def _progress_writer(job_id):
+    path = _progress_path(job_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+
+    def report(phase, rows_done):
+        data = {"phase": phase, "rows_done": rows_done, "updated_at": time.time()}
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
+
+    return report
+
+
+def read_progress(job_id):
+    try:
+        return json.loads(_progress_path(job_id).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def run(job_id):
+    """Run queued job ``job_id``; called on the worker thread."""
+    job = _jobs().get(pk=job_id)
+    job.status = LoadJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.host, job.pid = socket.gethostname(), os.getpid()
+    job.save(using=DEFAULT_DB_ALIAS)
+    command = load_command_class("legislative", "load_data")
+    command.progress = _progress_writer(job_id)
+    # Never fork render processes from the web server: it runs other
+    # threads, so a forked child could deadlock on a lock one of them held,
+    # and it would copy the server's memory, sockets and connections.
+    command.render_workers = 1
+    try:
+        call_command(command, force=job.force, stdout=StringIO())
+    except Exception as e:
+        command.progress("failed", command.rows_done)
+        _finish(job, LoadJob.Status.FAILED, str(e) or e.__class__.__name__)
+    else:
+        command.progress("done", command.rows_done)
+        job.rows = command.rows
+        _finish(job, LoadJob.Status.SUCCEEDED)
+    finally:
+        if not _eager():
+            connections.close_all()
+
+
+def job_data(job):
+    """API representation of ``job`` with its live progress."""
+    progress = read_progress(job.pk)
+    rows_done = progress.get("rows_done", 0)
+    rows_per_second = None
+    if job.started_at is not None and progress:
+        elapsed = progress["updated_at"] - job.started_at.timestamp()
+        if elapsed > 0:
+            rows_per_second = round(rows_done / elapsed, 1)
+    return {
+        "id": job.pk,
+        "status": job.status,
+        "phase": progress.get("phase"),
+        "rows_done": rows_done,
+        "rows_per_second": rows_per_second,
+        "force": job.force,
+        "requested_by": job.requested_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "rows": job.rows,
+        "error": job.error,
+    }
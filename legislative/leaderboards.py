@@ -0,0 +1,73 @@
+"""
+Top-N leaderboards computed by ``load_data``.
+
+``build_leaderboards`` streams the precomputed Yea/Nay totals (see
+``aggregates``) once per board and keeps the best ``LEADERBOARD_SIZE`` rows
+with a bounded heap, so no request sorts a count. Each board's ranked
+entries are stored in one ``Leaderboard`` row and served as they are.
+"""
+
+import heapq
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+
+from .models import Bill, Leaderboard, Legislator
+
+
+def _legislator_rows(using):
+    return Legislator.objects.using(using).values(
+        "id",
+        "name",
+        supported_bills_count=F("supported_bills_total"),
+        opposed_bills_count=F("opposed_bills_total"),
+    )
+
+
+def _bill_rows(using):
+    return Bill.objects.using(using).values(
+        "id",
+        "title",
+        supporters_count=F("supporters_total"),
+        opposers_count=F("opposers_total"),
+    )
+
+
+def _contested(row):
+    # The larger the losing side, the more contested; ties go to the
+    # narrower margin, then to the lower id.
+    supporters, opposers = row["supporters_count"], row["opposers_count"]
+    return min(supporters, opposers), -abs(supporters - opposers), -row["id"]
+
+
+# board name: (rows to rank, heap key; ties go to the lower id)
+BOARDS = {
+    "most-supportive": (
+        _legislator_rows,
+        lambda row: (row["supported_bills_count"], -row["id"]),
+    ),
+    "most-oppositional": (
+        _legislator_rows,
+        lambda row: (row["opposed_bills_count"], -row["id"]),
+    ),
+    "most-contested": (_bill_rows, _contested),
+}
+
+
+def rank(rows, key, size):
+    """The ``size`` best ``rows`` by ``key``, numbered from 1."""
+    top = heapq.nlargest(size, rows, key=key)
+    return [{"rank": position, **row} for position, row in enumerate(top, 1)]
+
+
+def build_leaderboards(using=DEFAULT_DB_ALIAS, size=None):
+    """Replace every stored board; returns the number of boards."""
+    if size is None:
+        size = settings.LEADERBOARD_SIZE
+    Leaderboard.objects.using(using).all().delete()
+    Leaderboard.objects.using(using).bulk_create(
+        Leaderboard(name=name, entries=rank(rows(using).iterator(), key, size))
+        for name, (rows, key) in BOARDS.items()
+    )
+    return len(BOARDS)
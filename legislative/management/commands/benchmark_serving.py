@@ -0,0 +1,207 @@
+"""
+Compare WSGI and ASGI serving in-process under concurrent, slow clients.
+
+The WSGI application is driven from a bounded worker pool (like a threaded
+WSGI server) where a slow client keeps its worker busy while the response is
+written; the ASGI application is driven from the event loop with the async
+views, where a slow client only parks a coroutine.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from legislative.benchmarking import percentile, wsgi_environ
+
+DEFAULT_PATHS = ["/api/stats/", "/api/legislators/", "/api/bills/"]
+
+
+class Command(BaseCommand):
+    help = "Benchmark WSGI vs ASGI serving latency at several concurrency levels"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests per concurrency level (default: 200)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            default="1,8,32",
+            help="Comma-separated concurrent client counts (default: 1,8,32)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="WSGI worker threads, i.e. the pool that saturates (default: 8)",
+        )
+        parser.add_argument(
+            "--client-delay-ms",
+            dest="client_delay_ms",
+            type=float,
+            default=20.0,
+            help="Simulated time a slow client takes to read a response (default: 20)",
+        )
+        parser.add_argument(
+            "--path",
+            dest="paths",
+            action="append",
+            help="Path to request; repeat for a round-robin mix (default: API lists)",
+        )
+        parser.add_argument(
+            "--interface",
+            choices=["wsgi", "asgi", "both"],
+            default="both",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(c) for c in options["concurrency"].split(",") if c.strip()]
+        except ValueError as e:
+            raise CommandError("--concurrency must be a list of integers.") from e
+        if not levels or min(levels) < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency and --requests must be positive.")
+
+        paths = options["paths"] or DEFAULT_PATHS
+        delay = options["client_delay_ms"] / 1000
+        interfaces = (
+            ["wsgi", "asgi"]
+            if options["interface"] == "both"
+            else [options["interface"]]
+        )
+
+        self.stdout.write(
+            f"{'interface':<9} {'clients':>7} {'req/s':>9} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for interface in interfaces:
+            for level in levels:
+                if interface == "wsgi":
+                    latencies, errors, elapsed = self._run_wsgi(
+                        paths, options["requests"], level, options["workers"], delay
+                    )
+                else:
+                    latencies, errors, elapsed = self._run_asgi(
+                        paths, options["requests"], level, delay
+                    )
+                latencies.sort()
+                self.stdout.write(
+                    f"{interface:<9} {level:>7} {len(latencies) / elapsed:>9.1f} "
+                    f"{percentile(latencies, 50) * 1000:>9.2f} "
+                    f"{percentile(latencies, 95) * 1000:>9.2f} "
+                    f"{percentile(latencies, 99) * 1000:>9.2f} {errors:>7}"
+                )
+
+    def _run_wsgi(self, paths, total, clients, workers, delay):
+        from core.wsgi import application
+
+        workers_available = threading.BoundedSemaphore(workers)
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def one_request(path):
+            nonlocal errors
+            environ = wsgi_environ(path)
+            status_holder = []
+            started = time.perf_counter()
+            with workers_available:
+                body = application(
+                    environ, lambda status, headers: status_holder.append(status)
+                )
+                for _chunk in body:
+                    pass
+                if hasattr(body, "close"):
+                    body.close()
+                time.sleep(delay)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                if not status_holder[0].startswith("2"):
+                    errors += 1
+
+        def client(count, offset):
+            for i in range(count):
+                one_request(paths[(offset + i) % len(paths)])
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            futures = [
+                pool.submit(client, count, index)
+                for index, count in enumerate(self._split(total, clients))
+            ]
+            for future in futures:
+                future.result()
+        return latencies, errors, time.perf_counter() - started
+
+    def _run_asgi(self, paths, total, clients, delay):
+        from django.core.asgi import get_asgi_application
+
+        latencies = []
+        errors = 0
+
+        async def one_request(application, path):
+            nonlocal errors
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "headers": [(b"host", b"localhost")],
+                "server": ("localhost", 80),
+            }
+            status = []
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+            response_sent = asyncio.Event()
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await response_sent.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body", False):
+                    await asyncio.sleep(delay)
+                    response_sent.set()
+
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            latencies.append(time.perf_counter() - started)
+            if not 200 <= status[0] < 300:
+                errors += 1
+
+        async def client(application, count, offset):
+            for i in range(count):
+                await one_request(application, paths[(offset + i) % len(paths)])
+
+        async def run():
+            application = get_asgi_application()
+            await asyncio.gather(
+                *(
+                    client(application, count, index)
+                    for index, count in enumerate(self._split(total, clients))
+                )
+            )
+
+        with override_settings(ROOT_URLCONF="core.asgi_urls"):
+            started = time.perf_counter()
+            asyncio.run(run())
+            elapsed = time.perf_counter() - started
+        return latencies, errors, elapsed
+
+    @staticmethod
+    def _split(total, clients):
+        base, extra = divmod(total, clients)
+        return [base + (1 if i < extra else 0) for i in range(clients)]
@@ -0,0 +1,185 @@
+"""
+Measure read latency while a bulk write runs, per SQLite connection profile.
+
+For each profile in ``core.sqlite.PROFILES`` the current database is copied
+to a temporary file. Reader threads then run the list endpoint queries in a
+loop while one writer repeatedly replaces ``--write-rows`` rows in a scratch
+table inside a single transaction, like ``load_data`` does. With the
+rollback journal (``default``) readers wait, or fail with "database is
+locked", whenever the writer spills to disk and commits; with WAL
+(``performance``) they keep reading the last committed snapshot.
+"""
+
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.sqlite import PROFILES, pragma_statements
+from legislative.benchmarking import percentile
+from legislative.queries import bills_with_counts, legislators_with_counts
+
+SCRATCH_TABLE = "benchmark_scratch"
+
+
+def _connect(path, pragmas, busy_timeout, read_only=False):
+    uri = f"{Path(path).absolute().as_uri()}{'?mode=ro' if read_only else ''}"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        timeout=busy_timeout,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    for statement in pragma_statements(pragmas, read_only=read_only).split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    return conn
+
+
+def _read_queries():
+    """SQL and params of the list endpoints' querysets."""
+    return [
+        qs.query.get_compiler(using=qs.db).as_sql()
+        for qs in (
+            legislators_with_counts().order_by("name"),
+            bills_with_counts().order_by("title"),
+        )
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent reads during a bulk write for each SQLite profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles",
+            default=",".join(PROFILES),
+            help=f"Comma-separated profiles (default: {','.join(PROFILES)})",
+        )
+        parser.add_argument(
+            "--readers", type=int, default=4, help="Reader threads (default: 4)"
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=3.0,
+            help="Seconds to run each profile (default: 3)",
+        )
+        parser.add_argument(
+            "--write-rows",
+            dest="write_rows",
+            type=int,
+            default=200_000,
+            help="Rows replaced per write transaction (default: 200000)",
+        )
+        parser.add_argument(
+            "--busy-timeout",
+            dest="busy_timeout",
+            type=float,
+            default=5.0,
+            help="Seconds a connection waits for a lock (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("benchmark_sqlite supports SQLite databases only.")
+        profiles = [p.strip() for p in options["profiles"].split(",") if p.strip()]
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+        if options["readers"] < 1 or options["duration"] <= 0:
+            raise CommandError("--readers and --duration must be positive.")
+
+        self.stdout.write(
+            f"{'profile':<12} {'reads':>7} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'max ms':>9} {'errors':>7} {'writes':>7} {'write ms':>9}"
+        )
+        queries = _read_queries()
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in profiles:
+                path = Path(tmp) / f"{profile}.sqlite3"
+                self._copy_database(path, profile)
+                self._report(profile, *self._run(path, profile, queries, options))
+
+    def _copy_database(self, path, profile):
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        for statement in pragma_statements(PROFILES[profile]).split(";"):
+            if statement.strip():
+                target.execute(statement)
+        target.execute(
+            f"CREATE TABLE {SCRATCH_TABLE} (id INTEGER PRIMARY KEY, payload BLOB)"
+        )
+        target.commit()
+        target.close()
+
+    def _run(self, path, profile, queries, options):
+        pragmas = PROFILES[profile]
+        stop = threading.Event()
+        lock = threading.Lock()
+        read_latencies, write_durations = [], []
+        errors = 0
+
+        def reader():
+            nonlocal errors
+            conn = _connect(path, pragmas, options["busy_timeout"], read_only=True)
+            while not stop.is_set():
+                for sql, params in queries:
+                    started = time.perf_counter()
+                    try:
+                        conn.execute(sql, params).fetchall()
+                    except sqlite3.OperationalError:
+                        with lock:
+                            errors += 1
+                        continue
+                    with lock:
+                        read_latencies.append(time.perf_counter() - started)
+            conn.close()
+
+        def writer():
+            conn = _connect(path, pragmas, options["busy_timeout"])
+            while not stop.is_set():
+                started = time.perf_counter()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(f"DELETE FROM {SCRATCH_TABLE}")
+                conn.execute(
+                    f"WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+                    f"WHERE i < ?) INSERT INTO {SCRATCH_TABLE} "
+                    "SELECT i, randomblob(100) FROM n",
+                    [options["write_rows"]],
+                )
+                conn.execute("COMMIT")
+                write_durations.append(time.perf_counter() - started)
+            conn.close()
+
+        threads = [threading.Thread(target=writer)] + [
+            threading.Thread(target=reader) for _ in range(options["readers"])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return sorted(read_latencies), errors, write_durations
+
+    def _report(self, profile, latencies, errors, write_durations):
+        write_ms = (
+            sum(write_durations) / len(write_durations) * 1000
+            if write_durations
+            else 0.0
+        )
+        self.stdout.write(
+            f"{profile:<12} {len(latencies):>7} "
+            f"{percentile(latencies, 50) * 1000:>9.2f} "
+            f"{percentile(latencies, 95) * 1000:>9.2f} "
+            f"{percentile(latencies, 99) * 1000:>9.2f} "
+            f"{(latencies[-1] if latencies else 0) * 1000:>9.2f} "
+            f"{errors:>7} {len(write_durations):>7} {write_ms:>9.1f}"
+        )
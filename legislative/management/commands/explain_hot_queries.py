@@ -0,0 +1,49 @@
+"""
+Audit the query plans of every hot queryset against the current database.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from legislative.query_plans import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN QUERY PLAN on every queryset the app serves and flag full "
+        "scans, temp B-trees and missing index use"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--quiet",
+            action="store_true",
+            help="Only print failing queries and the summary",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("explain_hot_queries supports SQLite databases only.")
+
+        plans = audit()
+        for plan in plans:
+            if plan.passed and options["quiet"]:
+                continue
+            status = (
+                self.style.SUCCESS("PASS") if plan.passed else self.style.ERROR("FAIL")
+            )
+            self.stdout.write(f"{status}  {plan.query.name}")
+            for detail in plan.details:
+                self.stdout.write(f"        {detail}")
+            for finding in plan.expected:
+                self.stdout.write(
+                    f"      - {finding} (expected: {plan.query.allow[finding]})"
+                )
+            for finding in plan.problems:
+                self.stdout.write(self.style.WARNING(f"      ! {finding}"))
+
+        failed = [plan for plan in plans if not plan.passed]
+        summary = f"{len(plans) - len(failed)} passed, {len(failed)} failed"
+        if failed:
+            raise CommandError(f"Query plan audit failed: {summary}")
+        self.stdout.write(self.style.SUCCESS(f"Query plan audit: {summary}"))
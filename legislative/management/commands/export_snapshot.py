@@ -0,0 +1,25 @@
+"""
+Export the dataset as a memory-mapped snapshot for database-free serving.
+"""
+
+from django.core.management.base import BaseCommand
+
+from legislative.snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Write legislators, bills, votes and vote results as memory-mapped "
+        "arrays to SNAPSHOT_DIR and make them the current snapshot"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            dest="directory",
+            help="Snapshot root directory (defaults to settings.SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        path = export_snapshot(options.get("directory"))
+        self.stdout.write(self.style.SUCCESS(f"Exported snapshot {path}"))
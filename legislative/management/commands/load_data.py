@@ -2,14 +2,29 @@
 Load legislative data from CSV files with friendly validation errors.
 """
 
+import json
 import os
+import time
+from functools import partial
 
 import pandas as pd
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
 
-from legislative.models import Bill, Legislator, Vote, VoteResult
+from legislative import changes, metrics, replica, shadow
+from legislative.aggregates import refresh_vote_totals
+from legislative.documents import build_documents, render_pool
+from legislative.leaderboards import build_leaderboards
+from legislative.models import Bill, DatasetManifest, Legislator, Vote, VoteResult
+from legislative.parties import parse_names
+from legislative.search import rebuild_search_index
+from legislative.sources import CSV_FILES, REQUIRED_COLUMNS, file_sha256, source_path
+from legislative.validation import format_report, validate_sources
+
+MODELS = (Legislator, Bill, Vote, VoteResult)  # in CSV_FILES order
+PROGRESS_ROWS = 100_000  # vote results between progress reports
 
 
 class Command(BaseCommand):
@@ -18,6 +33,14 @@ class Command(BaseCommand):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.csv_path = getattr(settings, "CSV_DATA_PATH", "csv_data/")
+        self.using = DEFAULT_DB_ALIAS
+        # Optional progress(phase, rows_done) callback (see legislative.jobs);
+        # rows_done counts the CSV rows loaded so far.
+        self.progress = None
+        self.rows_done = 0
+        self.rows = {}
+        # Detail document render processes (None: DETAIL_DOCUMENT_WORKERS).
+        self.render_workers = None
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -25,38 +48,271 @@ class Command(BaseCommand):
             dest="csv_dir",
             help="Directory containing CSV files (defaults to settings.CSV_DATA_PATH)",
         )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--shadow",
+            action="store_true",
+            help=(
+                "Load into a copy of the database, validate it and atomically "
+                "swap it in while the live database keeps serving requests"
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Reload every file even if none changed since the last load",
+        )
+        mode.add_argument(
+            "--validate-only",
+            action="store_true",
+            help=(
+                "Check every CSV file and report all problems without "
+                "touching the database"
+            ),
+        )
+        parser.add_argument(
+            "--report",
+            help="With --validate-only, also write the report as JSON to REPORT",
+        )
+        mode.add_argument(
+            "--rollback",
+            action="store_true",
+            help="Swap the generation replaced by the last --shadow load back in",
+        )
 
     def handle(self, *args, **options):
+        if options.get("rollback"):
+            try:
+                restored = shadow.rollback()
+            except shadow.ShadowReloadError as e:
+                raise CommandError(str(e)) from e
+            self.stdout.write(self.style.SUCCESS(f"Rolled back to {restored}"))
+            self._sync_replica()
+            return
+
         csv_path = options.get("csv_dir") or self.csv_path
+        if options.get("validate_only"):
+            self._validate(csv_path, options.get("report"))
+            return
+        started = time.monotonic()
+        try:
+            self._report("checking sources")
+            sources, start = self._plan(csv_path, options.get("force"))
+            if start is None:
+                metrics.inc("load_data_runs_total", {"status": "unchanged"})
+                self.stdout.write(
+                    "No CSV file changed since the last load; nothing to do "
+                    "(use --force to reload)."
+                )
+                return
+            if start:
+                self.stdout.write(f"Unchanged, kept: {', '.join(CSV_FILES[:start])}")
+            if options.get("shadow"):
+                rows = self._shadow_load(csv_path, sources, start)
+            else:
+                rows = self._load(csv_path, sources, start)
+        except Exception:
+            metrics.inc("load_data_runs_total", {"status": "error"})
+            raise
+        else:
+            self.rows = rows
+            metrics.inc("load_data_runs_total", {"status": "success"})
+            for table, count in rows.items():
+                metrics.set_gauge("load_data_rows", count, {"table": table})
+            metrics.set_gauge("load_data_last_success_timestamp_seconds", time.time())
+        finally:
+            metrics.observe("load_data_duration_seconds", time.monotonic() - started)
+            metrics.store.flush(force=True)
+        self._sync_replica()
+
+    def _report(self, phase, rows_in_phase=0):
+        if self.progress is not None:
+            self.progress(phase, self.rows_done + rows_in_phase)
+
+    def _validate(self, csv_path, report_path=None):
+        started = time.monotonic()
+        problems = validate_sources(csv_path)
+        if report_path:
+            with open(report_path, "w") as f:
+                json.dump({"csv_dir": str(csv_path), "problems": problems}, f, indent=2)
+        elapsed = time.monotonic() - started
+        if problems:
+            self.stdout.write(format_report(problems))
+            raise CommandError(
+                f"{len(problems)} problem(s) in {csv_path} "
+                f"(checked in {elapsed:.2f}s); nothing was loaded."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"All CSV files in {csv_path} are valid ({elapsed:.2f}s)"
+            )
+        )
+
+    def _sync_replica(self):
+        """Refresh the read replica, when configured, with the new data."""
+        if replica.replica_path() is None:
+            return
+        self._report("replica")
         try:
-            with transaction.atomic():
-                self._clear_data()
+            duration = replica.sync()
+        except replica.ReplicaError as e:
+            raise CommandError(f"Data loaded but the replica is stale: {e}") from e
+        finally:
+            metrics.store.flush(force=True)
+        self.stdout.write(f"Synced replica in {duration:.2f}s")
 
-                self._load_legislators(csv_path)
-                self._load_bills(csv_path)
-                self._load_votes(csv_path)
-                self._load_vote_results(csv_path)
+    def _plan(self, csv_path, force=False):
+        """Fingerprint the CSV files; returns ``(sources, start)``.
 
+        ``start`` is the index in ``CSV_FILES`` of the first file whose
+        content differs from the last load (``None`` when none does). Files
+        before it are kept as loaded; it and every later file are reloaded,
+        since their rows reference it. A file whose size and mtime match the
+        manifest is not read; otherwise its hash decides, so a touched but
+        identical file still counts as unchanged.
+        """
+        manifest = (
+            DatasetManifest.objects.using(self.using)
+            .filter(pk=1)
+            .values("source_hashes", "source_stats")
+            .first()
+        ) or {"source_hashes": {}, "source_stats": {}}
+        sources, start = {}, None
+        for index, filename in enumerate(CSV_FILES):
+            try:
+                path = source_path(csv_path, filename)
+            except FileNotFoundError as e:
+                raise CommandError(f"CSV file not found: {e}") from e
+            stat = os.stat(path)
+            stats = {
+                "name": os.path.basename(path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            previous = manifest["source_hashes"].get(filename)
+            if previous and manifest["source_stats"].get(filename) == stats:
+                sha256 = previous
+            else:
+                sha256 = file_sha256(path)
+            sources[filename] = {"sha256": sha256, **stats}
+            if start is None and (force or sha256 != previous):
+                start = index
+        return sources, start
+
+    def _shadow_load(self, csv_path, sources, start=0):
+        """``_load`` into a shadow copy, then validate and swap it in."""
+        try:
+            with shadow.shadow_database() as (alias, path):
+                self.using = alias
+                try:
+                    rows = self._load(csv_path, sources, start)
+                finally:
+                    self.using = DEFAULT_DB_ALIAS
+                problems = shadow.validate(alias)
+                if problems:
+                    raise CommandError(
+                        "Shadow database failed validation, live data unchanged: "
+                        + "; ".join(problems)
+                    )
+                shadow.promote(path)
+        except shadow.ShadowReloadError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(self.style.SUCCESS(f"Swapped in {path}"))
+        return rows
+
+    def _load(self, csv_path, sources, start=0):
+        """Replace the data of ``CSV_FILES[start:]`` from ``csv_path``;
+        returns row counts per table."""
+        loaders = (
+            self._load_legislators,
+            self._load_bills,
+            self._load_votes,
+            self._load_vote_results,
+        )
+        try:
+            # Render workers are forked before the transaction opens.
+            with (
+                render_pool(self.render_workers) as pool,
+                transaction.atomic(using=self.using),
+            ):
+                before = changes.fingerprint(self.using)
+                self._clear_data(start)
+
+                for filename, load in zip(CSV_FILES[start:], loaders[start:]):
+                    self._report(filename)
+                    self.rows_done += load(csv_path)
+                for phase, step in (
+                    ("vote totals", refresh_vote_totals),
+                    ("search index", rebuild_search_index),
+                    ("detail documents", partial(build_documents, pool=pool)),
+                    ("leaderboards", build_leaderboards),
+                ):
+                    self._report(phase)
+                    step(self.using)
+
+                rows = {
+                    "legislators": Legislator.objects.using(self.using).count(),
+                    "bills": Bill.objects.using(self.using).count(),
+                    "votes": Vote.objects.using(self.using).count(),
+                    "vote_results": VoteResult.objects.using(self.using).count(),
+                }
+                manifest = self._write_manifest(rows, sources)
+                self._report("change log")
+                counts = changes.record_changes(before, manifest, self.using)
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f"Loaded: {Legislator.objects.count()} legislators, "
-                        f"{Bill.objects.count()} bills, {Vote.objects.count()} votes, "
-                        f"{VoteResult.objects.count()} vote results"
+                        f"Loaded: {rows['legislators']} legislators, "
+                        f"{rows['bills']} bills, {rows['votes']} votes, "
+                        f"{rows['vote_results']} vote results"
                     )
                 )
+                self.stdout.write(
+                    f"Changes in version {manifest.version}: "
+                    f"{counts['insert']} inserted, {counts['update']} updated, "
+                    f"{counts['delete']} deleted"
+                )
+                return rows
         except FileNotFoundError as e:
             raise CommandError(f"CSV file not found: {e}") from e
         except pd.errors.EmptyDataError as e:
             raise CommandError("One of the CSV files is empty or invalid.") from e
 
-    def _clear_data(self):
-        VoteResult.objects.all().delete()
-        Vote.objects.all().delete()
-        Bill.objects.all().delete()
-        Legislator.objects.all().delete()
+    def _clear_data(self, start=0):
+        """Delete the tables of ``CSV_FILES[start:]``, dependents first."""
+        for model in reversed(MODELS[start:]):
+            model.objects.using(self.using).all().delete()
+
+    def _write_manifest(self, rows, sources):
+        """Bump the dataset version and record what was loaded; returns the
+        manifest."""
+        manifest, _ = (
+            DatasetManifest.objects.using(self.using)
+            .select_for_update()
+            .get_or_create(pk=1)
+        )
+        manifest.version += 1
+        manifest.loaded_at = timezone.now()
+        for field in DatasetManifest.COUNT_FIELDS:
+            setattr(manifest, field, rows[field])
+        manifest.source_hashes = {
+            filename: source["sha256"] for filename, source in sources.items()
+        }
+        manifest.source_stats = {
+            filename: {key: value for key, value in source.items() if key != "sha256"}
+            for filename, source in sources.items()
+        }
+        manifest.save(using=self.using)
+        return manifest
+
+    def _read_csv(self, csv_path, filename):
+        # pandas picks the decompressor from the suffix and streams through it.
+        try:
+            return pd.read_csv(source_path(csv_path, filename))
+        except ImportError as e:
+            raise CommandError(f"Cannot decompress {filename}: {e}") from e
 
-    def _require_columns(self, df: pd.DataFrame, required: list[str], filename: str):
-        missing = [c for c in required if c not in df.columns]
+    def _require_columns(self, df: pd.DataFrame, filename: str):
+        missing = [c for c in REQUIRED_COLUMNS[filename] if c not in df.columns]
         if missing:
             raise CommandError(
                 f"Missing required columns in {filename}: {', '.join(missing)}"
@@ -64,21 +320,32 @@ class Command(BaseCommand):
 
     def _load_legislators(self, csv_path: str):
         filename = "legislators.csv"
-        df = pd.read_csv(os.path.join(csv_path, filename))
-        self._require_columns(df, ["id", "name"], filename)
+        df = self._read_csv(csv_path, filename)
+        self._require_columns(df, filename)
+        df = df.join(parse_names(df["name"]))
         legislators = [
-            Legislator(id=row["id"], name=row["name"]) for _, row in df.iterrows()
+            Legislator(
+                id=row.id,
+                name=row.name,
+                party=row.party,
+                state=row.state,
+                district=row.district,
+            )
+            for row in df.itertuples(index=False)
         ]
-        Legislator.objects.bulk_create(legislators)
+        Legislator.objects.using(self.using).bulk_create(legislators)
+        return len(legislators)
 
     def _load_bills(self, csv_path: str):
         filename = "bills.csv"
-        df = pd.read_csv(os.path.join(csv_path, filename))
-        self._require_columns(df, ["id", "title", "sponsor_id"], filename)
+        df = self._read_csv(csv_path, filename)
+        self._require_columns(df, filename)
         bills = []
         for _, row in df.iterrows():
             try:
-                primary_sponsor = Legislator.objects.get(id=row["sponsor_id"])
+                primary_sponsor = Legislator.objects.using(self.using).get(
+                    id=row["sponsor_id"]
+                )
             except Legislator.DoesNotExist as e:
                 raise CommandError(
                     f"Primary sponsor with id={row['sponsor_id']} not found (from {filename})."
@@ -86,39 +353,43 @@ class Command(BaseCommand):
             bills.append(
                 Bill(id=row["id"], title=row["title"], primary_sponsor=primary_sponsor)
             )
-        Bill.objects.bulk_create(bills)
+        Bill.objects.using(self.using).bulk_create(bills)
+        return len(bills)
 
     def _load_votes(self, csv_path: str):
         filename = "votes.csv"
-        df = pd.read_csv(os.path.join(csv_path, filename))
-        self._require_columns(df, ["id", "bill_id"], filename)
+        df = self._read_csv(csv_path, filename)
+        self._require_columns(df, filename)
         votes = []
         for _, row in df.iterrows():
             try:
-                bill = Bill.objects.get(id=row["bill_id"])
+                bill = Bill.objects.using(self.using).get(id=row["bill_id"])
             except Bill.DoesNotExist as e:
                 raise CommandError(
                     f"Bill with id={row['bill_id']} not found (from {filename})."
                 ) from e
             votes.append(Vote(id=row["id"], bill=bill))
-        Vote.objects.bulk_create(votes)
+        Vote.objects.using(self.using).bulk_create(votes)
+        return len(votes)
 
     def _load_vote_results(self, csv_path: str):
         filename = "vote_results.csv"
-        df = pd.read_csv(os.path.join(csv_path, filename))
-        self._require_columns(
-            df, ["id", "legislator_id", "vote_id", "vote_type"], filename
-        )
+        df = self._read_csv(csv_path, filename)
+        self._require_columns(df, filename)
         vote_results = []
-        for _, row in df.iterrows():
+        for position, (_, row) in enumerate(df.iterrows(), 1):
+            if position % PROGRESS_ROWS == 0:
+                self._report(filename, position)
             try:
-                legislator = Legislator.objects.get(id=row["legislator_id"])
+                legislator = Legislator.objects.using(self.using).get(
+                    id=row["legislator_id"]
+                )
             except Legislator.DoesNotExist as e:
                 raise CommandError(
                     f"Legislator with id={row['legislator_id']} not found (from {filename})."
                 ) from e
             try:
-                vote = Vote.objects.get(id=row["vote_id"])
+                vote = Vote.objects.using(self.using).get(id=row["vote_id"])
             except Vote.DoesNotExist as e:
                 raise CommandError(
                     f"Vote with id={row['vote_id']} not found (from {filename})."
@@ -136,4 +407,5 @@ class Command(BaseCommand):
                     vote_type=vt,
                 )
             )
-        VoteResult.objects.bulk_create(vote_results)
+        VoteResult.objects.using(self.using).bulk_create(vote_results)
+        return len(vote_results)
@@ -0,0 +1,261 @@
+"""
+Replay recorded traffic against the WSGI application to size deployments.
+
+The request log is JSON lines with ``path`` and optionally ``method``,
+``query`` and ``weight``; the lines ``ServerTimingMiddleware`` writes to the
+``legislative.performance`` logger work as-is. GET/HEAD requests resolving
+to a route in ``legislative.urls`` are replayed in proportion to how often
+they were recorded, either against the WSGI application in-process or
+against a running server (``--url``), from a pool of threads or processes.
+DB queries per request are read from the ``Server-Timing`` header.
+"""
+
+import json
+import logging
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from legislative.benchmarking import (
+    db_queries_from_server_timing,
+    percentile,
+    wsgi_environ,
+)
+
+REPLAYED_METHODS = ("GET", "HEAD")
+
+_application = None
+
+
+def load_mix(log_path, urlconf="legislative.urls"):
+    """Weighted request mix from a JSON lines log.
+
+    Returns ``({(method, path, query, route): weight}, skipped)`` where
+    ``skipped`` counts lines that are not JSON objects with a ``path``, use
+    another method or resolve to no route.
+    """
+    mix = Counter()
+    skipped = 0
+    with open(log_path) as log:
+        for line in log:
+            try:
+                entry = json.loads(line)
+                path = entry["path"]
+                method = entry.get("method", "GET").upper()
+                weight = float(entry.get("weight", 1))
+            except (ValueError, TypeError, KeyError, AttributeError):
+                skipped += 1
+                continue
+            if method not in REPLAYED_METHODS:
+                skipped += 1
+                continue
+            try:
+                match = resolve(path, urlconf)
+            except Resolver404:
+                skipped += 1
+                continue
+            route = match.url_name or match.route
+            mix[(method, path, entry.get("query", ""), route)] += weight
+    return mix, skipped
+
+
+def _get_application():
+    global _application
+    if _application is None:
+        from core.wsgi import application
+
+        _application = application
+    return _application
+
+
+def _send_inprocess(method, path, query):
+    started_response = []
+    body = _get_application()(
+        wsgi_environ(path, query, method),
+        lambda status, headers: started_response.append((status, headers)),
+    )
+    try:
+        for _chunk in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    status, headers = started_response[0]
+    server_timing = next((v for k, v in headers if k.lower() == "server-timing"), None)
+    return int(status.split()[0]), server_timing
+
+
+def _send_http(base_url, method, path, query):
+    url = base_url.rstrip("/") + path + (f"?{query}" if query else "")
+    request = urllib.request.Request(url, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            return response.status, response.headers.get("Server-Timing")
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, e.headers.get("Server-Timing")
+
+
+def run_share(base_url, requests):
+    """Send ``requests`` one after another (one simulated client).
+
+    Returns ``(route, latency, status, db_queries)`` per request; ``status``
+    is 0 when the request raised.
+    """
+    results = []
+    for method, path, query, route in requests:
+        started = time.perf_counter()
+        try:
+            if base_url:
+                status, server_timing = _send_http(base_url, method, path, query)
+            else:
+                status, server_timing = _send_inprocess(method, path, query)
+        except Exception:
+            status, server_timing = 0, None
+        results.append(
+            (
+                route,
+                time.perf_counter() - started,
+                status,
+                db_queries_from_server_timing(server_timing),
+            )
+        )
+    return results
+
+
+def summarize(results):
+    """Latency percentiles (ms), error count and DB queries for ``results``."""
+    latencies = sorted(latency for _, latency, _, _ in results)
+    queries = [q for _, _, _, q in results if q is not None]
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, _, status, _ in results if not 0 < status < 400),
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "db_queries": sum(queries) / len(queries) if queries else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a recorded request log against the WSGI app (in-process or a "
+        "local server) and report throughput, latency, errors and DB queries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "log",
+            help="JSON lines request log (e.g. the legislative.performance log)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Requests to send in total (default: 1000)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Concurrent clients, one pool worker each (default: 8)",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run clients in threads or processes (default: thread)",
+        )
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server; omit to call the WSGI app in-process",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed for the request order (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        try:
+            mix, skipped = load_mix(options["log"])
+        except OSError as e:
+            raise CommandError(f"Cannot read request log: {e}") from e
+        if not mix:
+            raise CommandError("The request log has no replayable requests.")
+
+        rng = random.Random(options["seed"])
+        plan = rng.choices(list(mix), weights=list(mix.values()), k=options["requests"])
+        shares = [
+            plan[i :: options["concurrency"]] for i in range(options["concurrency"])
+        ]
+        shares = [share for share in shares if share]
+
+        self.stdout.write(
+            f"Replaying {len(plan)} requests over {len(mix)} distinct requests "
+            f"({skipped} log lines skipped) with {len(shares)} "
+            f"{options['pool']} clients against {options['url'] or 'in-process WSGI'}"
+        )
+        if options["pool"] == "process":
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+            executor_class = ProcessPoolExecutor
+        else:
+            executor_class = ThreadPoolExecutor
+        if not options["url"]:
+            # Loading core.wsgi runs django.setup(), which reconfigures logging.
+            _get_application()
+        # One JSON log line per replayed request would drown the report.
+        performance_logger = logging.getLogger("legislative.performance")
+        log_level = performance_logger.level
+        performance_logger.setLevel(logging.WARNING)
+        started = time.perf_counter()
+        try:
+            with executor_class(max_workers=len(shares)) as pool:
+                futures = [pool.submit(run_share, options["url"], s) for s in shares]
+                results = [r for future in futures for r in future.result()]
+        finally:
+            performance_logger.setLevel(log_level)
+        elapsed = time.perf_counter() - started
+
+        self._report(results, elapsed)
+
+    def _report(self, results, elapsed):
+        total = summarize(results)
+        self.stdout.write(
+            f"Throughput: {len(results) / elapsed:.1f} req/s ({elapsed:.2f}s)\n"
+            f"Latency ms: p50 {total['p50']:.2f}  p95 {total['p95']:.2f}  "
+            f"p99 {total['p99']:.2f}\n"
+            f"Errors: {total['errors']} ({total['errors'] / len(results):.1%})\n"
+            f"DB queries/request: {self._format_queries(total['db_queries'])}"
+        )
+
+        by_route = defaultdict(list)
+        for result in results:
+            by_route[result[0]].append(result)
+        self.stdout.write(
+            f"\n{'route':<24} {'requests':>8} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'errors':>7} {'queries':>8}"
+        )
+        for route, route_results in sorted(by_route.items()):
+            stats = summarize(route_results)
+            self.stdout.write(
+                f"{route:<24} {stats['requests']:>8} {stats['p50']:>9.2f} "
+                f"{stats['p95']:>9.2f} {stats['p99']:>9.2f} {stats['errors']:>7} "
+                f"{self._format_queries(stats['db_queries']):>8}"
+            )
+
+    @staticmethod
+    def _format_queries(value):
+        return "n/a" if value is None else f"{value:.1f}"
@@ -0,0 +1,50 @@
+"""
+Refresh the read replica (``SQLITE_REPLICA_PATH``) from the primary database.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from legislative import metrics, replica
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the read replica"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help=(
+                "Keep running and sync every INTERVAL seconds; failed syncs "
+                "are reported and retried at the next interval"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        interval = options.get("interval")
+        if interval is not None and interval <= 0:
+            raise CommandError("--interval must be positive.")
+        if replica.replica_path() is None:
+            raise CommandError("SQLITE_REPLICA_PATH is not set.")
+        while True:
+            try:
+                duration = replica.sync()
+            except replica.ReplicaError as e:
+                # One failure (e.g. the primary locked by a load) must not
+                # stop the loop; sync() has counted it in the metrics.
+                if interval is None:
+                    raise CommandError(str(e)) from e
+                self.stderr.write(self.style.ERROR(f"Replica sync failed: {e}"))
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Synced replica {replica.replica_path()} in {duration:.2f}s"
+                    )
+                )
+            finally:
+                metrics.store.flush(force=True)
+            if interval is None:
+                return
+            time.sleep(interval)
@@ -0,0 +1,381 @@
+"""
+In-process metrics exported in the Prometheus text format at ``/metrics``.
+
+Each process aggregates counters, gauges and histograms in memory (a dict
+update under a lock per observation) and, when ``METRICS_DIR`` is set,
+periodically writes a snapshot to ``<METRICS_DIR>/<pid>-<start>.json``
+(atomic rename, at most every ``METRICS_FLUSH_INTERVAL`` seconds). An update
+within the interval schedules a write at its end, so the file is never
+older than the interval even if no further update comes, and the snapshot
+is written once more when the process exits. A scrape
+merges the snapshots of every process: counters and histograms are summed,
+gauges take the most recently written value. This covers multi-worker
+servers and the separate ``load_data`` process.
+
+A scrape also folds the files of exited processes into ``retired.json`` and
+deletes them, so files do not pile up across restarts and counters never go
+backwards. The start time in the file name keeps a new process that reuses
+a PID from overwriting the file of the one that exited.
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LOAD_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+
+class Metric:
+    """Definition of an exported metric."""
+
+    def __init__(self, kind, help_text, buckets=None):
+        self.kind = kind
+        self.help_text = help_text
+        self.buckets = buckets
+
+
+METRICS = {
+    "http_requests_total": Metric("counter", "HTTP requests served."),
+    "http_request_duration_seconds": Metric(
+        "histogram", "Time to serve a request.", DURATION_BUCKETS
+    ),
+    "http_response_size_bytes": Metric(
+        "histogram", "Response body size as sent.", SIZE_BUCKETS
+    ),
+    "http_request_db_queries": Metric(
+        "histogram", "Database queries run per request.", QUERY_BUCKETS
+    ),
+    "cache_requests_total": Metric(
+        "counter", "Cache lookups by cache and result (hit/miss)."
+    ),
+    "load_data_runs_total": Metric("counter", "load_data runs by status."),
+    "load_data_duration_seconds": Metric(
+        "histogram", "Duration of load_data runs.", LOAD_BUCKETS
+    ),
+    "load_data_rows": Metric("gauge", "Rows loaded by the last load_data run."),
+    "load_data_last_success_timestamp_seconds": Metric(
+        "gauge", "Unix time of the last successful load_data run."
+    ),
+    "replica_syncs_total": Metric("counter", "Read replica syncs by status."),
+    "replica_last_sync_timestamp_seconds": Metric(
+        "gauge", "Unix time of the last successful read replica sync."
+    ),
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class MetricsStore:
+    """Metrics of the current process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+        self.flush_lock = threading.Lock()
+        self._timer = None
+        self._pid = None
+        self._file_name = None
+
+    @property
+    def file_name(self):
+        """``<pid>-<start>.json``; new after a fork."""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid, self._file_name = pid, f"{pid}-{time.time_ns()}.json"
+        return self._file_name
+
+    def inc(self, name, labels=None, value=1):
+        key = _key(name, labels or {})
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, labels=None, value=0):
+        key = _key(name, labels or {})
+        with self.lock:
+            self.gauges[key] = (value, time.time())
+
+    def observe(self, name, value, labels=None):
+        buckets = METRICS[name].buckets
+        key = _key(name, labels or {})
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [[n, dict(lb), v] for (n, lb), v in self.counters.items()],
+                "gauges": [
+                    [n, dict(lb), v, ts] for (n, lb), (v, ts) in self.gauges.items()
+                ],
+                "histograms": [
+                    [n, dict(lb), list(h[0]), h[1], h[2]]
+                    for (n, lb), h in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        """Write this process' snapshot to ``METRICS_DIR`` (rate limited).
+
+        A call within ``METRICS_FLUSH_INTERVAL`` of the last write schedules
+        one write at the end of the interval instead.
+        """
+        directory = getattr(settings, "METRICS_DIR", None)
+        if not directory:
+            return
+        with self.flush_lock:
+            now = time.monotonic()
+            wait = self.last_flush + settings.METRICS_FLUSH_INTERVAL - now
+            if not force and wait > 0:
+                self._schedule(wait, directory)
+                return
+            self.last_flush = now
+        self._write(directory)
+
+    def _schedule(self, delay, directory):
+        # A forked child sees the parent's timer as not alive.
+        if self._timer is not None and self._timer.is_alive():
+            return
+        self._timer = threading.Timer(delay, self._scheduled_write, [directory])
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _scheduled_write(self, directory):
+        with self.flush_lock:
+            self.last_flush = time.monotonic()
+        self._write(directory)
+
+    def _write(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_json(directory / self.file_name, self.snapshot())
+
+    def is_empty(self):
+        with self.lock:
+            return not (self.counters or self.gauges or self.histograms)
+
+
+store = MetricsStore()
+
+
+@atexit.register
+def _flush_at_exit():
+    """Write what was recorded since the last flush before the process ends."""
+    if _enabled() and not store.is_empty():
+        store.flush(force=True)
+
+
+RETIRED_FILE = "retired.json"
+
+
+def _write_json(path, data):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(data))
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_of(path):
+    try:
+        return int(path.stem.split("-")[0])
+    except ValueError:
+        return None  # retired.json
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _locked(directory):
+    with open(directory / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def retire_exited(directory):
+    """Fold the snapshots of exited processes into ``retired.json``."""
+    directory = Path(directory)
+    with _locked(directory):
+        exited = [
+            path
+            for path in directory.glob("*.json")
+            if (pid := _pid_of(path)) is not None and not _alive(pid)
+        ]
+        if not exited:
+            return
+        snapshots = [_read_json(path) for path in [directory / RETIRED_FILE, *exited]]
+        merged = _merge(snapshot for snapshot in snapshots if snapshot)
+        _write_json(directory / RETIRED_FILE, _as_snapshot(*merged))
+        for path in exited:
+            path.unlink(missing_ok=True)
+
+
+def _enabled():
+    return getattr(settings, "METRICS_ENABLED", True)
+
+
+def inc(name, labels=None, value=1):
+    if _enabled():
+        store.inc(name, labels, value)
+        store.flush()
+
+
+def set_gauge(name, value, labels=None):
+    if _enabled():
+        store.set(name, labels, value)
+        store.flush()
+
+
+def observe(name, value, labels=None):
+    if _enabled():
+        store.observe(name, value, labels)
+        store.flush()
+
+
+def record_request(request, response, db_queries, duration):
+    """Record one served request (called by ``ServerTimingMiddleware``)."""
+    if not _enabled():
+        return
+    match = getattr(request, "resolver_match", None)
+    route = (match.url_name or match.route) if match else "unmatched"
+    store.inc(
+        "http_requests_total",
+        {"route": route, "method": request.method, "status": str(response.status_code)},
+    )
+    store.observe(
+        "http_request_duration_seconds",
+        duration,
+        {"route": route, "method": request.method},
+    )
+    store.observe("http_request_db_queries", db_queries, {"route": route})
+    if not response.streaming:
+        store.observe(
+            "http_response_size_bytes", len(response.content), {"route": route}
+        )
+    store.flush()
+
+
+def collect():
+    """Merge the snapshots of every process (this one always fresh)."""
+    own = store.snapshot()
+    snapshots = [own]
+    directory = getattr(settings, "METRICS_DIR", None)
+    if directory and Path(directory).is_dir():
+        store.flush(force=True)
+        retire_exited(directory)
+        for path in Path(directory).glob("*.json"):
+            if path.name == store.file_name:
+                continue
+            snapshot = _read_json(path)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+    return _merge(snapshots)
+
+
+def _merge(snapshots):
+    """``(counters, gauges, histograms)`` summed over ``snapshots``."""
+    counters, gauges, histograms = {}, {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = _key(name, labels)
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, value, ts in snapshot["gauges"]:
+            key = _key(name, labels)
+            if key not in gauges or gauges[key][1] < ts:
+                gauges[key] = (value, ts)
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+            key = _key(name, labels)
+            if key not in histograms:
+                histograms[key] = [[0] * len(buckets), 0.0, 0]
+            merged = histograms[key]
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+    return counters, gauges, histograms
+
+
+def _as_snapshot(counters, gauges, histograms):
+    return {
+        "counters": [[n, dict(lb), v] for (n, lb), v in counters.items()],
+        "gauges": [[n, dict(lb), v, ts] for (n, lb), (v, ts) in gauges.items()],
+        "histograms": [[n, dict(lb), *h] for (n, lb), h in histograms.items()],
+    }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """Render all merged metrics in the Prometheus text exposition format."""
+    counters, gauges, histograms = collect()
+    lines = []
+    for name, metric in METRICS.items():
+        if metric.kind == "counter":
+            series = sorted((k, v) for k, v in counters.items() if k[0] == name)
+        elif metric.kind == "gauge":
+            series = sorted((k, v[0]) for k, v in gauges.items() if k[0] == name)
+        else:
+            series = sorted((k, v) for k, v in histograms.items() if k[0] == name)
+        lines.append(f"# HELP {name} {metric.help_text}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for (_, labels), value in series:
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            buckets, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(metric.buckets, buckets):
+                cumulative += bucket_count
+                bucket_labels = _format_labels((*labels, ("le", str(bound))))
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels((*labels, ("le", "+Inf")))
+            lines.append(f"{name}_bucket{inf_labels} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,261 @@
+"""
+Middleware for the legislative app.
+"""
+
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import reverse
+
+from . import metrics, precompressed, profiling, snapshot
+from .instrumentation import collect_timings
+from .models import DatasetManifest
+from .nplusone import detect_n_plus_one
+
+performance_logger = logging.getLogger("legislative.performance")
+
+
+class ServerTimingMiddleware:
+    """Measure each request and report it as ``Server-Timing`` and a log line.
+
+    Reports DB query count and time, serializer time, template render time
+    and total time, and feeds the request metrics (see ``metrics``). The
+    header is controlled by ``SERVER_TIMING_HEADER``; the JSON log line goes
+    to the ``legislative.performance`` logger at INFO.
+    Should be the first entry in ``MIDDLEWARE`` so ``total`` covers the
+    whole stack. Works natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.add_header = getattr(settings, "SERVER_TIMING_HEADER", True)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with collect_timings() as timings:
+            response = self.get_response(request)
+            self._report(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        with collect_timings() as timings:
+            response = await self.get_response(request)
+            self._report(request, response, timings)
+        return response
+
+    def _report(self, request, response, timings):
+        total = timings.total()
+        metrics.record_request(request, response, timings.db_queries, total)
+        if self.add_header:
+            response["Server-Timing"] = timings.server_timing(total)
+        if performance_logger.isEnabledFor(logging.INFO):
+            record = {"method": request.method, "path": request.path}
+            if request.META.get("QUERY_STRING"):
+                record["query"] = request.META["QUERY_STRING"]
+            record["status"] = response.status_code
+            record.update(timings.as_dict(total))
+            performance_logger.info(json.dumps(record))
+
+
+class NPlusOneMiddleware:
+    """Track repeated query shapes for each request (see ``nplusone``).
+
+    ``NPLUSONE_MODE`` is read per request: ``"log"`` warns with the code
+    location, ``"raise"`` fails the request (development and tests).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with detect_n_plus_one(label=f"{request.method} {request.path}"):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with detect_n_plus_one(label=f"{request.method} {request.path}"):
+            return await self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """Profile requests on demand or by sampling (see ``profiling``).
+
+    An authorized ``?__profile=`` request gets an ``X-Profile`` header
+    pointing at its capture. Must come after ``AuthenticationMiddleware``.
+
+    Requests served by the ASGI handler are never profiled: cProfile and the
+    stack sampler only see the thread they start on, which there is the
+    event loop, while sync views and their queries run in executor threads
+    and other requests interleave on the loop. A capture would miss the view
+    and include unrelated requests, so an authorized ``?__profile=`` gets an
+    ``X-Profile-Error`` header instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        fmt = profiling.requested_format(request)
+        if fmt is not None and not profiling.is_authorized(request, request.user):
+            fmt = None
+        trigger = self._trigger(request, fmt)
+        if trigger is None:
+            return self.get_response(request)
+        with profiling.profile(
+            fmt or settings.PROFILING_SAMPLE_FORMAT, trigger
+        ) as capture:
+            request.profiling = capture is not None
+            response = self.get_response(request)
+        return self._finish(request, response, capture)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if profiling.requested_format(request) is not None and (
+            profiling.is_authorized(request, await request.auser())
+        ):
+            response["X-Profile-Error"] = (
+                "Profiling is not available under ASGI; use the WSGI server."
+            )
+        return response
+
+    @staticmethod
+    def _trigger(request, fmt):
+        if fmt is not None:
+            return "on-demand"
+        return "sampled" if profiling.sampled(request) else None
+
+    @staticmethod
+    def _finish(request, response, capture):
+        if capture is None:
+            return response
+        capture.save(request, response)
+        if capture.trigger == "on-demand":
+            response["X-Profile"] = reverse("profile_detail", args=[capture.id])
+        return response
+
+
+class PrecompressedResponseMiddleware:
+    """Serve cacheable JSON responses from the pre-compressed store.
+
+    Applies to GET/HEAD requests resolving to a URL name listed in
+    ``settings.PRECOMPRESSED_URL_NAMES`` whose query parameters are all
+    cacheable (see ``precompressed.cache_key``). A miss runs the view
+    normally and stores the rendered body (identity plus every codec) for
+    the current dataset version; a hit skips the view and serializer
+    entirely.
+    Should be the last entry in ``MIDDLEWARE`` so other ``process_view``
+    hooks still run before a hit short-circuits the view. Profiled requests
+    always run the view. Works natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.url_names = set(getattr(settings, "PRECOMPRESSED_URL_NAMES", []))
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django awaits a coroutine process_view instead of running the
+            # sync one in a thread.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        key = getattr(request, "_precompressed_key", None)
+        if key is None or not self._is_cacheable(response):
+            return response
+        return precompressed.store_entry(key, response).response_for(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        key = getattr(request, "_precompressed_key", None)
+        if key is None or not self._is_cacheable(response):
+            return response
+        entry = await precompressed.astore_entry(key, response)
+        return entry.response_for(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._applies(request):
+            return None
+        version = self._snapshot_version(request)
+        if version is None:
+            version = DatasetManifest.current_version()
+        key = precompressed.cache_key(request, version)
+        if key is None:
+            return None
+        return self._lookup(request, key, precompressed.get_entry(key))
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if not self._applies(request):
+            return None
+        version = self._snapshot_version(request)
+        if version is None:
+            version = await DatasetManifest.acurrent_version()
+        key = precompressed.cache_key(request, version)
+        if key is None:
+            return None
+        return self._lookup(request, key, await precompressed.aget_entry(key))
+
+    def _applies(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and not getattr(request, "profiling", False)
+            and request.resolver_match.url_name in self.url_names
+        )
+
+    @staticmethod
+    def _snapshot_version(request):
+        """Version of the snapshot answering this route, if one does."""
+        if request.resolver_match.url_name not in snapshot.URL_NAMES:
+            return None
+        current = snapshot.current()
+        return None if current is None else current.version
+
+    @staticmethod
+    def _lookup(request, key, entry):
+        labels = {
+            "cache": "precompressed",
+            "result": "miss" if entry is None else "hit",
+        }
+        metrics.inc("cache_requests_total", labels)
+        if entry is None:
+            request._precompressed_key = key
+            return None
+        return entry.response_for(request)
+
+    @staticmethod
+    def _is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.has_header("Content-Encoding")
+            and response.get("Content-Type", "").startswith("application/json")
+        )
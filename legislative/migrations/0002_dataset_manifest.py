@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetManifest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Incremented on every successful load"
+                    ),
+                ),
+                (
+                    "loaded_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the current dataset was loaded",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "legislative_dataset_manifest",
+            },
+        ),
+    ]
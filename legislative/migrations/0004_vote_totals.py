@@ -0,0 +1,107 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# VoteResult.VoteType values at the time of this migration.
+YEA, NAY = "1", "2"
+
+
+def compute_existing_totals(apps, schema_editor):
+    # legislative.aggregates.refresh_vote_totals, on the historical models.
+    Bill = apps.get_model("legislative", "Bill")
+    Legislator = apps.get_model("legislative", "Legislator")
+    VoteResult = apps.get_model("legislative", "VoteResult")
+    db = schema_editor.connection.alias
+
+    def vote_count(group_by, vote_type, **filters):
+        counts = (
+            VoteResult.objects.using(db)
+            .filter(vote_type=vote_type, **filters)
+            .order_by()
+            .values(group_by)
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    Legislator.objects.using(db).update(
+        supported_bills_total=vote_count("legislator", YEA, legislator=OuterRef("pk")),
+        opposed_bills_total=vote_count("legislator", NAY, legislator=OuterRef("pk")),
+    )
+    Bill.objects.using(db).update(
+        supporters_total=vote_count("vote__bill", YEA, vote__bill=OuterRef("pk")),
+        opposers_total=vote_count("vote__bill", NAY, vote__bill=OuterRef("pk")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0003_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bill",
+            name="opposers_total",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Nay votes received, precomputed by load_data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="bill",
+            name="supporters_total",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Yea votes received, precomputed by load_data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="legislator",
+            name="opposed_bills_total",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Nay votes cast, precomputed by load_data",
+            ),
+        ),
+        migrations.AddField(
+            model_name="legislator",
+            name="supported_bills_total",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Yea votes cast, precomputed by load_data",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bill",
+            index=models.Index(
+                fields=["supporters_total"], name="legislative_support_843955_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bill",
+            index=models.Index(
+                fields=["opposers_total"], name="legislative_opposer_c67bb6_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legislator",
+            index=models.Index(
+                fields=["supported_bills_total"], name="legislative_support_d9fd96_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legislator",
+            index=models.Index(
+                fields=["opposed_bills_total"], name="legislative_opposed_9ef725_idx"
+            ),
+        ),
+        migrations.RunPython(compute_existing_totals, migrations.RunPython.noop),
+    ]
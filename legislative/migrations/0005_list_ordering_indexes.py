@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0004_vote_totals"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bill",
+            index=models.Index(fields=["title"], name="legislative_title_49fbc7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="legislator",
+            index=models.Index(fields=["name"], name="legislative_name_10e96a_idx"),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0005_list_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BillDocument",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("body", models.BinaryField()),
+                ("has_next", models.BooleanField(default=False)),
+            ],
+            options={
+                "db_table": "legislative_bill_document",
+            },
+        ),
+        migrations.CreateModel(
+            name="LegislatorDocument",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("body", models.BinaryField()),
+                ("has_next", models.BooleanField(default=False)),
+            ],
+            options={
+                "db_table": "legislative_legislator_document",
+            },
+        ),
+    ]
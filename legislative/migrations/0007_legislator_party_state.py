@@ -0,0 +1,76 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:39
+
+import re
+
+from django.db import migrations, models
+
+# legislative.parties.NAME_PATTERN at the time of this migration.
+NAME_RE = re.compile(
+    r"\((?P<party>[A-Z]{1,3})-(?P<state>[A-Z]{2})(?:-(?P<district>\d{1,2}|AL))?\)\s*$"
+)
+
+
+def parse_existing_names(apps, schema_editor):
+    Legislator = apps.get_model("legislative", "Legislator")
+    db = schema_editor.connection.alias
+    legislators = list(Legislator.objects.using(db).only("id", "name"))
+    for legislator in legislators:
+        match = NAME_RE.search(legislator.name)
+        if match:
+            legislator.party = match["party"]
+            legislator.state = match["state"]
+            legislator.district = match["district"] or ""
+    Legislator.objects.using(db).bulk_update(
+        legislators, ["party", "state", "district"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0006_detail_documents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="legislator",
+            name="district",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="District parsed from the name, e.g. '2' (blank for senators)",
+                max_length=3,
+            ),
+        ),
+        migrations.AddField(
+            model_name="legislator",
+            name="party",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Party code parsed from the name, e.g. 'R' (blank if unknown)",
+                max_length=3,
+            ),
+        ),
+        migrations.AddField(
+            model_name="legislator",
+            name="state",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="State code parsed from the name, e.g. 'NE' (blank if unknown)",
+                max_length=2,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legislator",
+            index=models.Index(fields=["party"], name="legislative_party_203820_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="legislator",
+            index=models.Index(
+                fields=["state", "district"], name="legislative_state_6693ef_idx"
+            ),
+        ),
+        migrations.RunPython(parse_existing_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0007_legislator_party_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Leaderboard",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("entries", models.JSONField(default=list)),
+            ],
+            options={
+                "db_table": "legislative_leaderboard",
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:47
+
+from django.db import migrations, models
+
+
+def count_loaded_rows(apps, schema_editor):
+    DatasetManifest = apps.get_model("legislative", "DatasetManifest")
+    db = schema_editor.connection.alias
+    counts = {
+        field: apps.get_model("legislative", model).objects.using(db).count()
+        for field, model in [
+            ("legislators", "Legislator"),
+            ("bills", "Bill"),
+            ("votes", "Vote"),
+            ("vote_results", "VoteResult"),
+        ]
+    }
+    manifests = DatasetManifest.objects.using(db)
+    if manifests.filter(pk=1).update(**counts) == 0 and any(counts.values()):
+        # Data loaded before the manifest existed: record it as version 1 so
+        # stats and the home page keep serving it.
+        manifests.create(pk=1, version=1, **counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0008_leaderboards"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="bills",
+            field=models.PositiveIntegerField(default=0, help_text="Bill rows loaded"),
+        ),
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="legislators",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Legislator rows loaded"
+            ),
+        ),
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="source_hashes",
+            field=models.JSONField(
+                default=dict, help_text="SHA-256 of each loaded CSV file, by file name"
+            ),
+        ),
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="vote_results",
+            field=models.PositiveIntegerField(
+                default=0, help_text="VoteResult rows loaded"
+            ),
+        ),
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="votes",
+            field=models.PositiveIntegerField(default=0, help_text="Vote rows loaded"),
+        ),
+        migrations.RunPython(count_loaded_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0009_manifest_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="source_stats",
+            field=models.JSONField(
+                default=dict,
+                help_text="Size and mtime_ns of each loaded CSV file, by file name",
+            ),
+        ),
+    ]
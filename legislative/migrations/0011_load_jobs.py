@@ -0,0 +1,82 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0010_manifest_source_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LoadJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "force",
+                    models.BooleanField(
+                        default=False, help_text="Reload even if no CSV file changed"
+                    ),
+                ),
+                ("requested_by", models.CharField(blank=True, max_length=150)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "host",
+                    models.CharField(
+                        blank=True,
+                        help_text="Host of the process running the job",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "pid",
+                    models.PositiveIntegerField(
+                        blank=True, help_text="Process running the job", null=True
+                    ),
+                ),
+                (
+                    "rows",
+                    models.JSONField(
+                        default=dict, help_text="Row counts per table loaded"
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "db_table": "legislative_load_job",
+                "ordering": ["-id"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status__in", ["queued", "running"])),
+                        fields=("status",),
+                        name="single_active_load_job",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.5 on 2026-10-19 04:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("legislative", "0011_load_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetmanifest",
+            name="changes_from",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Oldest version the change log can bring up to date",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="Change",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.PositiveIntegerField(
+                        help_text="Dataset version of the load"
+                    ),
+                ),
+                (
+                    "entity",
+                    models.CharField(help_text="legislator or bill", max_length=16),
+                ),
+                ("entity_id", models.BigIntegerField()),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("insert", "Insert"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "legislative_change",
+                "indexes": [
+                    models.Index(
+                        fields=["version", "id"], name="legislative_version_68d041_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -11,10 +11,45 @@ class Legislator(models.Model):
     """Represents an individual legislator elected to government."""
 
     name = models.CharField(max_length=200, help_text="Full name of the legislator")
+    party = models.CharField(
+        max_length=3,
+        blank=True,
+        default="",
+        help_text="Party code parsed from the name, e.g. 'R' (blank if unknown)",
+    )
+    state = models.CharField(
+        max_length=2,
+        blank=True,
+        default="",
+        help_text="State code parsed from the name, e.g. 'NE' (blank if unknown)",
+    )
+    district = models.CharField(
+        max_length=3,
+        blank=True,
+        default="",
+        help_text="District parsed from the name, e.g. '2' (blank for senators)",
+    )
+    supported_bills_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Yea votes cast, precomputed by load_data",
+    )
+    opposed_bills_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Nay votes cast, precomputed by load_data",
+    )
 
     class Meta:
         db_table = "legislative_legislator"
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"]),
+            models.Index(fields=["party"]),
+            models.Index(fields=["state", "district"]),
+            models.Index(fields=["supported_bills_total"]),
+            models.Index(fields=["opposed_bills_total"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -40,10 +75,25 @@ class Bill(models.Model):
         related_name="sponsored_bills",
         help_text="Primary sponsor of this bill",
     )
+    supporters_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Yea votes received, precomputed by load_data",
+    )
+    opposers_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Nay votes received, precomputed by load_data",
+    )
 
     class Meta:
         db_table = "legislative_bill"
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=["title"]),
+            models.Index(fields=["supporters_total"]),
+            models.Index(fields=["opposers_total"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -130,3 +180,186 @@ class VoteResult(models.Model):
     def is_oppose(self):
         """Check if this is an opposing vote."""
         return self.vote_type == self.VoteType.NAY
+
+
+class DatasetManifest(models.Model):
+    """Single-row record of the dataset currently loaded by ``load_data``.
+
+    ``version`` is bumped on every successful load and keys every cache
+    derived from the data. The row counts are written in the same
+    transaction, so the home page and the stats endpoints read them instead
+    of counting the tables.
+    """
+
+    COUNT_FIELDS = ("legislators", "bills", "votes", "vote_results")
+
+    version = models.PositiveIntegerField(
+        default=0, help_text="Incremented on every successful load"
+    )
+    loaded_at = models.DateTimeField(
+        null=True, blank=True, help_text="When the current dataset was loaded"
+    )
+    legislators = models.PositiveIntegerField(
+        default=0, help_text="Legislator rows loaded"
+    )
+    bills = models.PositiveIntegerField(default=0, help_text="Bill rows loaded")
+    votes = models.PositiveIntegerField(default=0, help_text="Vote rows loaded")
+    vote_results = models.PositiveIntegerField(
+        default=0, help_text="VoteResult rows loaded"
+    )
+    source_hashes = models.JSONField(
+        default=dict, help_text="SHA-256 of each loaded CSV file, by file name"
+    )
+    source_stats = models.JSONField(
+        default=dict,
+        help_text="Size and mtime_ns of each loaded CSV file, by file name",
+    )
+    changes_from = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Oldest version the change log can bring up to date",
+    )
+
+    class Meta:
+        db_table = "legislative_dataset_manifest"
+
+    def __str__(self):
+        return f"Dataset v{self.version}"
+
+    @classmethod
+    def current_version(cls):
+        """Version of the loaded dataset (0 before the first load)."""
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+
+    @classmethod
+    async def acurrent_version(cls):
+        """Async ``current_version``."""
+        query = cls.objects.filter(pk=1).values_list("version", flat=True)
+        return await query.afirst() or 0
+
+    @classmethod
+    def current_values(cls):
+        """Values query for the manifest row (empty before the first load)."""
+        return cls.objects.filter(pk=1).values(
+            "version", "loaded_at", *cls.COUNT_FIELDS, "source_hashes", "changes_from"
+        )
+
+
+class DetailDocument(models.Model):
+    """Detail endpoint JSON rendered once per load (see ``documents``).
+
+    ``body`` is the response for the default vote history window with
+    ``"vote_results_next": null``; ``has_next`` tells the view to fill in
+    the next-page link.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    body = models.BinaryField()
+    has_next = models.BooleanField(default=False)
+
+    class Meta:
+        abstract = True
+
+
+class LegislatorDocument(DetailDocument):
+    class Meta:
+        db_table = "legislative_legislator_document"
+
+
+class BillDocument(DetailDocument):
+    class Meta:
+        db_table = "legislative_bill_document"
+
+
+class Leaderboard(models.Model):
+    """Top-N ranking computed by ``load_data`` (see ``leaderboards``).
+
+    ``entries`` holds the ranked rows exactly as the API returns them, so
+    a board is read with one primary-key lookup.
+    """
+
+    name = models.CharField(max_length=32, primary_key=True)
+    entries = models.JSONField(default=list)
+
+    class Meta:
+        db_table = "legislative_leaderboard"
+
+    def __str__(self):
+        return self.name
+
+
+class LoadJob(models.Model):
+    """A ``load_data`` run queued through the API (see ``jobs``).
+
+    Live progress (phase, rows done) is kept next to the job in
+    ``LOAD_JOBS_DIR``, since the load itself holds the database's write
+    lock; this row records the job's lifecycle and outcome.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    ACTIVE = (Status.QUEUED, Status.RUNNING)
+
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    force = models.BooleanField(
+        default=False, help_text="Reload even if no CSV file changed"
+    )
+    requested_by = models.CharField(max_length=150, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    host = models.CharField(
+        max_length=255, blank=True, help_text="Host of the process running the job"
+    )
+    pid = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Process running the job"
+    )
+    rows = models.JSONField(default=dict, help_text="Row counts per table loaded")
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "legislative_load_job"
+        ordering = ["-id"]
+        constraints = [
+            # At most one queued and one running job: requests coalesce.
+            models.UniqueConstraint(
+                fields=["status"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="single_active_load_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Load job {self.pk} ({self.status})"
+
+
+class Change(models.Model):
+    """A legislator or bill inserted, updated or deleted by a load.
+
+    ``load_data`` compares the rows before and after each run (see
+    ``changes``) and records one row per changed entity under the new
+    dataset ``version``.
+    """
+
+    class Op(models.TextChoices):
+        INSERT = "insert", "Insert"
+        UPDATE = "update", "Update"
+        DELETE = "delete", "Delete"
+
+    version = models.PositiveIntegerField(help_text="Dataset version of the load")
+    entity = models.CharField(max_length=16, help_text="legislator or bill")
+    entity_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=Op.choices)
+
+    class Meta:
+        db_table = "legislative_change"
+        indexes = [models.Index(fields=["version", "id"])]
+
+    def __str__(self):
+        return f"v{self.version} {self.op} {self.entity} {self.entity_id}"
@@ -0,0 +1,133 @@
+"""
+Detection of N+1 query patterns.
+
+While a ``QueryShapeTracker`` is active (per request via
+``NPlusOneMiddleware``, or around any block with ``detect_n_plus_one``),
+every executed SQL statement is reduced to its shape (parameters are
+already placeholders; ``IN (...)`` lists are collapsed). When one shape runs
+``NPLUSONE_THRESHOLD`` times, the innermost application frames on the stack
+are reported: logged to ``legislative.nplusone`` or raised as ``NPlusOneError``
+depending on ``NPLUSONE_MODE`` (``"off"``, ``"log"`` or ``"raise"``).
+"""
+
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger("legislative.nplusone")
+
+_current_tracker = ContextVar("legislative_query_shape_tracker", default=None)
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Modules whose frames sit between the caller and the database driver.
+_INTERNAL_FILES = {
+    str(Path(__file__).resolve().with_name(name))
+    for name in ("nplusone.py", "instrumentation.py")
+}
+
+
+class NPlusOneError(Exception):
+    """Raised in ``"raise"`` mode when a query shape repeats too often."""
+
+
+def query_shape(sql):
+    """Normalize ``sql`` so executions differing only in parameters match."""
+    return _IN_LIST_RE.sub("IN (...)", _WHITESPACE_RE.sub(" ", sql.strip()))
+
+
+def find_app_frames(stack=None, limit=3):
+    """``"path:line in function"`` of the innermost frames of project code.
+
+    Skips installed packages and the query hooks, so the first frame is the
+    view, serializer or model property that issued the query, followed by
+    its callers (joined with ``" <- "``).
+    """
+    base_dir = str(settings.BASE_DIR)
+    stack = stack if stack is not None else traceback.extract_stack()
+    frames = []
+    for frame in reversed(stack):
+        filename = str(Path(frame.filename).resolve())
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and filename not in _INTERNAL_FILES
+        ):
+            relative = Path(filename).relative_to(base_dir)
+            frames.append(f"{relative}:{frame.lineno} in {frame.name}")
+            if len(frames) == limit:
+                break
+    return " <- ".join(frames) or "<unknown>"
+
+
+class QueryShapeTracker:
+    """Counts query shapes and reports the first one crossing ``threshold``."""
+
+    def __init__(self, threshold, mode, label=""):
+        self.threshold = threshold
+        self.mode = mode
+        self.label = label
+        self.counts = Counter()
+        self.reports = []
+
+    def record(self, sql):
+        shape = query_shape(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold:
+            self._report(shape)
+
+    def _report(self, shape):
+        location = find_app_frames()
+        message = (
+            f"N+1 query detected{f' in {self.label}' if self.label else ''}: "
+            f"{self.threshold} executions of the same query from {location}: {shape}"
+        )
+        self.reports.append({"shape": shape, "location": location})
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+def get_mode():
+    return getattr(settings, "NPLUSONE_MODE", "off")
+
+
+@contextmanager
+def detect_n_plus_one(mode=None, threshold=None, label=""):
+    """Track query shapes executed inside the block.
+
+    Defaults come from ``NPLUSONE_MODE`` / ``NPLUSONE_THRESHOLD``; yields the
+    tracker (``reports`` lists what was found) or ``None`` when off.
+    """
+    mode = mode or get_mode()
+    if mode == "off":
+        yield None
+        return
+    tracker = QueryShapeTracker(
+        threshold or getattr(settings, "NPLUSONE_THRESHOLD", 3), mode, label
+    )
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook feeding the active tracker."""
+    tracker = _current_tracker.get()
+    if tracker is not None and not many:
+        tracker.record(sql)
+    return execute(sql, params, many, context)
+
+
+def install_db_execute_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver installing ``db_execute_wrapper``."""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
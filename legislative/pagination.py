@@ -0,0 +1,125 @@
+"""
+Limit/offset windows for the endpoints that paginate.
+
+List endpoints return everything; only the nested vote history of the
+detail endpoints, the vote sessions, the change feed and the search results
+are paginated.
+"""
+
+from django.conf import settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _int_param(value, default, minimum=0, cutoff=None):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return default
+    if number < minimum:
+        return default
+    return min(number, cutoff) if cutoff else number
+
+
+class LimitOffsetWindow:
+    """Parse ``limit``/``offset`` query parameters and build page links."""
+
+    limit_query_param = "limit"
+    offset_query_param = "offset"
+    default_limit_setting = None
+    max_limit_setting = None
+
+    def __init__(self, request):
+        self.request = request
+        self.limit = _int_param(
+            request.GET.get(self.limit_query_param),
+            getattr(settings, self.default_limit_setting),
+            minimum=1,
+            cutoff=getattr(settings, self.max_limit_setting),
+        )
+        self.offset = _int_param(request.GET.get(self.offset_query_param), 0)
+        self.has_next = False
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        if self.offset <= self.limit:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset - self.limit
+        )
+
+
+class LookAheadWindow(LimitOffsetWindow):
+    """Window that fetches ``limit + 1`` rows so the next link is known
+    without a COUNT query."""
+
+    def page_queryset(self, queryset):
+        """Slice ``queryset`` to the requested window plus one look-ahead row."""
+        return queryset[self.offset : self.offset + self.limit + 1]
+
+    def paginate_rows(self, rows):
+        """Trim the look-ahead row fetched by ``page_queryset``."""
+        rows = list(rows)
+        self.has_next = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_response_data(self, results):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": results,
+        }
+
+
+class VoteHistoryPagination(LookAheadWindow):
+    """Window over a detail endpoint's vote rows.
+
+    ``?votes_limit=`` is capped at ``VOTE_HISTORY_MAX_PAGE_SIZE``.
+    """
+
+    limit_query_param = "votes_limit"
+    offset_query_param = "votes_offset"
+    default_limit_setting = "VOTE_HISTORY_PAGE_SIZE"
+    max_limit_setting = "VOTE_HISTORY_MAX_PAGE_SIZE"
+
+
+class VotePagination(LookAheadWindow):
+    """Window over vote sessions (``/api/votes/``, ``/api/bills/{id}/votes/``).
+
+    ``?limit=`` is capped at ``VOTES_MAX_PAGE_SIZE``.
+    """
+
+    default_limit_setting = "VOTES_PAGE_SIZE"
+    max_limit_setting = "VOTES_MAX_PAGE_SIZE"
+
+
+class ChangePagination(LookAheadWindow):
+    """Window over the change feed (``/api/changes/``).
+
+    ``?limit=`` is capped at ``CHANGES_MAX_PAGE_SIZE``.
+    """
+
+    default_limit_setting = "CHANGES_PAGE_SIZE"
+    max_limit_setting = "CHANGES_MAX_PAGE_SIZE"
+
+
+class SearchPagination(LimitOffsetWindow):
+    """Window over ranked search hits, sized by ``SEARCH_PAGE_SIZE``."""
+
+    default_limit_setting = "SEARCH_PAGE_SIZE"
+    max_limit_setting = "SEARCH_MAX_PAGE_SIZE"
+
+    def set_count(self, count):
+        self.count = count
+        self.has_next = self.offset + self.limit < count
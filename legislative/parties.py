@@ -0,0 +1,19 @@
+"""
+Party, state and district encoded in legislator names.
+
+Names end with ``(<party>-<state>[-<district>])``, e.g.
+``Rep. Don Bacon (R-NE-2)`` or ``Sen. Alex Padilla (D-CA)``. ``load_data``
+parses a whole column at once with ``parse_names``; names without the
+suffix get blank fields.
+"""
+
+import pandas as pd
+
+NAME_PATTERN = (
+    r"\((?P<party>[A-Z]{1,3})-(?P<state>[A-Z]{2})(?:-(?P<district>\d{1,2}|AL))?\)\s*$"
+)
+
+
+def parse_names(names: pd.Series) -> pd.DataFrame:
+    """``party``, ``state`` and ``district`` columns for a column of names."""
+    return names.astype(str).str.extract(NAME_PATTERN).fillna("")
@@ -0,0 +1,150 @@
+"""
+Storage of pre-compressed response bodies keyed by dataset version.
+
+A cacheable response is compressed once per dataset version with every
+codec (Brotli, zstd and gzip) and kept in a Django cache. Later requests
+negotiate ``Accept-Encoding`` and get the stored bytes as they are.
+
+A miss compresses on the request path, so the codecs use mid-range levels:
+close to the best ratio on JSON at a fraction of the maximum levels' time.
+Only query parameters the cached routes read are keyed, in sorted order; a
+request with any other parameter bypasses the cache.
+"""
+
+import gzip
+import hashlib
+import re
+from urllib.parse import urlencode
+
+import brotli
+import zstandard
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .filters import RANGE_LOOKUPS
+
+# Server preference order (best ratio first).
+CODECS = {
+    "br": lambda data: brotli.compress(data, quality=5),
+    "zstd": zstandard.ZstdCompressor(level=3).compress,
+    "gzip": lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+}
+# Query parameters read by the cached routes: DRF's format suffix, list
+# ordering, windows and the change feed's version, plus the count filters.
+QUERY_PARAMS = frozenset(
+    ("format", "limit", "offset", "ordering", "since", "votes_limit", "votes_offset")
+)
+FILTER_PARAM = re.compile(rf"\w+_count__(?:{'|'.join(RANGE_LOOKUPS)})")
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    qvalues = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        qvalues[coding] = q
+    return qvalues
+
+
+def negotiate_encoding(header, available):
+    """Pick the preferred coding from ``available`` the client accepts.
+
+    Falls back to ``"identity"`` when none of them is acceptable.
+    """
+    qvalues = parse_accept_encoding(header or "")
+    wildcard = qvalues.get("*", 0.0)
+    for coding in available:
+        if qvalues.get(coding, wildcard) > 0:
+            return coding
+    return "identity"
+
+
+class PrecompressedEntry:
+    """Identity and compressed bodies of one response."""
+
+    def __init__(self, status, content_type, bodies):
+        self.status = status
+        self.content_type = content_type
+        self.bodies = bodies
+
+    @classmethod
+    def from_response(cls, response):
+        content = response.content
+        bodies = {"identity": content}
+        for coding, compress in CODECS.items():
+            compressed = compress(content)
+            if len(compressed) < len(content):
+                bodies[coding] = compressed
+        return cls(response.status_code, response["Content-Type"], bodies)
+
+    def response_for(self, request):
+        coding = negotiate_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", ""),
+            [c for c in CODECS if c in self.bodies],
+        )
+        response = HttpResponse(
+            self.bodies[coding], status=self.status, content_type=self.content_type
+        )
+        if coding != "identity":
+            response["Content-Encoding"] = coding
+        response["Content-Length"] = str(len(self.bodies[coding]))
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
+
+
+def cache_key(request, dataset_version):
+    """Key a response by dataset version, path, sorted query parameters and
+    requested media type; ``None`` if a query parameter is not cacheable."""
+    params = sorted(
+        (name, value) for name, values in request.GET.lists() for value in values
+    )
+    if not all(
+        name in QUERY_PARAMS or FILTER_PARAM.fullmatch(name) for name, _ in params
+    ):
+        return None
+    accept = request.META.get("HTTP_ACCEPT", "")
+    digest = hashlib.sha1(
+        f"{request.path}?{urlencode(params)}\n{accept}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f"precompressed:v{dataset_version}:{digest}"
+
+
+def _cache():
+    return caches[getattr(settings, "PRECOMPRESSED_CACHE", "default")]
+
+
+def get_entry(key):
+    return _cache().get(key)
+
+
+def store_entry(key, response):
+    entry = PrecompressedEntry.from_response(response)
+    _cache().set(key, entry, getattr(settings, "PRECOMPRESSED_TIMEOUT", None))
+    return entry
+
+
+async def aget_entry(key):
+    return await _cache().aget(key)
+
+
+async def astore_entry(key, response):
+    # Compressing is CPU-bound; keep it off the event loop.
+    entry = await sync_to_async(
+        PrecompressedEntry.from_response, thread_sensitive=False
+    )(response)
+    await _cache().aset(key, entry, getattr(settings, "PRECOMPRESSED_TIMEOUT", None))
+    return entry
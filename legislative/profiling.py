@@ -0,0 +1,218 @@
+"""
+On-demand and sampled request profiling.
+
+``ProfilingMiddleware`` profiles a request when an authorized client asks
+for it with ``?__profile=1`` (``cprofile``, the default) or
+``?__profile=stacks``, or when it is the N-th request with
+``PROFILING_SAMPLE_RATE = N`` to a route in ``PROFILING_SAMPLE_URL_NAMES``
+(the API viewsets and HTML pages, not ``/metrics``, ``/profiles/`` or
+static files). Authorized means a staff user or an ``X-Profile-Token``
+header equal to ``PROFILING_TOKEN``. Only WSGI requests are profiled (see
+``ProfilingMiddleware``).
+
+Two capture formats are written to ``PROFILING_DIR``:
+
+* ``cprofile``: a ``pstats`` dump (``.prof``) for ``snakeviz``,
+  ``gprof2dot`` or ``python -m pstats``,
+* ``stacks``: a sampling profiler reading the request thread's stack every
+  ``PROFILING_STACK_INTERVAL`` seconds, written in the collapsed
+  ``frame;frame;frame count`` format (``.folded``) read by ``flamegraph.pl``
+  and speedscope.
+
+Each capture has a JSON sidecar with the request details, listed at
+``/profiles/``. Only one request per process is profiled at a time; others
+run unprofiled.
+"""
+
+import cProfile
+import hmac
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+FORMATS = {"cprofile": ".prof", "stacks": ".folded"}
+_ID_RE = re.compile(r"\d{8}-\d{6}-[0-9a-f]{8}")
+
+_busy = threading.Lock()
+_request_counter = itertools.count(1)
+
+
+def profiles_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def is_authorized(request, user):
+    """Whether ``request`` (made by ``user``) may ask for or browse profiles."""
+    token = getattr(settings, "PROFILING_TOKEN", "")
+    header = request.headers.get("X-Profile-Token", "")
+    if token and header and hmac.compare_digest(token, header):
+        return True
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def requested_format(request):
+    """Format asked for with ``?__profile=``, or ``None``."""
+    value = request.GET.get("__profile")
+    if not value:
+        return None
+    if value in FORMATS:
+        return value
+    return "cprofile"
+
+
+def sampled(request):
+    """True for one in ``PROFILING_SAMPLE_RATE`` requests (0 disables) to the
+    routes in ``PROFILING_SAMPLE_URL_NAMES``."""
+    rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+    if rate <= 0:
+        return False
+    try:
+        match = resolve(request.path_info, getattr(request, "urlconf", None))
+    except Resolver404:
+        return False
+    if match.url_name not in getattr(settings, "PROFILING_SAMPLE_URL_NAMES", ()):
+        return False
+    return next(_request_counter) % rate == 0
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path):
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+        )
+
+
+class Capture:
+    """One profiled request; ``save`` writes it once the response exists."""
+
+    def __init__(self, fmt, trigger):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.format = fmt
+        self.trigger = trigger
+        self.profiler = None
+        self.sampler = None
+        self.duration = 0.0
+
+    def save(self, request, response):
+        directory = profiles_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        filename = f"{self.id}{FORMATS[self.format]}"
+        if self.profiler is not None:
+            self.profiler.dump_stats(directory / filename)
+        else:
+            self.sampler.dump(directory / filename)
+        metadata = {
+            "id": self.id,
+            "format": self.format,
+            "trigger": self.trigger,
+            "file": filename,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round(self.duration * 1000, 3),
+            "created": time.time(),
+        }
+        (directory / f"{self.id}.json").write_text(json.dumps(metadata))
+        prune(getattr(settings, "PROFILING_MAX_PROFILES", 200))
+
+
+@contextmanager
+def profile(fmt, trigger):
+    """Profile the enclosed block; yields a ``Capture`` or ``None`` if busy."""
+    if not _busy.acquire(blocking=False):
+        yield None
+        return
+    capture = Capture(fmt, trigger)
+    started = time.perf_counter()
+    try:
+        if fmt == "stacks":
+            capture.sampler = StackSampler(
+                threading.get_ident(), settings.PROFILING_STACK_INTERVAL
+            )
+            capture.sampler.start()
+        else:
+            capture.profiler = cProfile.Profile()
+            capture.profiler.enable()
+        yield capture
+    finally:
+        if capture.profiler is not None:
+            capture.profiler.disable()
+        if capture.sampler is not None:
+            capture.sampler.stop()
+        capture.duration = time.perf_counter() - started
+        _busy.release()
+
+
+def list_profiles():
+    """Metadata of stored captures, newest first."""
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.glob("*.json"):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def get_profile(profile_id):
+    """Metadata of one capture, or ``None``."""
+    if not _ID_RE.fullmatch(profile_id):
+        return None
+    try:
+        return json.loads((profiles_dir() / f"{profile_id}.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def prune(keep):
+    """Delete all but the ``keep`` newest captures."""
+    directory = profiles_dir()
+    for metadata in list_profiles()[keep:]:
+        for name in (metadata["file"], f"{metadata['id']}.json"):
+            try:
+                os.remove(directory / name)
+            except FileNotFoundError:
+                pass
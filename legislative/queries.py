@@ -0,0 +1,147 @@
+"""
+Queryset builders shared by the sync views, the async views and the viewsets.
+
+Keeping the annotations in one place guarantees that every serving path
+reads the vote counts the same way: from the totals precomputed by
+``load_data`` (see ``legislative.aggregates``).
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+
+from .models import Bill, Change, Legislator, Vote, VoteResult
+
+
+def legislators_with_counts(queryset=None):
+    """Annotate legislators with their supported/opposed vote counts."""
+    queryset = Legislator.objects.all() if queryset is None else queryset
+    return queryset.annotate(
+        supported_bills_count_annotated=F("supported_bills_total"),
+        opposed_bills_count_annotated=F("opposed_bills_total"),
+    )
+
+
+def bills_with_counts(queryset=None):
+    """Annotate bills (with their sponsor) with supporter/opposer counts."""
+    queryset = Bill.objects.all() if queryset is None else queryset
+    return queryset.select_related("primary_sponsor").annotate(
+        supporters_count_annotated=F("supporters_total"),
+        opposers_count_annotated=F("opposers_total"),
+    )
+
+
+def votes_with_tallies(queryset=None):
+    """Vote sessions with Yea/Nay tallies (one grouped query), by id.
+
+    The ordering repeats the GROUP BY columns (``id``, ``bill_id``) so SQLite
+    walks the groups in rowid order and stops at the page's LIMIT instead of
+    sorting every session first; keep joined columns out of it.
+    """
+    queryset = Vote.objects.all() if queryset is None else queryset
+    yea, nay = VoteResult.VoteType.YEA, VoteResult.VoteType.NAY
+    return queryset.annotate(
+        yea_count=Count("results", filter=Q(results__vote_type=yea)),
+        nay_count=Count("results", filter=Q(results__vote_type=nay)),
+    ).order_by("id", "bill_id")
+
+
+def bill_votes(bill_id):
+    """``votes_with_tallies`` of one bill's sessions."""
+    return votes_with_tallies(Vote.objects.filter(bill_id=bill_id))
+
+
+def changes_between(since, version):
+    """Change feed rows after dataset version ``since`` up to ``version``.
+
+    Ordered by (``version``, ``id``), the columns of the change log's index,
+    so a page is a range scan of that index.
+    """
+    return (
+        Change.objects.filter(version__gt=since, version__lte=version)
+        .order_by("version", "id")
+        .values("version", "entity", "entity_id", "op")
+    )
+
+
+def _bill_vote_rows(queryset):
+    return queryset.order_by("legislator__name", "id").values(
+        "legislator_id", "legislator__name", "vote_type"
+    )
+
+
+def _legislator_vote_rows(queryset):
+    return queryset.order_by("-id").values(
+        "vote__bill_id", "vote__bill__title", "vote_type"
+    )
+
+
+def bill_vote_rows(bill_id):
+    """Value-only vote rows for a bill's detail endpoint and page, by name."""
+    return _bill_vote_rows(VoteResult.objects.filter(vote__bill_id=bill_id))
+
+
+def legislator_vote_rows(legislator_id):
+    """Value-only vote rows for a legislator's detail endpoint and page,
+    newest first."""
+    return _legislator_vote_rows(VoteResult.objects.filter(legislator_id=legislator_id))
+
+
+def _first_rows(rows, owner_field, limit):
+    """The first ``limit`` of ``rows`` per ``owner_field``, in their order.
+
+    Each row gets the owner id as ``owner``; rows come grouped by owner.
+    """
+    ordering = [
+        F(field[1:]).desc() if field.startswith("-") else F(field).asc()
+        for field in rows.query.order_by
+    ]
+    return (
+        rows.annotate(
+            owner=F(owner_field),
+            position=Window(
+                RowNumber(), partition_by=F(owner_field), order_by=ordering
+            ),
+        )
+        .filter(position__lte=limit)
+        .order_by("owner", "position")
+    )
+
+
+def bill_vote_pages(bill_ids, limit, using=DEFAULT_DB_ALIAS):
+    """``bill_vote_rows`` of every bill in ``bill_ids``, ``limit`` per bill."""
+    queryset = VoteResult.objects.using(using).filter(vote__bill_id__in=bill_ids)
+    return _first_rows(_bill_vote_rows(queryset), "vote__bill_id", limit)
+
+
+def legislator_vote_pages(legislator_ids, limit, using=DEFAULT_DB_ALIAS):
+    """``legislator_vote_rows`` of every legislator, ``limit`` per legislator."""
+    queryset = VoteResult.objects.using(using).filter(legislator_id__in=legislator_ids)
+    return _first_rows(_legislator_vote_rows(queryset), "legislator_id", limit)
+
+
+def bill_vote_breakdown(bill_id, field):
+    """Yea/Nay counts on a bill grouped by the voters' ``field`` (one query)."""
+    yea, nay = VoteResult.VoteType.YEA, VoteResult.VoteType.NAY
+    return (
+        VoteResult.objects.filter(vote__bill_id=bill_id)
+        .values(group=F(f"legislator__{field}"))
+        .annotate(
+            yea=Count("pk", filter=Q(vote_type=yea)),
+            nay=Count("pk", filter=Q(vote_type=nay)),
+        )
+        .order_by("group")
+    )
+
+
+def party_stats():
+    """Legislators and their Yea/Nay votes per party (one grouped query)."""
+    return (
+        Legislator.objects.values("party")
+        .annotate(
+            legislators=Count("pk"),
+            yea_votes=Sum("supported_bills_total"),
+            nay_votes=Sum("opposed_bills_total"),
+        )
+        .order_by("party")
+    )
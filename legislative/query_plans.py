@@ -0,0 +1,247 @@
+"""
+Query-plan audit of the querysets behind every page and endpoint.
+
+``hot_queries()`` builds the querysets the app actually runs, through the
+viewsets and the shared builders in ``queries``, for sample ids from the
+current database. ``audit()`` runs SQLite's ``EXPLAIN QUERY PLAN`` on each
+and reports full scans, temporary B-trees (sorts, DISTINCT, GROUP BY without
+an index) and automatic indexes or Bloom filters (a join SQLite had to index
+itself). Findings a query is expected to have are listed in its ``allow``
+with the reason; any other finding fails the query.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from .models import Bill, Legislator, Vote
+from .pagination import ChangePagination, VoteHistoryPagination, VotePagination
+from .queries import (
+    bill_vote_breakdown,
+    bill_vote_rows,
+    bill_votes,
+    bills_with_counts,
+    changes_between,
+    legislator_vote_rows,
+    legislators_with_counts,
+    party_stats,
+    votes_with_tallies,
+)
+from .views import BillViewSet, LegislatorViewSet
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)")
+_TEMP_BTREE_RE = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+_AUTOMATIC_RE = re.compile(r"^(?:SEARCH|SCAN) (?:TABLE )?(\S+) USING AUTOMATIC")
+_BLOOM_RE = re.compile(r"^BLOOM FILTER ON (\S+)")
+
+LIST_REASON = "the list returns every row"
+VOTERS_SORT_REASON = (
+    "one bill's voters sorted by a joined column (name); bounded by chamber size"
+)
+VOTERS_GROUP_REASON = (
+    "one bill's voters grouped by a joined column; bounded by chamber size"
+)
+
+
+class HotQuery:
+    """A queryset the app runs, with the findings it is expected to have."""
+
+    def __init__(self, name, queryset, allow=None):
+        self.name = name
+        self.queryset = queryset
+        self.allow = allow or {}
+
+
+class QueryPlan:
+    """``EXPLAIN QUERY PLAN`` of one ``HotQuery`` and its findings."""
+
+    def __init__(self, query, details):
+        self.query = query
+        self.details = details
+        limited = query.queryset.query.high_mark is not None
+        self.findings = [f for d in details for f in plan_findings(d, limited)]
+
+    @property
+    def problems(self):
+        return [f for f in self.findings if f not in self.query.allow]
+
+    @property
+    def expected(self):
+        return [f for f in self.findings if f in self.query.allow]
+
+    @property
+    def passed(self):
+        return not self.problems
+
+
+def plan_findings(detail, limited=False):
+    """Findings for one ``EXPLAIN QUERY PLAN`` detail line.
+
+    With ``limited`` (the query has a LIMIT) an index scan is an ordered walk
+    that stops after the last row, not a full scan.
+    """
+    findings = []
+    scan = _SCAN_RE.match(detail)
+    if scan and scan[1] != "CONSTANT" and "AUTOMATIC" not in detail:
+        if not (limited and " USING " in detail):
+            findings.append(f"full scan of {scan[1]}")
+    temp_btree = _TEMP_BTREE_RE.search(detail)
+    if temp_btree:
+        findings.append(f"temp B-tree for {temp_btree[1]}")
+    automatic = _AUTOMATIC_RE.match(detail) or _BLOOM_RE.match(detail)
+    if automatic:
+        findings.append(f"automatic index on {automatic[1]}")
+    return findings
+
+
+def explain(queryset):
+    """``EXPLAIN QUERY PLAN`` detail lines for ``queryset``."""
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _viewset(viewset_class, action, path="/", **kwargs):
+    view = viewset_class(action=action, kwargs=kwargs, format_kwarg=None)
+    view.request = Request(RequestFactory().get(path))
+    return view
+
+
+def _list_queries(viewset_class, path, top_n_query):
+    view = _viewset(viewset_class, "list", path)
+    top_n = _viewset(viewset_class, "list", f"{path}?{top_n_query}")
+    return view.filter_queryset(view.get_queryset()), top_n.filter_queryset(
+        top_n.get_queryset()
+    )
+
+
+def _vote_history_page(view, obj):
+    paginator = VoteHistoryPagination(view.request)
+    return paginator.page_queryset(view.get_vote_history_queryset(obj))
+
+
+def _vote_page(queryset):
+    return VotePagination(RequestFactory().get("/")).page_queryset(queryset)
+
+
+def hot_queries():
+    """Every queryset behind the pages and API endpoints, for sample ids."""
+    legislator = Legislator.objects.order_by("pk").first() or Legislator(pk=0)
+    bill = Bill.objects.order_by("pk").first() or Bill(pk=0)
+    vote = Vote.objects.order_by("pk").first() or Vote(pk=0)
+    list_scan = {
+        "full scan of legislative_legislator": LIST_REASON,
+        "full scan of legislative_bill": LIST_REASON,
+    }
+    voters_sort = {"temp B-tree for ORDER BY": VOTERS_SORT_REASON}
+
+    legislator_list, legislator_top = _list_queries(
+        LegislatorViewSet,
+        "/api/legislators/",
+        "ordering=-supported_bills_count&limit=10",
+    )
+    bill_list, bill_top = _list_queries(
+        BillViewSet,
+        "/api/bills/",
+        "ordering=-supporters_count&supporters_count__gte=1&limit=10",
+    )
+    legislator_view = _viewset(LegislatorViewSet, "retrieve", pk=legislator.pk)
+    bill_view = _viewset(BillViewSet, "retrieve", pk=bill.pk)
+    html_window = VoteHistoryPagination(RequestFactory().get("/"))
+
+    return [
+        # LegislatorViewSet.get_queryset
+        HotQuery("LegislatorViewSet list", legislator_list, list_scan),
+        HotQuery("LegislatorViewSet list top-N", legislator_top),
+        HotQuery(
+            "LegislatorViewSet retrieve",
+            legislator_view.get_queryset().filter(pk=legislator.pk),
+        ),
+        HotQuery(
+            "LegislatorViewSet vote history page",
+            _vote_history_page(legislator_view, legislator),
+        ),
+        # BillViewSet.get_queryset
+        HotQuery("BillViewSet list", bill_list, list_scan),
+        HotQuery("BillViewSet list top-N", bill_top),
+        HotQuery("BillViewSet retrieve", bill_view.get_queryset().filter(pk=bill.pk)),
+        HotQuery(
+            "BillViewSet vote history page",
+            _vote_history_page(bill_view, bill),
+            voters_sort,
+        ),
+        # HTML views
+        HotQuery(
+            "legislators_view", legislators_with_counts().order_by("name"), list_scan
+        ),
+        HotQuery(
+            "legislator_detail_view",
+            legislators_with_counts().filter(id=legislator.pk),
+        ),
+        HotQuery(
+            "legislator_detail_view vote history page",
+            html_window.page_queryset(legislator_vote_rows(legislator.pk)),
+        ),
+        HotQuery("bills_view", bills_with_counts().order_by("title"), list_scan),
+        HotQuery("bill_detail_view", bills_with_counts().filter(id=bill.pk)),
+        HotQuery(
+            "bill_detail_view vote history page",
+            html_window.page_queryset(bill_vote_rows(bill.pk)),
+            voters_sort,
+        ),
+        # Breakdowns
+        HotQuery(
+            "BillViewSet breakdown by party",
+            bill_vote_breakdown(bill.pk, "party"),
+            {"temp B-tree for GROUP BY": VOTERS_GROUP_REASON},
+        ),
+        HotQuery(
+            "BillViewSet breakdown by state",
+            bill_vote_breakdown(bill.pk, "state"),
+            {"temp B-tree for GROUP BY": VOTERS_GROUP_REASON},
+        ),
+        HotQuery(
+            "stats_by_party_api_view",
+            party_stats(),
+            {"full scan of legislative_legislator": "aggregates every legislator"},
+        ),
+        # Vote sessions
+        HotQuery(
+            "VoteViewSet list",
+            _vote_page(votes_with_tallies()),
+            {
+                "full scan of legislative_vote": (
+                    "walks sessions in rowid order and stops at the page's LIMIT"
+                )
+            },
+        ),
+        HotQuery("VoteViewSet retrieve", votes_with_tallies().filter(pk=vote.pk)),
+        HotQuery("BillViewSet votes", _vote_page(bill_votes(bill.pk))),
+        # Change feed
+        HotQuery(
+            "changes_api_view",
+            ChangePagination(RequestFactory().get("/")).page_queryset(
+                changes_between(0, 1)
+            ),
+        ),
+        # Detail serializers without a page from the viewset
+        HotQuery(
+            "LegislatorDetailSerializer.get_vote_results",
+            legislator_vote_rows(legislator.pk)[: settings.VOTE_HISTORY_PAGE_SIZE],
+        ),
+        HotQuery(
+            "BillDetailSerializer.get_vote_results",
+            bill_vote_rows(bill.pk)[: settings.VOTE_HISTORY_PAGE_SIZE],
+            voters_sort,
+        ),
+    ]
+
+
+def audit(queries=None):
+    """``QueryPlan`` for each hot query (SQLite only)."""
+    queries = hot_queries() if queries is None else queries
+    return [QueryPlan(query, explain(query.queryset)) for query in queries]
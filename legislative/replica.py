@@ -0,0 +1,56 @@
+"""
+Read replica of the primary SQLite database.
+
+When ``SQLITE_REPLICA_PATH`` is set, the ``readonly`` alias (which
+``legislative.routers.ReadOnlyRouter`` sends request reads to) opens that
+file instead of the primary, so API and HTML reads never take locks on the
+file ``load_data`` writes. ``sync`` refreshes the replica with SQLite's
+online backup API; in WAL mode (the ``performance`` profile, copied from
+the primary) replica readers keep their snapshot while it is rewritten.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from . import metrics, shadow
+
+
+class ReplicaError(Exception):
+    """The replica is not configured or cannot be refreshed."""
+
+
+def replica_path():
+    """Configured replica file, or ``None`` when reads use the primary."""
+    path = getattr(settings, "SQLITE_REPLICA_PATH", "")
+    return Path(path) if path else None
+
+
+def sync(source=None, target=None, timeout=30):
+    """Copy the primary database into the replica; returns seconds taken."""
+    source = Path(source or shadow.live_path())
+    target = target or replica_path()
+    if target is None:
+        raise ReplicaError("SQLITE_REPLICA_PATH is not set.")
+    if not source.is_file():
+        metrics.inc("replica_syncs_total", {"status": "error"})
+        raise ReplicaError(f"Primary database {source} does not exist.")
+    Path(target).parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.monotonic()
+    primary = sqlite3.connect(source, timeout=timeout)
+    replica = sqlite3.connect(target, timeout=timeout)
+    try:
+        primary.backup(replica)
+    except sqlite3.Error as e:
+        metrics.inc("replica_syncs_total", {"status": "error"})
+        raise ReplicaError(f"Cannot sync replica {target}: {e}") from e
+    finally:
+        replica.close()
+        primary.close()
+    duration = time.monotonic() - started
+    metrics.inc("replica_syncs_total", {"status": "success"})
+    metrics.set_gauge("replica_last_sync_timestamp_seconds", time.time())
+    return duration
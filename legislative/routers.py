@@ -0,0 +1,35 @@
+"""
+Database routers.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ONLY_ALIAS = "readonly"
+
+
+class ReadOnlyRouter:
+    """Send reads to the read-only connection, everything else to ``default``.
+
+    The read-only alias opens the primary file or, with
+    ``SQLITE_REPLICA_PATH``, a replica of it (``legislative.replica``).
+
+    Reads made while ``default`` is inside a transaction stay on ``default``
+    so code that writes and then reads (``load_data``, tests) sees its own
+    uncommitted rows.
+    """
+
+    def db_for_read(self, model, **hints):
+        if READ_ONLY_ALIAS not in connections.settings:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_ONLY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,70 @@
+"""
+Full-text search over bill titles and legislator names.
+
+Backed by the ``legislative_search_index`` SQLite FTS5 table (see migration
+0003), rebuilt by ``load_data``. Every query term is matched as a prefix
+and hits are ranked with FTS5's bm25.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+from .models import Bill
+
+SEARCH_TABLE = "legislative_search_index"
+KINDS = ("bill", "legislator")
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 expression where every term is a prefix.
+
+    Terms are quoted so user input cannot inject FTS5 operators. Returns
+    an empty string when the query has no searchable term.
+    """
+    terms = _TERM_RE.findall(query or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Replace the index contents with the current bills and legislators."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (kind, object_id, text) "
+            "SELECT 'bill', id, title FROM legislative_bill"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (kind, object_id, text) "
+            "SELECT 'legislator', id, name FROM legislative_legislator"
+        )
+
+
+def search(match, kind=None, limit=20, offset=0):
+    """Return ``(count, hits)`` for an FTS5 match expression.
+
+    ``hits`` are dicts with ``type``, ``id``, ``text`` and ``rank`` (lower is
+    better), best first. Runs on the alias reads are routed to, so it uses
+    the read-only connection (or replica) like the ORM queries.
+    """
+    where = f"{SEARCH_TABLE} MATCH %s"
+    params = [match]
+    if kind:
+        where += " AND kind = %s"
+        params.append(kind)
+    with connections[router.db_for_read(Bill)].cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {where}", params)
+        count = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT kind, object_id, text, bm25({SEARCH_TABLE}) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE {where} "
+            "ORDER BY rank, kind, object_id LIMIT %s OFFSET %s",
+            [*params, limit, offset],
+        )
+        hits = [
+            {"type": row[0], "id": row[1], "text": row[2], "rank": row[3]}
+            for row in cursor.fetchall()
+        ]
+    return count, hits
@@ -5,9 +5,34 @@ These serializers handle the conversion between Django model instances
 and JSON representations for the API endpoints.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 
-from .models import Bill, Legislator, VoteResult
+from .instrumentation import timed
+from .models import Bill, Legislator, Vote, VoteResult
+from .queries import bill_vote_rows, legislator_vote_rows
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """List serializer reporting its ``.data`` time as ``serialize``."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """Model serializer reporting its ``.data`` time as ``serialize``.
+
+    Set ``Meta.list_serializer_class = TimedListSerializer`` to time
+    ``many=True`` as well.
+    """
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
 
 
 class LegislatorSerializer(serializers.ModelSerializer):
@@ -18,7 +43,7 @@ class LegislatorSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class LegislatorStatsSerializer(serializers.ModelSerializer):
+class LegislatorStatsSerializer(TimedModelSerializer):
     """Serializer for legislator with voting statistics.
 
     Falls back to model properties if annotated fields are not present,
@@ -31,6 +56,7 @@ class LegislatorStatsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Legislator
         fields = ["id", "name", "supported_bills_count", "opposed_bills_count"]
+        list_serializer_class = TimedListSerializer
 
     def get_supported_bills_count(self, obj):
         annotated = getattr(obj, "supported_bills_count_annotated", None)
@@ -53,7 +79,7 @@ class BillSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "primary_sponsor", "primary_sponsor_name"]
 
 
-class BillStatsSerializer(serializers.ModelSerializer):
+class BillStatsSerializer(TimedModelSerializer):
     """Serializer for bill with voting statistics.
 
     Count fields gracefully fall back to model properties when annotations
@@ -79,6 +105,7 @@ class BillStatsSerializer(serializers.ModelSerializer):
             "supporters_count",
             "opposers_count",
         ]
+        list_serializer_class = TimedListSerializer
 
     def get_supporters_count(self, obj):
         annotated = getattr(obj, "supporters_count_annotated", None)
@@ -115,9 +142,15 @@ class VoteDetailSerializer(serializers.ModelSerializer):
 
 
 class LegislatorDetailSerializer(LegislatorStatsSerializer):
-    """Serializer for detailed legislator information with vote history."""
+    """Serializer for detailed legislator information with vote history.
+
+    The viewset supplies one page of value-only vote rows as
+    ``prefetched_vote_results`` and the link to the next page as
+    ``vote_results_next``; without them the first page is queried here.
+    """
 
     vote_results = serializers.SerializerMethodField()
+    vote_results_next = serializers.SerializerMethodField()
 
     class Meta:
         model = Legislator
@@ -127,35 +160,40 @@ class LegislatorDetailSerializer(LegislatorStatsSerializer):
             "supported_bills_count",
             "opposed_bills_count",
             "vote_results",
+            "vote_results_next",
         ]
 
     def get_vote_results(self, obj):
-        """Get voting history for this legislator.
-
-        Uses prefetched results from the view when available to avoid
-        extra queries.
-        """
-        vote_results = obj.vote_results.all()
+        """Get one page of voting history for this legislator."""
+        rows = getattr(obj, "prefetched_vote_results", None)
+        if rows is None:
+            rows = legislator_vote_rows(obj.id)[: settings.VOTE_HISTORY_PAGE_SIZE]
+        legislator = {"id": obj.id, "name": obj.name}
         return [
             {
                 "bill": {
-                    "id": vr.vote.bill.id,
-                    "title": vr.vote.bill.title,
-                },
-                "is_support": vr.is_support,
-                "legislator": {
-                    "id": obj.id,
-                    "name": obj.name,
+                    "id": row["vote__bill_id"],
+                    "title": row["vote__bill__title"],
                 },
+                "is_support": row["vote_type"] == VoteResult.VoteType.YEA,
+                "legislator": legislator,
             }
-            for vr in vote_results
+            for row in rows
         ]
+
+    def get_vote_results_next(self, obj):
+        return getattr(obj, "vote_results_next", None)
 
 
 class BillDetailSerializer(BillStatsSerializer):
-    """Serializer for detailed bill information with vote breakdown."""
+    """Serializer for detailed bill information with vote breakdown.
+
+    Reads the page of vote rows supplied by the viewset, like
+    ``LegislatorDetailSerializer``.
+    """
 
     vote_results = serializers.SerializerMethodField()
+    vote_results_next = serializers.SerializerMethodField()
 
     class Meta:
         model = Bill
@@ -167,22 +205,49 @@ class BillDetailSerializer(BillStatsSerializer):
             "supporters_count",
             "opposers_count",
             "vote_results",
+            "vote_results_next",
         ]
 
     def get_vote_results(self, obj):
-        """Get all vote results for this bill."""
-        vote_results = (
-            VoteResult.objects.filter(vote__bill=obj)
-            .select_related("legislator")
-            .order_by("legislator__name")
-        )
+        """Get one page of vote results for this bill."""
+        rows = getattr(obj, "prefetched_vote_results", None)
+        if rows is None:
+            rows = bill_vote_rows(obj.id)[: settings.VOTE_HISTORY_PAGE_SIZE]
         return [
             {
                 "legislator": {
-                    "id": vr.legislator.id,
-                    "name": vr.legislator.name,
+                    "id": row["legislator_id"],
+                    "name": row["legislator__name"],
                 },
-                "is_support": vr.is_support,
+                "is_support": row["vote_type"] == VoteResult.VoteType.YEA,
             }
-            for vr in vote_results
+            for row in rows
         ]
+
+    def get_vote_results_next(self, obj):
+        return getattr(obj, "vote_results_next", None)
+
+
+class VoteTallySerializer(TimedModelSerializer):
+    """Serializer for a vote session with its Yea/Nay tallies.
+
+    Reads the ``yea_count``/``nay_count`` annotations added by
+    ``queries.votes_with_tallies``; ``outcome`` is the simple majority of
+    the votes cast.
+    """
+
+    yea_count = serializers.IntegerField(read_only=True)
+    nay_count = serializers.IntegerField(read_only=True)
+    outcome = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Vote
+        fields = ["id", "bill", "yea_count", "nay_count", "outcome"]
+        list_serializer_class = TimedListSerializer
+
+    def get_outcome(self, obj):
+        if obj.yea_count > obj.nay_count:
+            return "passed"
+        if obj.nay_count > obj.yea_count:
+            return "failed"
+        return "tied"
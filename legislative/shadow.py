@@ -0,0 +1,269 @@
+"""
+Zero-downtime dataset reloads through a shadow SQLite database.
+
+With ``load_data --shadow`` the live database path
+(``DATABASES["default"]["NAME"]``) becomes a symlink to a generation file
+in ``SQLITE_GENERATIONS_DIR``. A reload:
+
+1. copies the live generation with SQLite's online backup (so users,
+   sessions and the manifest carry over) into a new shadow file,
+2. replaces the dataset there through a temporary ``shadow`` database alias
+   (totals, search index and manifest version included) while requests
+   keep reading the live file,
+3. validates the shadow (``quick_check``, foreign keys, totals),
+4. atomically points the live symlink at it (``os.replace``); new
+   connections open the new file and persistent ones are closed at the
+   start of their next request (``close_swapped_connections``).
+
+The replaced generation is kept as ``previous`` for ``load_data --rollback``,
+which gives it a new manifest version above every version issued so far, so
+caches and change-feed clients never see a version number reused.
+Writes made to the live file during a reload (e.g. new sessions) are not
+carried over.
+"""
+
+import copy
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+from .models import Bill, Legislator, VoteResult
+
+SHADOW_ALIAS = "shadow"
+PREVIOUS_LINK = "previous"
+CHECKPOINT_TIMEOUT = 10.0  # seconds to wait for readers blocking a checkpoint
+CHECKPOINT_RETRY_DELAY = 0.05
+
+
+class ShadowReloadError(Exception):
+    """The shadow database cannot be created, validated or swapped in."""
+
+
+def live_path():
+    return Path(settings.DATABASES[DEFAULT_DB_ALIAS]["NAME"])
+
+
+def generations_dir():
+    return Path(settings.SQLITE_GENERATIONS_DIR)
+
+
+def current_generation():
+    """Resolved file the live path points at."""
+    return Path(os.path.realpath(live_path()))
+
+
+def previous_generation():
+    link = generations_dir() / PREVIOUS_LINK
+    return Path(os.path.realpath(link)) if link.is_symlink() else None
+
+
+def _new_generation_path():
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return generations_dir() / f"db-{stamp}-{uuid.uuid4().hex[:6]}.sqlite3"
+
+
+def _replace_symlink(link, target):
+    """Point ``link`` at ``target`` in one atomic rename."""
+    tmp = link.with_name(f".{link.name}.{uuid.uuid4().hex[:6]}")
+    os.symlink(target, tmp)
+    os.replace(tmp, link)
+
+
+def adopt_live_database():
+    """Turn a plain live database file into a symlink to a generation."""
+    live = live_path()
+    if live.is_symlink():
+        return
+    if not live.is_file():
+        raise ShadowReloadError(f"Live database {live} does not exist; run migrate.")
+    generations_dir().mkdir(parents=True, exist_ok=True)
+    _checkpoint(live)
+    generation = _new_generation_path()
+    os.link(live, generation)
+    _replace_symlink(live, generation.absolute())
+
+
+def _checkpoint(path, timeout=None):
+    """Move every WAL frame of ``path`` into the database file.
+
+    Frames left in ``<path>-wal`` would stay tied to the old path after the
+    swap, so a checkpoint blocked by a reader (``busy``) or one that did not
+    copy the whole log is retried until ``CHECKPOINT_TIMEOUT``.
+    """
+    deadline = time.monotonic() + (CHECKPOINT_TIMEOUT if timeout is None else timeout)
+    # The busy handler waits at most one retry delay; the loop does the rest.
+    conn = sqlite3.connect(path, timeout=CHECKPOINT_RETRY_DELAY)
+    try:
+        while True:
+            busy, log, checkpointed = conn.execute(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).fetchone()
+            if busy == 0 and log == checkpointed:
+                return
+            if time.monotonic() >= deadline:
+                raise ShadowReloadError(
+                    f"Could not checkpoint {path} ({checkpointed} of {log} WAL "
+                    "frames copied, readers busy); retry the reload."
+                )
+            time.sleep(CHECKPOINT_RETRY_DELAY)
+    finally:
+        conn.close()
+
+
+@contextmanager
+def shadow_database():
+    """Copy the live generation to a new file and expose it as ``shadow``.
+
+    Yields ``(alias, path)``; the file is removed unless ``promote`` swapped
+    it in.
+    """
+    adopt_live_database()
+    path = _new_generation_path()
+    source = sqlite3.connect(current_generation())
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+    # Registered on this thread only, not in DATABASES: request threads and
+    # the router never see the alias.
+    shadow_settings = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+    shadow_settings.update(NAME=path, CONN_MAX_AGE=0)
+    backend = load_backend(shadow_settings["ENGINE"])
+    connections[SHADOW_ALIAS] = backend.DatabaseWrapper(shadow_settings, SHADOW_ALIAS)
+    try:
+        yield SHADOW_ALIAS, path
+    finally:
+        connections[SHADOW_ALIAS].close()
+        del connections[SHADOW_ALIAS]
+        if current_generation() != path.resolve():
+            _remove_generation(path)
+
+
+def validate(using):
+    """Problems found in the database behind ``using`` (empty when valid)."""
+    problems = []
+    with connections[using].cursor() as cursor:
+        cursor.execute("PRAGMA quick_check")
+        result = [row[0] for row in cursor.fetchall()]
+        if result != ["ok"]:
+            problems.append(f"quick_check: {'; '.join(result[:5])}")
+        cursor.execute("PRAGMA foreign_key_check")
+        violations = cursor.fetchall()
+        if violations:
+            problems.append(f"{len(violations)} foreign key violations")
+    for model in (Legislator, Bill, VoteResult):
+        if not model.objects.using(using).exists():
+            problems.append(f"{model._meta.db_table} is empty")
+    votes = VoteResult.objects.using(using).count()
+    totals = sum(
+        sum(row)
+        for row in Legislator.objects.using(using).values_list(
+            "supported_bills_total", "opposed_bills_total"
+        )
+    )
+    if totals != votes:
+        problems.append(f"vote totals ({totals}) do not match vote results ({votes})")
+    return problems
+
+
+def promote(path):
+    """Atomically make ``path`` the live generation, keeping the old one."""
+    previous = current_generation()
+    _replace_symlink(live_path(), Path(path).absolute())
+    _replace_symlink(generations_dir() / PREVIOUS_LINK, previous)
+    prune()
+
+
+def rollback():
+    """Swap the previous generation back in; returns the restored path."""
+    previous = previous_generation()
+    if previous is None or not previous.is_file():
+        raise ShadowReloadError("There is no previous generation to roll back to.")
+    _reissue_version(previous, _manifest_version(current_generation()) + 1)
+    promote(previous)
+    return previous
+
+
+def _manifest_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute(
+            "SELECT MAX(version) FROM legislative_dataset_manifest"
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] or 0
+
+
+def _reissue_version(path, version):
+    """Give generation ``path`` manifest ``version`` (at least) and start its
+    change log there: it lacks the changes logged by the generation it
+    replaces, so change-feed clients must resync."""
+    version = max(version, _manifest_version(path) + 1)
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            updated = conn.execute(
+                "UPDATE legislative_dataset_manifest "
+                "SET version = ?, changes_from = ?",
+                (version, version),
+            ).rowcount
+            if not updated:
+                conn.execute(
+                    "INSERT INTO legislative_dataset_manifest (version, "
+                    "legislators, bills, votes, vote_results, source_hashes, "
+                    "source_stats, changes_from) "
+                    "VALUES (?, 0, 0, 0, 0, '{}', '{}', ?)",
+                    (version, version),
+                )
+    finally:
+        conn.close()
+    _checkpoint(path)
+
+
+def _remove_generation(path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def prune():
+    """Delete generation files other than the live and previous ones."""
+    keep = {current_generation(), previous_generation()}
+    for path in generations_dir().glob("db-*.sqlite3"):
+        if path.resolve() not in keep:
+            _remove_generation(path)
+
+
+def _database_file(connection):
+    """Resolved file behind ``connection`` (``None`` for in-memory)."""
+    if connection.is_in_memory_db():
+        return None
+    name = str(connection.settings_dict["NAME"])
+    if name.startswith("file:"):
+        name = unquote(urlparse(name).path)
+    return Path(os.path.realpath(name))
+
+
+def record_generation(sender, connection, **kwargs):
+    """``connection_created`` receiver remembering the file it opened."""
+    if connection.vendor == "sqlite":
+        connection.sqlite_generation = _database_file(connection)
+
+
+def close_swapped_connections(**kwargs):
+    """``request_started`` receiver closing connections to a replaced file."""
+    for connection in connections.all(initialized_only=True):
+        opened = getattr(connection, "sqlite_generation", None)
+        if opened is not None and opened != _database_file(connection):
+            connection.close()
@@ -0,0 +1,385 @@
+"""
+Database-free serving from an exported, memory-mapped snapshot.
+
+``export_snapshot`` writes the dataset as one ``.npy`` typed array per
+column into ``SNAPSHOT_DIR/v<version>-<id>/`` and points
+``SNAPSHOT_DIR/current`` at it:
+
+* legislators and bills by ascending id, with their vote totals, the
+  precomputed default list order and a rank for string ordering; names and
+  titles are one UTF-8 blob plus an offsets array,
+* vote results twice, CSR style: grouped per legislator (newest first) and
+  per bill (by legislator name), each with an ``offsets`` array so a
+  detail page is a slice.
+
+With ``SNAPSHOT_SERVING`` on, ``LegislatorViewSet``, ``BillViewSet`` and
+``stats_api_view`` (and their async versions) answer from the snapshot
+without touching SQLite. Arrays are opened with ``mmap``, so a worker
+starts by reading a few headers and every process on the host shares the
+same page cache. A newly exported snapshot is picked up on the next
+request; without one the views read the database as usual.
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import Http404
+
+from .filters import VoteCountFilterBackend
+from .models import Bill, DatasetManifest, Legislator, Vote, VoteResult
+from .pagination import VoteHistoryPagination
+
+CURRENT_LINK = "current"
+FORMAT = 1
+YEA = int(VoteResult.VoteType.YEA)
+
+# Model field -> array used by the list filters and ordering.
+COLUMNS = {
+    "legislator": {
+        "id": "legislator_ids",
+        "name": "legislator_name_rank",
+        "supported_bills_total": "legislator_supported",
+        "opposed_bills_total": "legislator_opposed",
+    },
+    "bill": {
+        "id": "bill_ids",
+        "title": "bill_title_rank",
+        "supporters_total": "bill_supporters",
+        "opposers_total": "bill_opposers",
+    },
+}
+MODELS = {"legislator": Legislator, "bill": Bill}
+# Cacheable routes answered from the snapshot; every other route still
+# reads the database.
+URL_NAMES = frozenset(
+    ("legislator-list", "legislator-detail", "bill-list", "bill-detail")
+)
+COMPARISONS = {
+    "gt": np.greater,
+    "gte": np.greater_equal,
+    "lt": np.less,
+    "lte": np.less_equal,
+}
+
+
+class SnapshotError(Exception):
+    """A snapshot directory is missing files or has another format."""
+
+
+def _int_array(values, columns=1):
+    array = np.array(values, dtype=np.int64)
+    return array.reshape(-1, columns) if columns > 1 else array.reshape(-1)
+
+
+def _strings(values):
+    """UTF-8 blob and ``len + 1`` offsets for ``values``."""
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _ranks(values):
+    """Dense rank of each value in sort order (equal values share a rank)."""
+    rank = {value: i for i, value in enumerate(sorted(set(values)))}
+    return np.array([rank[value] for value in values], dtype=np.int64)
+
+
+def _offsets(owners, count):
+    """CSR offsets for rows already grouped by owner index."""
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(owners, minlength=count))
+    return offsets
+
+
+def _collect(using):
+    """Every snapshot array, read in one transaction."""
+    arrays = {}
+    with transaction.atomic(using=using):
+        legislators = Legislator.objects.using(using)
+        rows = list(
+            legislators.order_by("id").values_list(
+                "id", "name", "supported_bills_total", "opposed_bills_total"
+            )
+        )
+        ids = _int_array([row[0] for row in rows])
+        names = [row[1] for row in rows]
+        arrays["legislator_ids"] = ids
+        arrays["legislator_name_blob"], arrays["legislator_name_offsets"] = _strings(
+            names
+        )
+        arrays["legislator_name_rank"] = _ranks(names)
+        arrays["legislator_supported"] = _int_array([row[2] for row in rows])
+        arrays["legislator_opposed"] = _int_array([row[3] for row in rows])
+        arrays["legislator_default_order"] = np.searchsorted(
+            ids, _int_array(legislators.order_by("name").values_list("id", flat=True))
+        )
+
+        bills = Bill.objects.using(using)
+        rows = list(
+            bills.order_by("id").values_list(
+                "id", "title", "supporters_total", "opposers_total", "primary_sponsor"
+            )
+        )
+        bill_ids = _int_array([row[0] for row in rows])
+        titles = [row[1] for row in rows]
+        arrays["bill_ids"] = bill_ids
+        arrays["bill_title_blob"], arrays["bill_title_offsets"] = _strings(titles)
+        arrays["bill_title_rank"] = _ranks(titles)
+        arrays["bill_supporters"] = _int_array([row[2] for row in rows])
+        arrays["bill_opposers"] = _int_array([row[3] for row in rows])
+        arrays["bill_sponsor"] = np.searchsorted(
+            ids, _int_array([row[4] for row in rows])
+        )
+        arrays["bill_default_order"] = np.searchsorted(
+            bill_ids, _int_array(bills.order_by("title").values_list("id", flat=True))
+        )
+
+        votes = _int_array(
+            Vote.objects.using(using).order_by("id").values_list("id", "bill_id"), 2
+        )
+        arrays["vote_ids"] = votes[:, 0]
+        arrays["vote_bill"] = np.searchsorted(bill_ids, votes[:, 1])
+
+        results = VoteResult.objects.using(using)
+        rows = _int_array(
+            [
+                (legislator, bill, int(vote_type))
+                for legislator, bill, vote_type in results.order_by(
+                    "legislator_id", "-id"
+                ).values_list("legislator_id", "vote__bill_id", "vote_type")
+            ],
+            3,
+        )
+        owners = np.searchsorted(ids, rows[:, 0])
+        arrays["legislator_vote_offsets"] = _offsets(owners, len(ids))
+        arrays["legislator_vote_bill"] = np.searchsorted(bill_ids, rows[:, 1])
+        arrays["legislator_vote_type"] = rows[:, 2].astype(np.int8)
+
+        rows = _int_array(
+            [
+                (bill, legislator, int(vote_type))
+                for bill, legislator, vote_type in results.order_by(
+                    "vote__bill_id", "legislator__name", "id"
+                ).values_list("vote__bill_id", "legislator_id", "vote_type")
+            ],
+            3,
+        )
+        owners = np.searchsorted(bill_ids, rows[:, 0])
+        arrays["bill_vote_offsets"] = _offsets(owners, len(bill_ids))
+        arrays["bill_vote_legislator"] = np.searchsorted(ids, rows[:, 1])
+        arrays["bill_vote_type"] = rows[:, 2].astype(np.int8)
+
+        version = (
+            DatasetManifest.objects.using(using)
+            .filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+            or 0
+        )
+    return arrays, version
+
+
+def export_snapshot(directory=None, using=DEFAULT_DB_ALIAS):
+    """Write a snapshot and make it current; returns its directory."""
+    root = Path(directory or settings.SNAPSHOT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    arrays, version = _collect(using)
+    name = f"v{version}-{uuid.uuid4().hex[:8]}"
+    staging = root / f".{name}"
+    staging.mkdir()
+    for array_name, array in arrays.items():
+        np.save(staging / f"{array_name}.npy", np.ascontiguousarray(array))
+    manifest = {
+        "format": FORMAT,
+        "version": version,
+        "exported_at": time.time(),
+        "counts": {
+            "legislators": len(arrays["legislator_ids"]),
+            "bills": len(arrays["bill_ids"]),
+            "votes": len(arrays["vote_ids"]),
+            "vote_results": len(arrays["legislator_vote_bill"]),
+        },
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest))
+    os.rename(staging, root / name)
+
+    link = root / CURRENT_LINK
+    keep = {name, os.readlink(link) if link.is_symlink() else None}
+    tmp_link = root / f".{CURRENT_LINK}.{uuid.uuid4().hex[:6]}"
+    os.symlink(name, tmp_link)
+    os.replace(tmp_link, link)
+    # The replaced snapshot stays for workers about to open it; workers
+    # mapping older ones keep their open files after the unlink.
+    for path in root.iterdir():
+        if path.is_dir() and not path.is_symlink() and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    return root / name
+
+
+class Snapshot:
+    """Read-only view of one exported snapshot directory."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.manifest = json.loads((self.path / "manifest.json").read_text())
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot read snapshot {self.path}: {e}") from e
+        if self.manifest.get("format") != FORMAT:
+            raise SnapshotError(f"Snapshot {self.path} has an unsupported format.")
+        self.arrays = {
+            path.stem: np.load(path, mmap_mode="r") for path in self.path.glob("*.npy")
+        }
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    def string(self, name, index):
+        offsets = self.arrays[f"{name}_offsets"]
+        blob = self.arrays[f"{name}_blob"]
+        return bytes(blob[offsets[index] : offsets[index + 1]]).decode()
+
+    def index(self, kind, pk):
+        """Position of ``pk`` in the ``kind`` arrays, or ``None``."""
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        ids = self.arrays[f"{kind}_ids"]
+        position = int(np.searchsorted(ids, pk))
+        return position if position < len(ids) and ids[position] == pk else None
+
+    def select(self, kind, filters, ordering, limit):
+        """Positions matching ``VoteCountFilterBackend.parse`` output."""
+        columns = COLUMNS[kind]
+        if ordering:
+            keys = []
+            for term in reversed(ordering):
+                column = np.asarray(self.arrays[columns[term.lstrip("-")]])
+                keys.append(-column if term.startswith("-") else column)
+            order = np.lexsort(keys)
+        else:
+            order = np.asarray(self.arrays[f"{kind}_default_order"])
+        if filters:
+            mask = np.ones(len(self.arrays[f"{kind}_ids"]), dtype=bool)
+            for field, lookup, value in filters:
+                mask &= COMPARISONS[lookup](self.arrays[columns[field]], value)
+            order = order[mask[order]]
+        return order[:limit] if limit is not None else order
+
+    def legislator(self, index):
+        return {
+            "id": int(self.arrays["legislator_ids"][index]),
+            "name": self.string("legislator_name", index),
+            "supported_bills_count": int(self.arrays["legislator_supported"][index]),
+            "opposed_bills_count": int(self.arrays["legislator_opposed"][index]),
+        }
+
+    def bill(self, index):
+        sponsor = int(self.arrays["bill_sponsor"][index])
+        return {
+            "id": int(self.arrays["bill_ids"][index]),
+            "title": self.string("bill_title", index),
+            "primary_sponsor": self.string("legislator_name", sponsor),
+            "primary_sponsor_id": int(self.arrays["legislator_ids"][sponsor]),
+            "supporters_count": int(self.arrays["bill_supporters"][index]),
+            "opposers_count": int(self.arrays["bill_opposers"][index]),
+        }
+
+    def vote_page(self, kind, index, offset, limit):
+        """Slice bounds of one vote history page and whether more follow."""
+        offsets = self.arrays[f"{kind}_vote_offsets"]
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        low = min(start + offset, end)
+        high = min(low + limit, end)
+        return slice(low, high), high < end
+
+    def legislator_votes(self, index, window):
+        legislator = {
+            "id": int(self.arrays["legislator_ids"][index]),
+            "name": self.string("legislator_name", index),
+        }
+        bills = self.arrays["legislator_vote_bill"][window]
+        types = self.arrays["legislator_vote_type"][window]
+        return [
+            {
+                "bill": {
+                    "id": int(self.arrays["bill_ids"][bill]),
+                    "title": self.string("bill_title", bill),
+                },
+                "is_support": int(vote_type) == YEA,
+                "legislator": legislator,
+            }
+            for bill, vote_type in zip(bills, types)
+        ]
+
+    def bill_votes(self, index, window):
+        legislators = self.arrays["bill_vote_legislator"][window]
+        types = self.arrays["bill_vote_type"][window]
+        return [
+            {
+                "legislator": {
+                    "id": int(self.arrays["legislator_ids"][legislator]),
+                    "name": self.string("legislator_name", legislator),
+                },
+                "is_support": int(vote_type) == YEA,
+            }
+            for legislator, vote_type in zip(legislators, types)
+        ]
+
+
+_current = None
+
+
+def current():
+    """The current snapshot when ``SNAPSHOT_SERVING`` is on, else ``None``."""
+    global _current
+    if not getattr(settings, "SNAPSHOT_SERVING", False):
+        return None
+    link = Path(settings.SNAPSHOT_DIR) / CURRENT_LINK
+    try:
+        target = link.parent / os.readlink(link)
+    except OSError:
+        return None
+    snapshot = _current
+    if snapshot is None or snapshot.path != target:
+        snapshot = _current = Snapshot(target)
+    return snapshot
+
+
+def list_data(snapshot, kind, request, view):
+    """List endpoint body; raises ``ValidationError`` for bad parameters."""
+    filters, ordering, limit = VoteCountFilterBackend().parse(request, view)
+    row = getattr(snapshot, kind)
+    return [row(index) for index in snapshot.select(kind, filters, ordering, limit)]
+
+
+def detail_data(snapshot, kind, request, pk):
+    """Detail endpoint body with one vote history page; raises ``Http404``."""
+    index = snapshot.index(kind, pk)
+    if index is None:
+        raise Http404(f"No {MODELS[kind]._meta.object_name} matches the given query.")
+    paginator = VoteHistoryPagination(request)
+    window, paginator.has_next = snapshot.vote_page(
+        kind, index, paginator.offset, paginator.limit
+    )
+    votes = getattr(snapshot, f"{kind}_votes")
+    return {
+        **getattr(snapshot, kind)(index),
+        "vote_results": votes(index, window),
+        "vote_results_next": paginator.get_next_link(),
+    }
+
+
+def stats_data(snapshot):
+    counts = snapshot.manifest["counts"]
+    return {key: counts[key] for key in ("legislators", "bills", "vote_results")}
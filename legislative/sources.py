@@ -0,0 +1,38 @@
+"""
+The four CSV files ``load_data`` reads: names, required columns and lookup.
+"""
+
+import errno
+import hashlib
+import os
+
+# In load order; each file's rows reference the files before it.
+CSV_FILES = ("legislators.csv", "bills.csv", "votes.csv", "vote_results.csv")
+REQUIRED_COLUMNS = {
+    "legislators.csv": ["id", "name"],
+    "bills.csv": ["id", "title", "sponsor_id"],
+    "votes.csv": ["id", "bill_id"],
+    "vote_results.csv": ["id", "legislator_id", "vote_id", "vote_type"],
+}
+HASH_BLOCK_SIZE = 1 << 20
+# Tried in order for each of CSV_FILES (zstd through the zstandard package).
+COMPRESSED_SUFFIXES = ("", ".gz", ".zst")
+
+
+def source_path(csv_path, filename):
+    """``filename`` in ``csv_path``, or the first compressed variant present."""
+    for suffix in COMPRESSED_SUFFIXES:
+        path = os.path.join(csv_path, filename + suffix)
+        if os.path.exists(path):
+            return path
+    path = os.path.join(csv_path, filename)
+    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of ``path``, read in ``HASH_BLOCK_SIZE`` blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
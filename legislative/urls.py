@@ -10,17 +10,30 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     BillViewSet,
     LegislatorViewSet,
+    VoteViewSet,
     bill_detail_view,
     bills_view,
+    changes_api_view,
     home_view,
+    leaderboard_api_view,
+    leaderboards_api_view,
     legislator_detail_view,
     legislators_view,
+    load_job_api_view,
+    load_jobs_api_view,
+    manifest_api_view,
+    metrics_view,
+    profile_detail_view,
+    profiles_view,
+    search_api_view,
     stats_api_view,
+    stats_by_party_api_view,
 )
 
 router = DefaultRouter()
 router.register(r"legislators", LegislatorViewSet, basename="legislator")
 router.register(r"bills", BillViewSet, basename="bill")
+router.register(r"votes", VoteViewSet, basename="vote")
 
 urlpatterns = [
     # Web interface routes
@@ -35,5 +48,16 @@ urlpatterns = [
     path("bills/<int:bill_id>/", bill_detail_view, name="bill_detail"),
     # API routes
     path("api/stats/", stats_api_view, name="stats_api"),
+    path("api/stats/by-party/", stats_by_party_api_view, name="stats_by_party"),
+    path("api/manifest/", manifest_api_view, name="manifest_api"),
+    path("api/leaderboards/", leaderboards_api_view, name="leaderboards"),
+    path("api/leaderboards/<slug:name>/", leaderboard_api_view, name="leaderboard"),
+    path("api/changes/", changes_api_view, name="changes"),
+    path("api/search/", search_api_view, name="search_api"),
+    path("api/loads/", load_jobs_api_view, name="load_jobs"),
+    path("api/loads/<int:pk>/", load_job_api_view, name="load_job"),
     path("api/", include(router.urls)),
+    path("metrics", metrics_view, name="metrics"),
+    path("profiles/", profiles_view, name="profiles"),
+    path("profiles/<str:profile_id>/", profile_detail_view, name="profile_detail"),
 ]
@@ -0,0 +1,136 @@
+"""
+Whole-file checks of the CSV inputs for ``load_data --validate-only``.
+
+Each file is read once, limited to its required columns. Every check is a
+pandas column operation, so ``validate_sources`` reports every problem at
+once and never touches the database. The checks are missing files and
+columns, duplicate ids, dangling references, invalid ``vote_type`` values
+and duplicate (legislator, vote) pairs, which would break
+``unique_legislator_vote``.
+"""
+
+import pandas as pd
+
+from .models import VoteResult
+from .sources import CSV_FILES, REQUIRED_COLUMNS, source_path
+
+SAMPLE_ROWS = 5
+
+# file: [(column, referenced file)]
+REFERENCES = {
+    "bills.csv": [("sponsor_id", "legislators.csv")],
+    "votes.csv": [("bill_id", "bills.csv")],
+    "vote_results.csv": [
+        ("legislator_id", "legislators.csv"),
+        ("vote_id", "votes.csv"),
+    ],
+}
+
+
+def _problem(filename, message, rows=None):
+    """Report entry; ``rows`` are the offending rows (the CSV line numbers
+    are kept for the samples)."""
+    if rows is None:
+        return {"file": filename, "message": message, "count": 1, "samples": []}
+    samples = [
+        {"line": int(index) + 2, **{k: _plain(v) for k, v in row.items()}}
+        for index, row in rows.head(SAMPLE_ROWS).iterrows()
+    ]
+    return {
+        "file": filename,
+        "message": message,
+        "count": len(rows),
+        "samples": samples,
+    }
+
+
+def _plain(value):
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def _read(csv_path, filename):
+    """``(frame, problems)``; the frame has the required columns present."""
+    try:
+        path = source_path(csv_path, filename)
+        header = pd.read_csv(path, nrows=0).columns
+    except FileNotFoundError:
+        return None, [_problem(filename, "file not found")]
+    except pd.errors.EmptyDataError:
+        return None, [_problem(filename, "file is empty")]
+    required = REQUIRED_COLUMNS[filename]
+    missing = [column for column in required if column not in header]
+    problems = []
+    if missing:
+        problems.append(
+            _problem(filename, f"missing required columns: {', '.join(missing)}")
+        )
+    usecols = [column for column in required if column in header]
+    return pd.read_csv(path, usecols=usecols)[usecols], problems
+
+
+def _invalid_vote_types(vote_types):
+    valid = [choice.value for choice in VoteResult.VoteType]
+    if pd.api.types.is_integer_dtype(vote_types):
+        return ~vote_types.isin([int(value) for value in valid])
+    return ~vote_types.astype(str).str.strip().isin(valid)
+
+
+def validate_sources(csv_path):
+    """Every problem in the CSV files of ``csv_path``, as report entries."""
+    frames, problems = {}, []
+    for filename in CSV_FILES:
+        frame, read_problems = _read(csv_path, filename)
+        problems.extend(read_problems)
+        if frame is not None:
+            frames[filename] = frame
+
+    for filename, frame in frames.items():
+        if "id" in frame:
+            duplicated = frame[frame["id"].duplicated(keep=False)]
+            if len(duplicated):
+                problems.append(_problem(filename, "duplicate id", duplicated))
+        for column, target in REFERENCES.get(filename, []):
+            if column not in frame or "id" not in frames.get(target, {}):
+                continue
+            dangling = frame[~frame[column].isin(frames[target]["id"])]
+            if len(dangling):
+                problems.append(
+                    _problem(filename, f"{column} not found in {target}", dangling)
+                )
+
+    results = frames.get("vote_results.csv")
+    if results is not None and "vote_type" in results:
+        invalid = results[_invalid_vote_types(results["vote_type"])]
+        if len(invalid):
+            problems.append(
+                _problem(
+                    "vote_results.csv",
+                    "invalid vote_type (expected 1 or 2)",
+                    invalid,
+                )
+            )
+    if results is not None and {"legislator_id", "vote_id"} <= set(results):
+        pairs = results.duplicated(["legislator_id", "vote_id"], keep=False)
+        if pairs.any():
+            problems.append(
+                _problem(
+                    "vote_results.csv",
+                    "duplicate (legislator_id, vote_id) pair",
+                    results[pairs],
+                )
+            )
+    return problems
+
+
+def format_report(problems):
+    """Text report: one line per problem, then its sample rows."""
+    lines = []
+    for problem in problems:
+        lines.append(f"{problem['file']}: {problem['message']} ({problem['count']})")
+        for sample in problem["samples"]:
+            line = sample["line"]
+            values = ", ".join(f"{k}={v}" for k, v in sample.items() if k != "line")
+            lines.append(f"    line {line}: {values}")
+    return "\n".join(lines)
@@ -1,19 +1,119 @@
-from django.db.models import Count, Prefetch, Q
-from django.http import JsonResponse
+import io
+import pstats
+
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, render
-from rest_framework import viewsets
+from django.urls import reverse
+from rest_framework import generics, permissions, serializers, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
 
-from .models import Bill, Legislator, VoteResult
+from . import documents, jobs, metrics, profiling, snapshot
+from .filters import VoteCountFilterBackend
+from .leaderboards import BOARDS
+from .models import (
+    Bill,
+    BillDocument,
+    DatasetManifest,
+    Leaderboard,
+    Legislator,
+    LegislatorDocument,
+    Vote,
+    VoteResult,
+)
+from .pagination import (
+    ChangePagination,
+    SearchPagination,
+    VoteHistoryPagination,
+    VotePagination,
+)
+from .queries import (
+    bill_vote_breakdown,
+    bill_vote_rows,
+    bill_votes,
+    bills_with_counts,
+    changes_between,
+    legislator_vote_rows,
+    legislators_with_counts,
+    party_stats,
+    votes_with_tallies,
+)
+from .search import KINDS, build_match_expression, search
 from .serializers import (
     BillDetailSerializer,
     BillStatsSerializer,
     LegislatorDetailSerializer,
     LegislatorStatsSerializer,
+    VoteTallySerializer,
 )
 
 
-class LegislatorViewSet(viewsets.ReadOnlyModelViewSet):
+class VoteHistoryMixin:
+    """Retrieve with one page of value-only vote rows attached to the object.
+
+    Subclasses provide ``get_vote_history_queryset(obj)``; the rows and the
+    next-page link are read by the detail serializers. JSON requests for the
+    default window are answered from ``document_model`` when ``load_data``
+    has stored the object's document (see ``documents``).
+    """
+
+    document_model = None
+
+    def get_vote_history_queryset(self, obj):
+        raise NotImplementedError
+
+    def attach_vote_history(self, obj, paginator, rows):
+        obj.prefetched_vote_results = paginator.paginate_rows(rows)
+        obj.vote_results_next = paginator.get_next_link()
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == "json":
+            response = documents.document_response(
+                self.document_model, request, kwargs[self.lookup_field]
+            )
+            if response is not None:
+                return response
+        instance = self.get_object()
+        paginator = VoteHistoryPagination(request)
+        rows = paginator.page_queryset(self.get_vote_history_queryset(instance))
+        self.attach_vote_history(instance, paginator, rows)
+        return Response(self.get_serializer(instance).data)
+
+
+class SnapshotMixin:
+    """Answer list and retrieve from the memory-mapped snapshot when serving
+    one (see ``snapshot``); otherwise fall through to the database."""
+
+    snapshot_kind = None
+
+    def list(self, request, *args, **kwargs):
+        current = snapshot.current()
+        if current is None:
+            return super().list(request, *args, **kwargs)
+        return Response(snapshot.list_data(current, self.snapshot_kind, request, self))
+
+    def retrieve(self, request, *args, **kwargs):
+        current = snapshot.current()
+        if current is None:
+            return super().retrieve(request, *args, **kwargs)
+        return Response(
+            snapshot.detail_data(
+                current, self.snapshot_kind, request, kwargs[self.lookup_field]
+            )
+        )
+
+
+class LegislatorViewSet(SnapshotMixin, VoteHistoryMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Legislator.objects.all()
+    document_model = LegislatorDocument
+    snapshot_kind = "legislator"
+    filter_backends = [VoteCountFilterBackend]
+    count_fields = {
+        "supported_bills_count": "supported_bills_total",
+        "opposed_bills_count": "opposed_bills_total",
+    }
+    ordering_fields = {"id": "id", "name": "name"}
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -23,38 +123,24 @@ class LegislatorViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         base_qs = Legislator.objects.all()
         if self.action == "retrieve":
-            return base_qs.prefetch_related(
-                Prefetch(
-                    "vote_results",
-                    queryset=VoteResult.objects.select_related(
-                        "vote__bill", "legislator"
-                    ).order_by("-id"),
-                )
-            ).annotate(
-                supported_bills_count_annotated=Count(
-                    "vote_results",
-                    filter=Q(vote_results__vote_type=VoteResult.VoteType.YEA),
-                ),
-                opposed_bills_count_annotated=Count(
-                    "vote_results",
-                    filter=Q(vote_results__vote_type=VoteResult.VoteType.NAY),
-                ),
-            )
+            return legislators_with_counts(base_qs)
         else:
-            return base_qs.annotate(
-                supported_bills_count_annotated=Count(
-                    "vote_results",
-                    filter=Q(vote_results__vote_type=VoteResult.VoteType.YEA),
-                ),
-                opposed_bills_count_annotated=Count(
-                    "vote_results",
-                    filter=Q(vote_results__vote_type=VoteResult.VoteType.NAY),
-                ),
-            ).order_by("name")
+            return legislators_with_counts(base_qs).order_by("name")
+
+    def get_vote_history_queryset(self, obj):
+        return legislator_vote_rows(obj.id)
 
 
-class BillViewSet(viewsets.ReadOnlyModelViewSet):
+class BillViewSet(SnapshotMixin, VoteHistoryMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Bill.objects.all()
+    document_model = BillDocument
+    snapshot_kind = "bill"
+    filter_backends = [VoteCountFilterBackend]
+    count_fields = {
+        "supporters_count": "supporters_total",
+        "opposers_count": "opposers_total",
+    }
+    ordering_fields = {"id": "id", "title": "title"}
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -64,98 +150,364 @@ class BillViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         base_qs = Bill.objects.select_related("primary_sponsor")
         if self.action == "retrieve":
-            return base_qs.annotate(
-                supporters_count_annotated=Count(
-                    "votes__results",
-                    filter=Q(votes__results__vote_type=VoteResult.VoteType.YEA),
-                ),
-                opposers_count_annotated=Count(
-                    "votes__results",
-                    filter=Q(votes__results__vote_type=VoteResult.VoteType.NAY),
-                ),
-            )
+            return bills_with_counts(base_qs)
         else:
-            return base_qs.annotate(
-                supporters_count_annotated=Count(
-                    "votes__results",
-                    filter=Q(votes__results__vote_type=VoteResult.VoteType.YEA),
-                ),
-                opposers_count_annotated=Count(
-                    "votes__results",
-                    filter=Q(votes__results__vote_type=VoteResult.VoteType.NAY),
-                ),
-            ).order_by("title")
+            return bills_with_counts(base_qs).order_by("title")
 
+    def get_vote_history_queryset(self, obj):
+        return bill_vote_rows(obj.id)
 
-def home_view(request):
-    stats = {
-        "legislators": Legislator.objects.count(),
-        "bills": Bill.objects.count(),
-        "vote_results": VoteResult.objects.count(),
+    @action(detail=True)
+    def breakdown(self, request, pk=None):
+        """Yea/Nay counts on the bill by party and by state."""
+        bill = generics.get_object_or_404(Bill.objects.values("id", "title"), pk=pk)
+        return Response(
+            bill_breakdown(
+                bill,
+                bill_vote_breakdown(bill["id"], "party"),
+                bill_vote_breakdown(bill["id"], "state"),
+            )
+        )
+
+    @action(detail=True)
+    def votes(self, request, pk=None):
+        """The bill's vote sessions with tallies, ``?limit=``/``?offset=``."""
+        paginator = VotePagination(request)
+        rows = paginator.paginate_rows(paginator.page_queryset(bill_votes_or_none(pk)))
+        if not rows:
+            # Only an empty page pays for telling "no votes" from "no bill".
+            generics.get_object_or_404(Bill.objects.values("id"), pk=pk)
+        return Response(
+            paginator.get_response_data(VoteTallySerializer(rows, many=True).data)
+        )
+
+
+class VoteViewSet(viewsets.ReadOnlyModelViewSet):
+    """Vote sessions with Yea/Nay tallies; the list is ``?limit=``/``?offset=``
+    paginated, without a COUNT query."""
+
+    serializer_class = VoteTallySerializer
+
+    def get_queryset(self):
+        return votes_with_tallies()
+
+    def list(self, request, *args, **kwargs):
+        paginator = VotePagination(request)
+        rows = paginator.paginate_rows(paginator.page_queryset(self.get_queryset()))
+        return Response(
+            paginator.get_response_data(self.get_serializer(rows, many=True).data)
+        )
+
+
+def bill_votes_or_none(pk):
+    """``bill_votes`` for a URL ``pk``; an empty queryset if it is not an id."""
+    try:
+        return bill_votes(int(pk))
+    except (TypeError, ValueError):
+        return Vote.objects.none()
+
+
+def _breakdown_rows(rows, key):
+    # Blank groups come from names without a "(P-ST-D)" suffix.
+    return [
+        {key: row["group"] or None, "yea": row["yea"], "nay": row["nay"]}
+        for row in rows
+    ]
+
+
+def bill_breakdown(bill, by_party, by_state):
+    return {
+        "id": bill["id"],
+        "title": bill["title"],
+        "by_party": _breakdown_rows(by_party, "party"),
+        "by_state": _breakdown_rows(by_state, "state"),
+    }
+
+
+def party_stats_response(rows):
+    return JsonResponse(
+        {"parties": [{**row, "party": row["party"] or None} for row in rows]}
+    )
+
+
+def leaderboards_data(rows):
+    """``{board name: entries}`` in ``BOARDS`` order from stored rows."""
+    stored = dict(rows)
+    return {name: stored.get(name, []) for name in BOARDS}
+
+
+def home_context(stats, leaderboards):
+    # Template variables cannot contain "-".
+    return {
+        "stats": stats,
+        "leaderboards": {
+            name.replace("-", "_"): entries for name, entries in leaderboards.items()
+        },
+    }
+
+
+def manifest_stats(manifest):
+    """``/api/stats/`` counts from a ``DatasetManifest.current_values`` row."""
+    return {
+        key: manifest[key] if manifest else 0
+        for key in ("legislators", "bills", "vote_results")
+    }
+
+
+def manifest_data(manifest):
+    if manifest is None:
+        return {
+            "version": 0,
+            "loaded_at": None,
+            "counts": {},
+            "source_hashes": {},
+            "changes_from": None,
+        }
+    return {
+        "version": manifest["version"],
+        "loaded_at": manifest["loaded_at"],
+        "counts": {key: manifest[key] for key in DatasetManifest.COUNT_FIELDS},
+        "source_hashes": manifest["source_hashes"],
+        "changes_from": manifest["changes_from"],
     }
-    return render(request, "legislative/home.html", {"stats": stats})
+
+
+def home_view(request):
+    stats = manifest_stats(DatasetManifest.current_values().first())
+    leaderboards = leaderboards_data(Leaderboard.objects.values_list("name", "entries"))
+    return render(request, "legislative/home.html", home_context(stats, leaderboards))
 
 
 def legislators_view(request):
-    legislators = Legislator.objects.annotate(
-        supported_bills_count_annotated=Count(
-            "vote_results",
-            filter=Q(vote_results__vote_type=VoteResult.VoteType.YEA),
-        ),
-        opposed_bills_count_annotated=Count(
-            "vote_results",
-            filter=Q(vote_results__vote_type=VoteResult.VoteType.NAY),
-        ),
-    ).order_by("name")
+    legislators = legislators_with_counts().order_by("name")
     return render(request, "legislative/legislators.html", {"legislators": legislators})
 
 
+def vote_history_context(paginator, rows):
+    """Template context for an HTML detail page's vote history: the page of
+    value-only ``rows`` fetched with ``paginator.page_queryset`` and links
+    to the neighbouring pages."""
+    rows = paginator.paginate_rows(rows)
+    for row in rows:
+        row["is_support"] = row["vote_type"] == VoteResult.VoteType.YEA
+    return {
+        "vote_results": rows,
+        "vote_results_next": paginator.get_next_link(),
+        "vote_results_previous": paginator.get_previous_link(),
+    }
+
+
 def legislator_detail_view(request, legislator_id):
-    legislator = get_object_or_404(Legislator, id=legislator_id)
+    legislator = get_object_or_404(legislators_with_counts(), id=legislator_id)
+    paginator = VoteHistoryPagination(request)
+    rows = paginator.page_queryset(legislator_vote_rows(legislator.id))
     return render(
-        request, "legislative/legislator_detail.html", {"legislator": legislator}
+        request,
+        "legislative/legislator_detail.html",
+        {"legislator": legislator, **vote_history_context(paginator, rows)},
     )
 
 
 def bills_view(request):
-    bills = (
-        Bill.objects.select_related("primary_sponsor")
-        .annotate(
-            supporters_count_annotated=Count(
-                "votes__results",
-                filter=Q(votes__results__vote_type=VoteResult.VoteType.YEA),
-            ),
-            opposers_count_annotated=Count(
-                "votes__results",
-                filter=Q(votes__results__vote_type=VoteResult.VoteType.NAY),
-            ),
-        )
-        .order_by("title")
-    )
+    bills = bills_with_counts().order_by("title")
     return render(request, "legislative/bills.html", {"bills": bills})
 
 
 def bill_detail_view(request, bill_id):
-    bill = get_object_or_404(Bill, id=bill_id)
-    vote_results = (
-        VoteResult.objects.filter(vote__bill=bill)
-        .select_related("legislator")
-        .order_by("legislator__name")
-    )
+    bill = get_object_or_404(bills_with_counts(), id=bill_id)
+    paginator = VoteHistoryPagination(request)
+    rows = paginator.page_queryset(bill_vote_rows(bill.id))
     return render(
         request,
         "legislative/bill_detail.html",
-        {
-            "bill": bill,
-            "vote_results": vote_results,
-        },
+        {"bill": bill, **vote_history_context(paginator, rows)},
     )
 
 
 def stats_api_view(request):
-    stats = {
-        "legislators": Legislator.objects.count(),
-        "bills": Bill.objects.count(),
-        "vote_results": VoteResult.objects.count(),
-    }
-    return JsonResponse(stats)
+    current = snapshot.current()
+    if current is not None:
+        return JsonResponse(snapshot.stats_data(current))
+    return JsonResponse(manifest_stats(DatasetManifest.current_values().first()))
+
+
+def manifest_api_view(request):
+    return JsonResponse(manifest_data(DatasetManifest.current_values().first()))
+
+
+def leaderboards_api_view(request):
+    rows = Leaderboard.objects.values_list("name", "entries")
+    return JsonResponse({"leaderboards": leaderboards_data(rows)})
+
+
+def leaderboard_api_view(request, name):
+    board = get_object_or_404(Leaderboard.objects.values("name", "entries"), pk=name)
+    return JsonResponse(board)
+
+
+def parse_changes_request(request):
+    """Validate ``since``; return ``(since, paginator, error)``."""
+    since = request.GET.get("since", "")
+    if not (since.isascii() and since.isdigit()):
+        error = JsonResponse(
+            {"detail": "Query parameter 'since' must be a dataset version (>= 0)."},
+            status=400,
+        )
+        return None, None, error
+    return int(since), ChangePagination(request), None
+
+
+def change_feed_version(manifest, since):
+    """``(version, error)``: the version the feed leads to, or a 410 when the
+    changes after ``since`` are no longer (or were never) logged."""
+    if manifest is None:
+        return 0, None
+    version = manifest["version"]
+    changes_from = manifest["changes_from"]
+    if changes_from is None:
+        changes_from = version
+    if since < changes_from:
+        error = JsonResponse(
+            {
+                "detail": (
+                    f"Changes before version {changes_from} are not available; "
+                    "reload the full dataset and sync from its version."
+                ),
+                "version": version,
+                "changes_from": changes_from,
+            },
+            status=410,
+        )
+        return version, error
+    return version, None
+
+
+def changes_response(paginator, since, version, rows):
+    return JsonResponse(
+        {"since": since, "version": version, **paginator.get_response_data(rows)}
+    )
+
+
+def changes_api_view(request):
+    since, paginator, error = parse_changes_request(request)
+    if error is not None:
+        return error
+    manifest = DatasetManifest.current_values().first()
+    version, error = change_feed_version(manifest, since)
+    if error is not None:
+        return error
+    queryset = paginator.page_queryset(changes_between(since, version))
+    return changes_response(
+        paginator, since, version, paginator.paginate_rows(queryset)
+    )
+
+
+def stats_by_party_api_view(request):
+    return party_stats_response(party_stats())
+
+
+def parse_search_request(request):
+    """Validate ``q``/``type``; return ``(match, kind, paginator, error)``."""
+    match = build_match_expression(request.GET.get("q", ""))
+    if not match:
+        error = JsonResponse({"detail": "Query parameter 'q' is required."}, status=400)
+        return None, None, None, error
+    kind = request.GET.get("type") or None
+    if kind is not None and kind not in KINDS:
+        error = JsonResponse(
+            {"detail": f"Invalid type '{kind}' (expected one of: {', '.join(KINDS)})."},
+            status=400,
+        )
+        return None, None, None, error
+    return match, kind, SearchPagination(request), None
+
+
+def search_response(paginator, count, hits):
+    paginator.set_count(count)
+    return JsonResponse(
+        {
+            "count": count,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": hits,
+        }
+    )
+
+
+def search_api_view(request):
+    match, kind, paginator, error = parse_search_request(request)
+    if error is not None:
+        return error
+    count, hits = search(match, kind, paginator.limit, paginator.offset)
+    return search_response(paginator, count, hits)
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (merged across worker processes)."""
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _require_profiling_access(request):
+    if not profiling.is_authorized(request, request.user):
+        raise PermissionDenied
+
+
+def profiles_view(request):
+    """List captured request profiles (staff only)."""
+    _require_profiling_access(request)
+    context = {"profiles": profiling.list_profiles()}
+    return render(request, "legislative/profiles.html", context)
+
+
+def profile_detail_view(request, profile_id):
+    """Download one capture; ``?view=text`` shows a cProfile summary."""
+    _require_profiling_access(request)
+    metadata = profiling.get_profile(profile_id)
+    if metadata is None:
+        raise Http404("Profile not found")
+    path = profiling.profiles_dir() / metadata["file"]
+    if request.GET.get("view") == "text" and metadata["format"] == "cprofile":
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.sort_stats("cumulative").print_stats(50)
+        return HttpResponse(output.getvalue(), content_type="text/plain")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=metadata["file"])
+
+
+class CanRunLoads(permissions.BasePermission):
+    """Staff users, or the ``X-Load-Token`` header (see ``jobs``)."""
+
+    def has_permission(self, request, view):
+        return jobs.is_authorized(request, request.user)
+
+
+@api_view(["GET", "POST"])
+@permission_classes([CanRunLoads])
+def load_jobs_api_view(request):
+    """Recent load jobs; POST queues ``load_data`` (``{"force": true}`` to
+    reload unchanged files) or returns the job already queued or running."""
+    if request.method == "GET":
+        return Response([jobs.job_data(job) for job in jobs.recent_jobs()])
+    force = serializers.BooleanField().to_internal_value(
+        request.data.get("force", False)
+    )
+    requested_by = request.user.get_username() if request.user.is_authenticated else ""
+    job, created = jobs.enqueue(force=force, requested_by=requested_by)
+    return Response(
+        jobs.job_data(job),
+        status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+        headers={"Location": reverse("load_job", args=[job.pk])},
+    )
+
+
+@api_view(["GET"])
+@permission_classes([CanRunLoads])
+def load_job_api_view(request, pk):
+    """One load job's status, phase, rows done and rows per second."""
+    job = jobs.get_job(pk)
+    if job is None:
+        raise Http404("Load job not found")
+    return Response(jobs.job_data(job))
@@ -1,267 +1,523 @@
-"""
-Tests for API endpoints using real CSV data.
-"""
-
-from django.urls import reverse
-from rest_framework import status
-
-from legislative.models import Bill, Legislator, Vote, VoteResult
-
-
-class TestStatsAPI:
-    """Test statistics API endpoint with real data."""
-
-    def test_stats_endpoint(self, api_client, real_csv_data):
-        """Test stats API returns correct counts from real CSV data."""
-        url = reverse("stats_api")
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        assert data["legislators"] == real_csv_data["expected_legislators"]
-        assert data["bills"] == real_csv_data["expected_bills"]
-        assert data["vote_results"] == real_csv_data["expected_vote_results"]
-
-
-class TestLegislatorAPI:
-    """Test legislator API endpoints with real data."""
-
-    def test_legislators_list(self, api_client, real_csv_data):
-        """Test legislators list API with real data."""
-        url = "/api/legislators/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        # Support both paginated and non-paginated responses
-        if isinstance(data, dict) and "results" in data:
-            results = data["results"]
-            count = data["count"]
-        else:
-            results = data
-            count = len(results)
-
-        assert count == real_csv_data["expected_legislators"]
-        assert len(results) == real_csv_data["expected_legislators"]
-
-        # Check one specific legislator (John Yarmuth - sponsor of Build Back Better)
-        yarmuth = next(
-            (r for r in results if r["id"] == real_csv_data["john_yarmuth_id"]),
-            None,
-        )
-        assert yarmuth is not None
-        assert yarmuth["name"] == "Rep. John Yarmuth (D-KY-3)"
-        # John Yarmuth sponsored Build Back Better but his vote record should be calculated
-        assert yarmuth["supported_bills_count"] >= 0
-        assert yarmuth["opposed_bills_count"] >= 0
-
-    def test_legislator_detail(self, api_client, real_csv_data):
-        """Test legislator detail API with real data."""
-        # Test John Yarmuth (sponsor of Build Back Better)
-        url = f"/api/legislators/{real_csv_data['john_yarmuth_id']}/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        assert data["id"] == real_csv_data["john_yarmuth_id"]
-        assert data["name"] == "Rep. John Yarmuth (D-KY-3)"
-        assert "supported_bills_count" in data
-        assert "opposed_bills_count" in data
-        assert "vote_results" in data
-
-    def test_legislator_not_found(self, api_client):
-        """Test legislator detail API with invalid ID."""
-        url = "/api/legislators/999999/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_404_NOT_FOUND
-
-
-class TestBillAPI:
-    """Test bill API endpoints with real data."""
-
-    def test_bills_list(self, api_client, real_csv_data):
-        """Test bills list API with real data."""
-        url = "/api/bills/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        if isinstance(data, dict) and "results" in data:
-            results = data["results"]
-            count = data["count"]
-        else:
-            results = data
-            count = len(results)
-
-        assert count == real_csv_data["expected_bills"]
-        assert len(results) == real_csv_data["expected_bills"]
-
-        # Check specific bills
-        bill_ids = [r["id"] for r in results]
-        assert real_csv_data["build_back_better_id"] in bill_ids
-        assert real_csv_data["infrastructure_bill_id"] in bill_ids
-
-        # Check Build Back Better Act
-        bbb_bill = next(
-            (r for r in results if r["id"] == real_csv_data["build_back_better_id"]),
-            None,
-        )
-        assert bbb_bill is not None
-        assert bbb_bill["title"] == "H.R. 5376: Build Back Better Act"
-        assert bbb_bill["primary_sponsor"] == "Rep. John Yarmuth (D-KY-3)"
-        assert bbb_bill["supporters_count"] >= 0
-        assert bbb_bill["opposers_count"] >= 0
-
-    def test_bill_detail(self, api_client, real_csv_data):
-        """Test bill detail API with real data."""
-        # Test Build Back Better Act
-        url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        assert data["id"] == real_csv_data["build_back_better_id"]
-        assert data["title"] == "H.R. 5376: Build Back Better Act"
-        assert data["primary_sponsor"] == "Rep. John Yarmuth (D-KY-3)"
-        assert "supporters_count" in data
-        assert "opposers_count" in data
-        assert "vote_results" in data
-
-        # The vote results should contain actual voting data
-        vote_results = data["vote_results"]
-        assert len(vote_results) > 0
-
-        # Check that all vote results have required fields
-        for vote_result in vote_results:
-            assert "legislator" in vote_result
-            assert "is_support" in vote_result
-            assert vote_result["legislator"]["id"] is not None
-            assert vote_result["legislator"]["name"] is not None
-
-    def test_infrastructure_bill_detail(self, api_client, real_csv_data):
-        """Test Infrastructure Investment and Jobs Act detail."""
-        url = f"/api/bills/{real_csv_data['infrastructure_bill_id']}/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-
-        assert data["id"] == real_csv_data["infrastructure_bill_id"]
-        assert data["title"] == "H.R. 3684: Infrastructure Investment and Jobs Act"
-        assert data["primary_sponsor"] == "Rep. Jamaal Bowman (D-NY-16)"
-
-    def test_bill_not_found(self, api_client):
-        """Test bill detail API with invalid ID."""
-        url = "/api/bills/999999/"
-        response = api_client.get(url)
-
-        assert response.status_code == status.HTTP_404_NOT_FOUND
-
-
-class TestWebInterface:
-    """Test web interface views with real data."""
-
-    def test_home_page(self, django_client, real_csv_data):
-        """Test home page loads correctly with real stats."""
-        response = django_client.get("/")
-        assert response.status_code == 200
-        content = response.content.decode()
-
-        assert "Quorum Legislative Data" in content
-        # Check that real statistics are displayed
-        assert str(real_csv_data["expected_legislators"]) in content
-        assert str(real_csv_data["expected_bills"]) in content
-
-    def test_legislators_page(self, django_client, real_csv_data):
-        """Test legislators page loads correctly."""
-        response = django_client.get("/legislators/")
-        assert response.status_code == 200
-        content = response.content.decode()
-
-        assert "Legislators" in content
-        # Should contain some of the real legislator names
-        assert "Rep. John Yarmuth" in content or "Rep. Jamaal Bowman" in content
-
-    def test_bills_page(self, django_client, real_csv_data):
-        """Test bills page loads correctly."""
-        response = django_client.get("/bills/")
-        assert response.status_code == 200
-        content = response.content.decode()
-
-        assert "Bills" in content
-        # Should contain the real bill titles
-        assert (
-            "Build Back Better Act" in content or "Infrastructure Investment" in content
-        )
-
-    def test_legislator_detail_page(self, django_client, real_csv_data):
-        """Test legislator detail page loads correctly."""
-        response = django_client.get(
-            f"/legislators/{real_csv_data['john_yarmuth_id']}/"
-        )
-        assert response.status_code == 200
-        content = response.content.decode()
-
-        assert "Rep. John Yarmuth" in content
-        assert "Voting History" in content
-
-    def test_bill_detail_page(self, django_client, real_csv_data):
-        """Test bill detail page loads correctly."""
-        response = django_client.get(f"/bills/{real_csv_data['build_back_better_id']}/")
-        assert response.status_code == 200
-        content = response.content.decode()
-
-        assert "Build Back Better Act" in content
-        assert "How Legislators Voted" in content
-
-
-class TestDataIntegrity:
-    """Test data integrity and relationships with real CSV data."""
-
-    def test_bill_sponsor_relationships(self, real_csv_data):
-        """Test that bill sponsors are correctly linked."""
-        # Build Back Better Act should be sponsored by John Yarmuth
-        bbb_bill = Bill.objects.get(id=real_csv_data["build_back_better_id"])
-        assert bbb_bill.primary_sponsor.id == real_csv_data["john_yarmuth_id"]
-        assert bbb_bill.primary_sponsor.name == "Rep. John Yarmuth (D-KY-3)"
-
-        # Infrastructure bill should be sponsored by Jamaal Bowman
-        infra_bill = Bill.objects.get(id=real_csv_data["infrastructure_bill_id"])
-        assert infra_bill.primary_sponsor.id == real_csv_data["jamaal_bowman_id"]
-        assert infra_bill.primary_sponsor.name == "Rep. Jamaal Bowman (D-NY-16)"
-
-    def test_vote_counts_consistency(self, real_csv_data):
-        """Test that vote counts are consistent across the system."""
-        total_legislators = Legislator.objects.count()
-        total_bills = Bill.objects.count()
-        total_votes = Vote.objects.count()
-        total_vote_results = VoteResult.objects.count()
-
-        assert total_legislators == real_csv_data["expected_legislators"]
-        assert total_bills == real_csv_data["expected_bills"]
-        assert total_votes == real_csv_data["expected_votes"]
-        assert total_vote_results == real_csv_data["expected_vote_results"]
-
-    def test_vote_statistics_calculation(self, real_csv_data):
-        """Test that vote statistics are calculated correctly."""
-        # Test a few legislators' vote counts
-        for legislator in Legislator.objects.all()[:3]:
-            supported = legislator.supported_bills_count
-            opposed = legislator.opposed_bills_count
-
-            # Verify against actual VoteResult records
-            actual_supported = VoteResult.objects.filter(
-                legislator=legislator, vote_type=VoteResult.VoteType.YEA
-            ).count()
-            actual_opposed = VoteResult.objects.filter(
-                legislator=legislator, vote_type=VoteResult.VoteType.NAY
-            ).count()
-
-            assert supported == actual_supported
-            assert opposed == actual_opposed
+"""
+Tests for API endpoints using real CSV data.
+"""
+
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+from django.urls import reverse
+from rest_framework import status
+
+from legislative.models import Bill, Legislator, Vote, VoteResult
+from legislative.parties import parse_names
+
+
+class TestStatsAPI:
+    """Test statistics API endpoint with real data."""
+
+    def test_stats_endpoint(self, api_client, real_csv_data):
+        """Test stats API returns correct counts from real CSV data."""
+        url = reverse("stats_api")
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["legislators"] == real_csv_data["expected_legislators"]
+        assert data["bills"] == real_csv_data["expected_bills"]
+        assert data["vote_results"] == real_csv_data["expected_vote_results"]
+
+    def test_stats_reads_only_the_manifest(
+        self, api_client, django_client, real_csv_data, django_assert_num_queries
+    ):
+        """Test stats and the home page count nothing per request."""
+        with django_assert_num_queries(1):
+            api_client.get(reverse("stats_api"))
+        # The manifest and the stored leaderboards.
+        with django_assert_num_queries(2):
+            django_client.get(reverse("home"))
+
+    def test_manifest_endpoint(self, api_client, real_csv_data):
+        """Test the manifest records counts and source file hashes."""
+        response = api_client.get(reverse("manifest_api"))
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["version"] >= 1
+        assert data["loaded_at"] is not None
+        assert data["counts"] == {
+            "legislators": real_csv_data["expected_legislators"],
+            "bills": real_csv_data["expected_bills"],
+            "votes": real_csv_data["expected_votes"],
+            "vote_results": real_csv_data["expected_vote_results"],
+        }
+        fixtures = Path(__file__).parent / "fixtures"
+        assert data["source_hashes"]["votes.csv"] == (
+            hashlib.sha256((fixtures / "votes.csv").read_bytes()).hexdigest()
+        )
+        assert len(data["source_hashes"]) == 4
+
+    def test_manifest_before_first_load(self, api_client):
+        """Test stats and manifest without any load."""
+        assert api_client.get(reverse("stats_api")).json()["bills"] == 0
+        assert api_client.get(reverse("manifest_api")).json()["version"] == 0
+
+
+class TestLegislatorAPI:
+    """Test legislator API endpoints with real data."""
+
+    def test_legislators_list(self, api_client, real_csv_data):
+        """Test legislators list API with real data."""
+        url = "/api/legislators/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        # Support both paginated and non-paginated responses
+        if isinstance(data, dict) and "results" in data:
+            results = data["results"]
+            count = data["count"]
+        else:
+            results = data
+            count = len(results)
+
+        assert count == real_csv_data["expected_legislators"]
+        assert len(results) == real_csv_data["expected_legislators"]
+
+        # Check one specific legislator (John Yarmuth - sponsor of Build Back Better)
+        yarmuth = next(
+            (r for r in results if r["id"] == real_csv_data["john_yarmuth_id"]),
+            None,
+        )
+        assert yarmuth is not None
+        assert yarmuth["name"] == "Rep. John Yarmuth (D-KY-3)"
+        # John Yarmuth sponsored Build Back Better but his vote record should be calculated
+        assert yarmuth["supported_bills_count"] >= 0
+        assert yarmuth["opposed_bills_count"] >= 0
+
+    def test_legislator_detail(self, api_client, real_csv_data):
+        """Test legislator detail API with real data."""
+        # Test John Yarmuth (sponsor of Build Back Better)
+        url = f"/api/legislators/{real_csv_data['john_yarmuth_id']}/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["id"] == real_csv_data["john_yarmuth_id"]
+        assert data["name"] == "Rep. John Yarmuth (D-KY-3)"
+        assert "supported_bills_count" in data
+        assert "opposed_bills_count" in data
+        assert "vote_results" in data
+
+    def test_legislators_top_n_by_opposed(self, api_client, real_csv_data):
+        """Test ordering by a vote count with a top-N limit."""
+        response = api_client.get(
+            "/api/legislators/", {"ordering": "-opposed_bills_count", "limit": 2}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert len(results) == 2
+        expected = sorted(
+            Legislator.objects.all(),
+            key=lambda leg: (leg.opposed_bills_count, leg.id),
+            reverse=True,
+        )[:2]
+        assert [r["id"] for r in results] == [leg.id for leg in expected]
+
+    def test_legislators_invalid_ordering(self, api_client, real_csv_data):
+        """Test unknown ordering fields are rejected."""
+        response = api_client.get("/api/legislators/", {"ordering": "password"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_legislator_not_found(self, api_client):
+        """Test legislator detail API with invalid ID."""
+        url = "/api/legislators/999999/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestPartyBreakdowns:
+    """Test party/state parsing and the grouped breakdown endpoints."""
+
+    def test_load_data_parses_names(self, real_csv_data):
+        """Test party, state and district are parsed from legislator names."""
+        bowman = Legislator.objects.get(pk=real_csv_data["jamaal_bowman_id"])
+        assert (bowman.party, bowman.state, bowman.district) == ("D", "NY", "16")
+
+    def test_parse_names(self):
+        """Test senators, at-large seats and unparseable names."""
+        parsed = parse_names(
+            pd.Series(["Sen. A (D-CA)", "Rep. B (R-WY-AL)", "Someone Else"])
+        )
+        assert parsed.to_dict("records") == [
+            {"party": "D", "state": "CA", "district": ""},
+            {"party": "R", "state": "WY", "district": "AL"},
+            {"party": "", "state": "", "district": ""},
+        ]
+
+    def test_bill_breakdown(self, api_client, real_csv_data):
+        """Test Yea/Nay counts on a bill by party and by state."""
+        bill_id = real_csv_data["build_back_better_id"]
+        response = api_client.get(f"/api/bills/{bill_id}/breakdown/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["id"] == bill_id
+        assert data["by_party"] == [
+            {"party": "D", "yea": 1, "nay": 1},
+            {"party": "I", "yea": 1, "nay": 1},
+        ]
+        assert {row["state"]: (row["yea"], row["nay"]) for row in data["by_state"]} == {
+            "KY": (1, 0),
+            "NY": (0, 1),
+            "XX": (1, 0),
+            "YY": (0, 1),
+        }
+
+    def test_bill_breakdown_not_found(self, api_client):
+        """Test breakdown of an unknown bill."""
+        response = api_client.get("/api/bills/999999/breakdown/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stats_by_party(
+        self, api_client, real_csv_data, django_assert_max_num_queries
+    ):
+        """Test per-party totals come from one grouped query and are cached."""
+        url = reverse("stats_by_party")
+        api_client.get(url)
+        # Served from the pre-compressed store: only the version lookup.
+        with django_assert_max_num_queries(1):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "parties": [
+                {"party": "D", "legislators": 2, "yea_votes": 2, "nay_votes": 2},
+                {"party": "I", "legislators": 2, "yea_votes": 2, "nay_votes": 2},
+            ]
+        }
+
+
+class TestVoteAPI:
+    """Test the vote session endpoints and their tallies."""
+
+    def test_votes_list(self, api_client, real_csv_data):
+        """Test every session is listed with its tallies and outcome."""
+        response = api_client.get("/api/votes/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["next"] is None
+        assert len(data["results"]) == real_csv_data["expected_votes"]
+        by_bill = {row["bill"]: row for row in data["results"]}
+        assert by_bill[real_csv_data["build_back_better_id"]] == {
+            "id": by_bill[real_csv_data["build_back_better_id"]]["id"],
+            "bill": real_csv_data["build_back_better_id"],
+            "yea_count": 2,
+            "nay_count": 2,
+            "outcome": "tied",
+        }
+
+    def test_votes_pagination(self, api_client, real_csv_data):
+        """Test the list is windowed with next/previous links."""
+        first = api_client.get("/api/votes/", {"limit": 1}).json()
+        assert len(first["results"]) == 1
+        assert first["previous"] is None
+
+        second = api_client.get(first["next"]).json()
+        assert second["next"] is None
+        assert second["previous"] is not None
+        assert second["results"][0]["id"] > first["results"][0]["id"]
+
+    def test_vote_detail(self, api_client, real_csv_data):
+        """Test one session's tallies."""
+        vote = Vote.objects.get(bill_id=real_csv_data["infrastructure_bill_id"])
+        response = api_client.get(f"/api/votes/{vote.pk}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["bill"] == real_csv_data["infrastructure_bill_id"]
+        assert data["yea_count"] + data["nay_count"] == vote.results.count()
+
+    def test_bill_votes_separates_sessions(
+        self, api_client, real_csv_data, django_assert_max_num_queries
+    ):
+        """Test each session of a bill is tallied on its own, in one query."""
+        bill_id = real_csv_data["build_back_better_id"]
+        latest = Vote.objects.order_by("-id").first()
+        second = Vote.objects.create(id=latest.id + 1, bill_id=bill_id)
+        VoteResult.objects.create(
+            legislator_id=real_csv_data["john_yarmuth_id"],
+            vote=second,
+            vote_type=VoteResult.VoteType.YEA,
+        )
+        url = f"/api/bills/{bill_id}/votes/"
+        # Dataset version lookup and the grouped tallies.
+        with django_assert_max_num_queries(2):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [(r["yea_count"], r["nay_count"], r["outcome"]) for r in results] == [
+            (2, 2, "tied"),
+            (1, 0, "passed"),
+        ]
+
+    def test_bill_votes_not_found(self, api_client):
+        """Test sessions of an unknown bill."""
+        response = api_client.get("/api/bills/999999/votes/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestBillAPI:
+    """Test bill API endpoints with real data."""
+
+    def test_bills_list(self, api_client, real_csv_data):
+        """Test bills list API with real data."""
+        url = "/api/bills/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        if isinstance(data, dict) and "results" in data:
+            results = data["results"]
+            count = data["count"]
+        else:
+            results = data
+            count = len(results)
+
+        assert count == real_csv_data["expected_bills"]
+        assert len(results) == real_csv_data["expected_bills"]
+
+        # Check specific bills
+        bill_ids = [r["id"] for r in results]
+        assert real_csv_data["build_back_better_id"] in bill_ids
+        assert real_csv_data["infrastructure_bill_id"] in bill_ids
+
+        # Check Build Back Better Act
+        bbb_bill = next(
+            (r for r in results if r["id"] == real_csv_data["build_back_better_id"]),
+            None,
+        )
+        assert bbb_bill is not None
+        assert bbb_bill["title"] == "H.R. 5376: Build Back Better Act"
+        assert bbb_bill["primary_sponsor"] == "Rep. John Yarmuth (D-KY-3)"
+        assert bbb_bill["supporters_count"] >= 0
+        assert bbb_bill["opposers_count"] >= 0
+
+    def test_bills_supporters_range_filter(self, api_client, real_csv_data):
+        """Test filtering bills by a range of supporters."""
+        bbb = Bill.objects.get(id=real_csv_data["build_back_better_id"])
+        threshold = bbb.supporters_count - 1
+
+        results = api_client.get(
+            "/api/bills/", {"supporters_count__gt": threshold}
+        ).json()
+        assert real_csv_data["build_back_better_id"] in [r["id"] for r in results]
+        assert all(r["supporters_count"] > threshold for r in results)
+
+        response = api_client.get("/api/bills/", {"supporters_count__gt": "many"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_bill_detail(self, api_client, real_csv_data):
+        """Test bill detail API with real data."""
+        # Test Build Back Better Act
+        url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["id"] == real_csv_data["build_back_better_id"]
+        assert data["title"] == "H.R. 5376: Build Back Better Act"
+        assert data["primary_sponsor"] == "Rep. John Yarmuth (D-KY-3)"
+        assert "supporters_count" in data
+        assert "opposers_count" in data
+        assert "vote_results" in data
+
+        # The vote results should contain actual voting data
+        vote_results = data["vote_results"]
+        assert len(vote_results) > 0
+
+        # Check that all vote results have required fields
+        for vote_result in vote_results:
+            assert "legislator" in vote_result
+            assert "is_support" in vote_result
+            assert vote_result["legislator"]["id"] is not None
+            assert vote_result["legislator"]["name"] is not None
+
+    def test_bill_detail_vote_pagination(self, api_client, real_csv_data):
+        """Test nested vote results are capped with a link to the next page."""
+        url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+        full = api_client.get(url).json()["vote_results"]
+
+        first = api_client.get(url, {"votes_limit": 2}).json()
+        assert first["vote_results"] == full[:2]
+        assert "votes_offset=2" in first["vote_results_next"]
+
+        rest = api_client.get(first["vote_results_next"]).json()
+        assert rest["vote_results"] == full[2:4]
+
+    def test_bill_detail_query_count(
+        self, api_client, real_csv_data, django_assert_max_num_queries
+    ):
+        """Test bill detail reads the bill and one page of value rows."""
+        url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+        # Dataset version lookup, the annotated bill, the vote rows.
+        with django_assert_max_num_queries(3):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["vote_results_next"] is None
+
+    def test_infrastructure_bill_detail(self, api_client, real_csv_data):
+        """Test Infrastructure Investment and Jobs Act detail."""
+        url = f"/api/bills/{real_csv_data['infrastructure_bill_id']}/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+
+        assert data["id"] == real_csv_data["infrastructure_bill_id"]
+        assert data["title"] == "H.R. 3684: Infrastructure Investment and Jobs Act"
+        assert data["primary_sponsor"] == "Rep. Jamaal Bowman (D-NY-16)"
+
+    def test_bill_not_found(self, api_client):
+        """Test bill detail API with invalid ID."""
+        url = "/api/bills/999999/"
+        response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestWebInterface:
+    """Test web interface views with real data."""
+
+    def test_home_page(self, django_client, real_csv_data):
+        """Test home page loads correctly with real stats."""
+        response = django_client.get("/")
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        assert "Quorum Legislative Data" in content
+        # Check that real statistics are displayed
+        assert str(real_csv_data["expected_legislators"]) in content
+        assert str(real_csv_data["expected_bills"]) in content
+
+    def test_legislators_page(self, django_client, real_csv_data):
+        """Test legislators page loads correctly."""
+        response = django_client.get("/legislators/")
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        assert "Legislators" in content
+        # Should contain some of the real legislator names
+        assert "Rep. John Yarmuth" in content or "Rep. Jamaal Bowman" in content
+
+    def test_bills_page(self, django_client, real_csv_data):
+        """Test bills page loads correctly."""
+        response = django_client.get("/bills/")
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        assert "Bills" in content
+        # Should contain the real bill titles
+        assert (
+            "Build Back Better Act" in content or "Infrastructure Investment" in content
+        )
+
+    def test_legislator_detail_page(self, django_client, real_csv_data):
+        """Test legislator detail page loads correctly."""
+        response = django_client.get(
+            f"/legislators/{real_csv_data['john_yarmuth_id']}/"
+        )
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        assert "Rep. John Yarmuth" in content
+        assert "Voting History" in content
+
+    def test_bill_detail_page(self, django_client, real_csv_data):
+        """Test bill detail page loads correctly."""
+        response = django_client.get(f"/bills/{real_csv_data['build_back_better_id']}/")
+        assert response.status_code == 200
+        content = response.content.decode()
+
+        assert "Build Back Better Act" in content
+        assert "How Legislators Voted" in content
+
+    def test_detail_pages_show_one_vote_page(
+        self, django_client, real_csv_data, settings, django_assert_max_num_queries
+    ):
+        """Test detail pages read one capped page of vote rows."""
+        settings.VOTE_HISTORY_PAGE_SIZE = 2
+        url = f"/bills/{real_csv_data['build_back_better_id']}/"
+        # Session, the annotated bill, the vote rows.
+        with django_assert_max_num_queries(3):
+            content = django_client.get(url).content.decode()
+        assert content.count("✓ Supported") + content.count("✗ Opposed") == 2
+        assert "votes_offset=2" in content
+
+        url = f"/legislators/{real_csv_data['john_yarmuth_id']}/"
+        content = django_client.get(url, {"votes_limit": 1}).content.decode()
+        assert content.count("✓ Supported") + content.count("✗ Opposed") == 1
+
+
+class TestDataIntegrity:
+    """Test data integrity and relationships with real CSV data."""
+
+    def test_bill_sponsor_relationships(self, real_csv_data):
+        """Test that bill sponsors are correctly linked."""
+        # Build Back Better Act should be sponsored by John Yarmuth
+        bbb_bill = Bill.objects.get(id=real_csv_data["build_back_better_id"])
+        assert bbb_bill.primary_sponsor.id == real_csv_data["john_yarmuth_id"]
+        assert bbb_bill.primary_sponsor.name == "Rep. John Yarmuth (D-KY-3)"
+
+        # Infrastructure bill should be sponsored by Jamaal Bowman
+        infra_bill = Bill.objects.get(id=real_csv_data["infrastructure_bill_id"])
+        assert infra_bill.primary_sponsor.id == real_csv_data["jamaal_bowman_id"]
+        assert infra_bill.primary_sponsor.name == "Rep. Jamaal Bowman (D-NY-16)"
+
+    def test_vote_counts_consistency(self, real_csv_data):
+        """Test that vote counts are consistent across the system."""
+        total_legislators = Legislator.objects.count()
+        total_bills = Bill.objects.count()
+        total_votes = Vote.objects.count()
+        total_vote_results = VoteResult.objects.count()
+
+        assert total_legislators == real_csv_data["expected_legislators"]
+        assert total_bills == real_csv_data["expected_bills"]
+        assert total_votes == real_csv_data["expected_votes"]
+        assert total_vote_results == real_csv_data["expected_vote_results"]
+
+    def test_precomputed_totals_match_live_counts(self, real_csv_data):
+        """Test totals stored by load_data equal the live model counts."""
+        for legislator in Legislator.objects.all():
+            assert legislator.supported_bills_total == legislator.supported_bills_count
+            assert legislator.opposed_bills_total == legislator.opposed_bills_count
+        for bill in Bill.objects.all():
+            assert bill.supporters_total == bill.supporters_count
+            assert bill.opposers_total == bill.opposers_count
+
+    def test_vote_statistics_calculation(self, real_csv_data):
+        """Test that vote statistics are calculated correctly."""
+        # Test a few legislators' vote counts
+        for legislator in Legislator.objects.all()[:3]:
+            supported = legislator.supported_bills_count
+            opposed = legislator.opposed_bills_count
+
+            # Verify against actual VoteResult records
+            actual_supported = VoteResult.objects.filter(
+                legislator=legislator, vote_type=VoteResult.VoteType.YEA
+            ).count()
+            actual_opposed = VoteResult.objects.filter(
+                legislator=legislator, vote_type=VoteResult.VoteType.NAY
+            ).count()
+
+            assert supported == actual_supported
+            assert opposed == actual_opposed
@@ -0,0 +1,97 @@
+"""
+Tests for the async views served by the ASGI URL configuration.
+"""
+
+import pytest
+from django.test import Client, override_settings
+from rest_framework import status
+
+pytestmark = pytest.mark.urls("core.asgi_urls")
+
+
+class TestAsyncAPI:
+    """The async API endpoints answer exactly like the sync viewsets."""
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/stats/",
+            "/api/stats/by-party/",
+            "/api/legislators/",
+            "/api/bills/",
+            "/api/votes/",
+            "/api/leaderboards/",
+            "/api/manifest/",
+            "/api/changes/?since=0",
+        ],
+    )
+    def test_list_matches_sync(self, api_client, real_csv_data, path):
+        async_data = api_client.get(path).json()
+        with override_settings(ROOT_URLCONF="core.urls"):
+            sync_data = api_client.get(path, HTTP_ACCEPT="application/json").json()
+        assert async_data == sync_data
+
+    def test_legislator_detail_matches_sync(self, api_client, real_csv_data):
+        path = f"/api/legislators/{real_csv_data['john_yarmuth_id']}/"
+        async_data = api_client.get(path).json()
+        with override_settings(ROOT_URLCONF="core.urls"):
+            sync_data = api_client.get(path, HTTP_ACCEPT="application/json").json()
+        assert async_data == sync_data
+
+    def test_bill_detail_matches_sync(self, api_client, real_csv_data):
+        path = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+        async_data = api_client.get(path).json()
+        with override_settings(ROOT_URLCONF="core.urls"):
+            sync_data = api_client.get(path, HTTP_ACCEPT="application/json").json()
+        assert async_data == sync_data
+        assert len(async_data["vote_results"]) > 0
+
+    def test_bill_breakdown_matches_sync(self, api_client, real_csv_data):
+        path = f"/api/bills/{real_csv_data['build_back_better_id']}/breakdown/"
+        async_data = api_client.get(path).json()
+        with override_settings(ROOT_URLCONF="core.urls"):
+            sync_data = api_client.get(path, HTTP_ACCEPT="application/json").json()
+        assert async_data == sync_data
+        assert async_data["by_party"]
+
+    def test_bill_votes_match_sync(self, api_client, real_csv_data):
+        path = f"/api/bills/{real_csv_data['build_back_better_id']}/votes/"
+        async_data = api_client.get(path, {"limit": 1}).json()
+        with override_settings(ROOT_URLCONF="core.urls"):
+            sync_data = api_client.get(
+                path, {"limit": 1}, HTTP_ACCEPT="application/json"
+            ).json()
+        assert async_data == sync_data
+        assert async_data["results"][0]["outcome"] == "tied"
+
+    def test_detail_not_found(self, api_client):
+        response = api_client.get("/api/bills/999999/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestAsyncWebInterface:
+    """The async HTML views render without evaluating lazy queries."""
+
+    def test_pages(self, real_csv_data):
+        client = Client(raise_request_exception=True)
+        for path in [
+            "/",
+            "/legislators/",
+            "/bills/",
+            f"/legislators/{real_csv_data['john_yarmuth_id']}/",
+            f"/bills/{real_csv_data['build_back_better_id']}/",
+        ]:
+            assert client.get(path).status_code == 200
+
+    def test_detail_pages_match_sync(self, django_client, real_csv_data, settings):
+        settings.VOTE_HISTORY_PAGE_SIZE = 2
+        for path in [
+            f"/legislators/{real_csv_data['john_yarmuth_id']}/",
+            f"/bills/{real_csv_data['build_back_better_id']}/?votes_offset=2",
+        ]:
+            async_page = django_client.get(path).content
+            with override_settings(ROOT_URLCONF="core.urls"):
+                assert django_client.get(path).content == async_page
+
+    def test_detail_page_not_found(self, django_client):
+        assert django_client.get("/bills/999999/").status_code == 404
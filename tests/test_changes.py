@@ -0,0 +1,139 @@
+"""
+Tests for the change log written by ``load_data`` and the change feed API.
+"""
+
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from legislative.changes import diff
+from legislative.models import Change, DatasetManifest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for path in FIXTURES_DIR.glob("*.csv"):
+        shutil.copy(path, tmp_path / path.name)
+    call_command("load_data", csv_dir=str(tmp_path), stdout=StringIO())
+    return tmp_path
+
+
+def _edit_and_reload(csv_dir):
+    """Rename one legislator, add another and drop vote result 8 (1002 on
+    bill 2900994), then reload as version 2."""
+    legislators = csv_dir / "legislators.csv"
+    text = legislators.read_text().replace("Sample A", "Sample Renamed")
+    legislators.write_text(text + "1003,Rep. Sample C (R-ZZ-3)\n")
+    results = csv_dir / "vote_results.csv"
+    lines = results.read_text().splitlines(keepends=True)
+    results.write_text("".join(lines[:-1]))
+    call_command("load_data", csv_dir=str(csv_dir), stdout=StringIO())
+
+
+def _feed(client, since, **params):
+    return client.get(reverse("changes"), {"since": since, **params})
+
+
+def test_diff_finds_inserts_updates_and_deletes():
+    before = {"legislator": {1: ("A",), 2: ("B",), 3: ("C",)}}
+    after = {"legislator": {1: ("A",), 2: ("B2",), 4: ("D",)}}
+    assert list(diff(before, after)) == [
+        ("legislator", 2, Change.Op.UPDATE),
+        ("legislator", 3, Change.Op.DELETE),
+        ("legislator", 4, Change.Op.INSERT),
+    ]
+
+
+def test_first_load_logs_every_row_as_an_insert(csv_dir):
+    assert DatasetManifest.objects.get().changes_from == 0
+    assert set(Change.objects.values_list("version", "op").distinct()) == {
+        (1, Change.Op.INSERT)
+    }
+    assert Change.objects.filter(entity="legislator").count() == 4
+    assert Change.objects.filter(entity="bill").count() == 2
+
+
+def test_reload_logs_only_what_changed(csv_dir):
+    _edit_and_reload(csv_dir)
+    changes = set(
+        Change.objects.filter(version=2).values_list("entity", "entity_id", "op")
+    )
+    assert changes == {
+        ("legislator", 1001, Change.Op.UPDATE),  # renamed
+        ("legislator", 1002, Change.Op.UPDATE),  # one fewer opposed bill
+        ("legislator", 1003, Change.Op.INSERT),
+        ("bill", 2900994, Change.Op.UPDATE),  # one fewer opposer
+    }
+
+
+def test_unchanged_reload_logs_nothing(csv_dir):
+    call_command("load_data", csv_dir=str(csv_dir), force=True, stdout=StringIO())
+    assert DatasetManifest.current_version() == 2
+    assert not Change.objects.filter(version=2).exists()
+
+
+def test_old_versions_are_pruned(settings, csv_dir):
+    settings.CHANGE_LOG_VERSIONS = 1
+    _edit_and_reload(csv_dir)
+    assert set(Change.objects.values_list("version", flat=True)) == {2}
+    assert DatasetManifest.objects.get().changes_from == 1
+
+
+class TestChangeFeedAPI:
+    def test_feed_from_version_zero(self, api_client, csv_dir):
+        data = _feed(api_client, 0).json()
+        assert data["since"] == 0
+        assert data["version"] == 1
+        assert data["next"] is None
+        assert len(data["results"]) == 6
+        assert data["results"][0] == {
+            "version": 1,
+            "entity": "legislator",
+            "entity_id": 1001,
+            "op": "insert",
+        }
+
+    def test_feed_since_a_version(self, api_client, csv_dir):
+        _edit_and_reload(csv_dir)
+        data = _feed(api_client, 1).json()
+        assert data["version"] == 2
+        assert {row["version"] for row in data["results"]} == {2}
+        assert len(data["results"]) == 4
+        assert _feed(api_client, 2).json()["results"] == []
+
+    def test_feed_pages(self, api_client, csv_dir):
+        first = _feed(api_client, 0, limit=4).json()
+        assert len(first["results"]) == 4
+        assert first["next"] is not None
+        second = api_client.get(first["next"]).json()
+        assert len(second["results"]) == 2
+        assert second["next"] is None
+        assert (
+            first["results"] + second["results"]
+            == _feed(api_client, 0).json()["results"]
+        )
+
+    def test_pruned_versions_are_gone(self, api_client, settings, csv_dir):
+        settings.CHANGE_LOG_VERSIONS = 1
+        _edit_and_reload(csv_dir)
+        response = _feed(api_client, 0)
+        assert response.status_code == status.HTTP_410_GONE
+        assert response.json()["changes_from"] == 1
+        assert _feed(api_client, 1).status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize("since", ["", "-1", "v1"])
+    def test_since_is_required(self, api_client, since):
+        response = _feed(api_client, since)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_feed_before_any_load_is_empty(self, api_client):
+        data = _feed(api_client, 0).json()
+        assert data["version"] == 0
+        assert data["results"] == []
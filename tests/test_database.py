@@ -0,0 +1,143 @@
+"""
+Tests for the SQLite connection profiles, the read-only router and the replica.
+"""
+
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+
+from core.sqlite import database_settings, pragma_statements
+from legislative import metrics, replica, shadow
+from legislative.management.commands import sync_replica
+from legislative.models import Legislator
+from legislative.routers import ReadOnlyRouter
+
+
+def test_performance_profile_settings(tmp_path):
+    databases = database_settings(tmp_path / "db.sqlite3", conn_max_age=60)
+    default, readonly = databases["default"], databases["readonly"]
+
+    assert "PRAGMA journal_mode=WAL" in default["OPTIONS"]["init_command"]
+    assert default["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+    assert default["CONN_MAX_AGE"] == 60
+    assert readonly["NAME"].startswith("file:///")
+    assert readonly["NAME"].endswith("db.sqlite3?mode=ro")
+    assert readonly["TEST"] == {"MIRROR": "default"}
+
+
+def test_readonly_alias_opens_replica(tmp_path):
+    databases = database_settings(
+        tmp_path / "db.sqlite3", replica=tmp_path / "replica.sqlite3"
+    )
+    assert databases["default"]["NAME"] == tmp_path / "db.sqlite3"
+    assert databases["readonly"]["NAME"].endswith("/replica.sqlite3?mode=ro")
+
+
+def test_read_only_pragmas_skip_writer_settings():
+    statements = pragma_statements(
+        {"journal_mode": "WAL", "mmap_size": 1024}, read_only=True
+    )
+    assert statements == "PRAGMA mmap_size=1024; PRAGMA query_only=ON"
+
+
+def test_connection_pragmas_applied():
+    with connections["default"].cursor() as cursor:
+        cursor.execute("PRAGMA temp_store")
+        assert cursor.fetchone()[0] == 2  # MEMORY
+
+
+def test_router_reads_from_readonly_outside_transactions():
+    router = ReadOnlyRouter()
+    # Tests run inside a transaction, so reads see uncommitted rows.
+    assert router.db_for_read(Legislator) == "default"
+
+    connection = connections["default"]
+    connection.in_atomic_block = False
+    try:
+        assert router.db_for_read(Legislator) == "readonly"
+    finally:
+        connection.in_atomic_block = True
+    assert router.db_for_write(Legislator) == "default"
+    assert not router.allow_migrate("readonly", "legislative")
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "readonly"])
+def test_benchmark_sqlite_reports_each_profile(real_csv_data):
+    """Runs on committed data: the copy is a backup of the test database."""
+    out = StringIO()
+    call_command(
+        "benchmark_sqlite", duration=0.2, readers=1, write_rows=1000, stdout=out
+    )
+    lines = out.getvalue().splitlines()
+    assert [line.split()[0] for line in lines[1:]] == ["default", "performance"]
+    assert all(int(line.split()[1]) > 0 for line in lines[1:])
+
+
+@pytest.fixture
+def primary_file(tmp_path, monkeypatch):
+    path = tmp_path / "primary.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(shadow, "live_path", lambda: path)
+    return path
+
+
+def test_sync_copies_primary_into_replica(primary_file, tmp_path):
+    target = tmp_path / "replicas" / "replica.sqlite3"
+    replica.sync(target=target)
+
+    conn = sqlite3.connect(f"{target.as_uri()}?mode=ro", uri=True)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    assert "replica_syncs_total" in metrics.render_prometheus()
+
+
+def test_sync_replica_command(primary_file, tmp_path, settings):
+    settings.SQLITE_REPLICA_PATH = str(tmp_path / "replica.sqlite3")
+    out = StringIO()
+    call_command("sync_replica", stdout=out)
+    assert "Synced replica" in out.getvalue()
+    assert (tmp_path / "replica.sqlite3").is_file()
+
+
+def test_sync_replica_loop_survives_errors(
+    primary_file, tmp_path, settings, monkeypatch
+):
+    settings.SQLITE_REPLICA_PATH = str(tmp_path / "replica.sqlite3")
+    results = iter([replica.ReplicaError("database is locked"), 0.1])
+
+    def sync():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(replica, "sync", sync)
+    monkeypatch.setattr(sync_replica.time, "sleep", sleep)
+    out, err = StringIO(), StringIO()
+    with pytest.raises(KeyboardInterrupt):
+        call_command("sync_replica", interval=5, stdout=out, stderr=err)
+    assert "Replica sync failed: database is locked" in err.getvalue()
+    assert "Synced replica" in out.getvalue()
+
+
+def test_sync_replica_requires_configured_path(settings):
+    settings.SQLITE_REPLICA_PATH = ""
+    with pytest.raises(CommandError, match="SQLITE_REPLICA_PATH is not set"):
+        call_command("sync_replica")
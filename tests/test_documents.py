@@ -0,0 +1,95 @@
+"""
+Tests for the detail documents pre-rendered by ``load_data``.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rest_framework import status
+
+from legislative import documents
+from legislative.documents import build_documents, render_pool
+from legislative.models import BillDocument, LegislatorDocument
+
+
+@pytest.fixture
+def small_vote_pages(settings, real_csv_data):
+    """Rebuild the documents with two votes per page so pages continue."""
+    settings.VOTE_HISTORY_PAGE_SIZE = 2
+    build_documents(workers=1)
+    return real_csv_data
+
+
+def test_load_data_stores_every_detail_document(real_csv_data):
+    assert LegislatorDocument.objects.count() == real_csv_data["expected_legislators"]
+    assert BillDocument.objects.count() == real_csv_data["expected_bills"]
+
+
+@pytest.mark.parametrize(
+    "resource, key",
+    [("legislators", "john_yarmuth_id"), ("bills", "build_back_better_id")],
+)
+def test_stored_document_matches_serialized_response(
+    api_client, real_csv_data, resource, key
+):
+    url = f"/api/{resource}/{real_csv_data[key]}/"
+    stored = api_client.get(url)
+    # An explicit window always goes through the serializers.
+    serialized = api_client.get(url, {"votes_limit": 100})
+    assert stored.status_code == status.HTTP_200_OK
+    assert stored.content == serialized.content
+
+
+def test_detail_is_one_lookup(api_client, real_csv_data, django_assert_num_queries):
+    url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+    # Dataset version (pre-compressed cache key) and the stored document.
+    with django_assert_num_queries(2):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/json"
+
+
+def test_stored_document_links_next_page(api_client, small_vote_pages):
+    url = f"/api/bills/{small_vote_pages['build_back_better_id']}/"
+    first = api_client.get(url).json()
+    assert len(first["vote_results"]) == 2
+    assert "votes_offset=2" in first["vote_results_next"]
+    assert first == api_client.get(url, {"votes_limit": 2}).json()
+
+
+def test_parallel_build_renders_same_documents(real_csv_data):
+    serial = dict(BillDocument.objects.values_list("id", "body"))
+    build_documents(workers=2)
+    assert dict(BillDocument.objects.values_list("id", "body")) == {
+        pk: bytes(body) for pk, body in serial.items()
+    }
+
+
+def test_render_pool_starts_workers_up_front():
+    with render_pool(2) as pool:
+        assert len(pool._processes) == 2
+
+
+def test_pool_keeps_few_chunks_in_flight(monkeypatch):
+    monkeypatch.setattr(documents, "_render_chunk", lambda serializer, chunk: chunk)
+    pulled = []
+
+    def chunks():
+        for index in range(20):
+            pulled.append(index)
+            yield index
+
+    limit = documents.IN_FLIGHT_PER_WORKER
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for position, chunk in enumerate(
+            documents._render_in_pool(pool, None, chunks())
+        ):
+            assert chunk == position
+            assert len(pulled) <= position + limit + 1
+
+
+def test_browsable_api_is_still_rendered(api_client, real_csv_data):
+    url = f"/api/bills/{real_csv_data['build_back_better_id']}/"
+    response = api_client.get(url, HTTP_ACCEPT="text/html")
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/html")
@@ -0,0 +1,60 @@
+"""
+Tests for per-request Server-Timing instrumentation.
+"""
+
+import json
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(p.split("=", 1) for p in params)
+    return metrics
+
+
+class TestServerTiming:
+    """Every response carries a timing breakdown."""
+
+    def test_api_breakdown(self, api_client, real_csv_data):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/bills/")
+        metrics = parse_server_timing(response["Server-Timing"])
+
+        assert {"db", "serialize", "total"} <= set(metrics)
+        assert metrics["db"]["desc"] == f'"{len(queries.captured_queries)} queries"'
+        assert float(metrics["total"]["dur"]) >= float(metrics["serialize"]["dur"])
+
+    def test_template_breakdown(self, django_client, real_csv_data):
+        response = django_client.get("/bills/")
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert "template" in metrics
+        assert "serialize" not in metrics
+
+    @pytest.mark.urls("core.asgi_urls")
+    def test_async_views_count_queries(self, api_client, real_csv_data):
+        response = api_client.get("/api/stats/")
+        metrics = parse_server_timing(response["Server-Timing"])
+        # The async ORM runs on another thread; its queries are still counted.
+        assert re.fullmatch(r'"[1-9]\d* queries"', metrics["db"]["desc"])
+
+    def test_structured_log_line(self, api_client, real_csv_data, caplog):
+        logger = logging.getLogger("legislative.performance")
+        logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger="legislative.performance"):
+                api_client.get("/api/legislators/")
+        finally:
+            logger.removeHandler(caplog.handler)
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["path"] == "/api/legislators/"
+        assert record["status"] == 200
+        assert record["db_queries"] >= 1
+        assert {"db_ms", "serialize_ms", "total_ms"} <= set(record)
@@ -0,0 +1,131 @@
+"""
+Tests for background load jobs queued through the API.
+"""
+
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.db import connections
+from rest_framework import status
+
+from legislative.management.commands import load_data
+from legislative.models import LoadJob, VoteResult
+
+
+@pytest.fixture
+def eager_jobs(settings):
+    """Run jobs inside the request, where the test transaction sees them."""
+    settings.LOAD_JOBS_EAGER = True
+    settings.LOAD_JOBS_TOKEN = "secret"
+    # load_data's per-row lookups would trip the N+1 guard in the request.
+    settings.NPLUSONE_MODE = "off"
+
+
+def _post(api_client, **data):
+    return api_client.post(
+        "/api/loads/", data, format="json", HTTP_X_LOAD_TOKEN="secret"
+    )
+
+
+def test_requires_staff_or_token(api_client, eager_jobs):
+    assert api_client.post("/api/loads/").status_code == status.HTTP_403_FORBIDDEN
+    response = api_client.get("/api/loads/", HTTP_X_LOAD_TOKEN="wrong")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not LoadJob.objects.exists()
+
+
+def test_job_loads_and_reports_progress(api_client, eager_jobs):
+    response = _post(api_client)
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    assert job["status"] == "succeeded"
+    assert job["phase"] == "done"
+    assert job["rows"]["vote_results"] == VoteResult.objects.count()
+    assert job["rows_done"] == sum(job["rows"].values())
+    assert job["rows_per_second"] > 0
+    detail = api_client.get(response["Location"], HTTP_X_LOAD_TOKEN="secret")
+    assert detail.json()["id"] == job["id"]
+
+
+def test_job_renders_in_process(api_client, eager_jobs, monkeypatch):
+    workers = []
+    render_pool = load_data.render_pool
+
+    def spy(count=None):
+        workers.append(count)
+        return render_pool(count)
+
+    monkeypatch.setattr(load_data, "render_pool", spy)
+    assert _post(api_client).json()["status"] == "succeeded"
+    assert workers == [1]
+
+
+def test_staff_user_can_queue(api_client, eager_jobs, django_user_model):
+    user = django_user_model.objects.create_user("ops", is_staff=True)
+    api_client.force_login(user)
+    response = api_client.post("/api/loads/", {"force": True}, format="json")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["requested_by"] == "ops"
+    assert response.json()["force"] is True
+
+
+def test_concurrent_requests_coalesce(api_client, eager_jobs):
+    running = LoadJob.objects.create(
+        status=LoadJob.Status.RUNNING, host=socket.gethostname(), pid=os.getpid()
+    )
+    response = _post(api_client)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == running.pk
+    assert LoadJob.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_request_during_a_locked_load_returns_the_running_job(api_client, eager_jobs):
+    """A load holds the write lock for its whole import; queuing must not
+    wait for it."""
+    running = LoadJob.objects.create(
+        status=LoadJob.Status.RUNNING, host=socket.gethostname(), pid=os.getpid()
+    )
+    loader = sqlite3.connect(
+        connections["default"].settings_dict["NAME"], uri=True, timeout=0
+    )
+    loader.isolation_level = None
+    loader.execute("BEGIN IMMEDIATE")
+    try:
+        response = _post(api_client)
+    finally:
+        loader.execute("ROLLBACK")
+        loader.close()
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == running.pk
+
+
+def test_job_of_a_dead_process_is_failed(api_client, eager_jobs):
+    exited = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    stale = LoadJob.objects.create(
+        status=LoadJob.Status.RUNNING,
+        host=socket.gethostname(),
+        pid=int(exited.stdout),
+    )
+    response = _post(api_client)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    stale.refresh_from_db()
+    assert stale.status == LoadJob.Status.FAILED
+
+
+def test_failed_load_is_recorded(api_client, eager_jobs, settings, tmp_path):
+    settings.CSV_DATA_PATH = str(tmp_path)
+    job = _post(api_client).json()
+    assert job["status"] == "failed"
+    assert "CSV file not found" in job["error"]
+    assert job["phase"] == "failed"
@@ -0,0 +1,69 @@
+"""
+Tests for the top-N leaderboards ranked by ``load_data``.
+"""
+
+import pytest
+from rest_framework import status
+
+from legislative.leaderboards import BOARDS, build_leaderboards, rank
+from legislative.models import Bill, Leaderboard, Legislator
+
+
+def test_rank_keeps_the_best_rows_in_order():
+    rows = [{"id": i, "score": score} for i, score in enumerate([3, 9, 9, 1, 5])]
+    ranked = rank(iter(rows), lambda row: (row["score"], -row["id"]), 3)
+    assert [(row["rank"], row["id"]) for row in ranked] == [(1, 1), (2, 2), (3, 4)]
+
+
+def test_load_data_stores_every_board(real_csv_data):
+    assert set(Leaderboard.objects.values_list("name", flat=True)) == set(BOARDS)
+
+
+def test_boards_match_sorted_totals(real_csv_data):
+    supportive = Leaderboard.objects.get(pk="most-supportive").entries
+    expected = Legislator.objects.order_by("-supported_bills_total", "id")
+    assert [entry["id"] for entry in supportive] == [
+        legislator.id for legislator in expected
+    ]
+    contested = Leaderboard.objects.get(pk="most-contested").entries
+    assert {entry["id"] for entry in contested} == set(
+        Bill.objects.values_list("id", flat=True)
+    )
+    assert contested[0]["supporters_count"] == contested[0]["opposers_count"]
+
+
+def test_board_size(real_csv_data):
+    build_leaderboards(size=1)
+    assert all(len(board.entries) == 1 for board in Leaderboard.objects.all())
+
+
+def test_leaderboards_are_one_query(
+    api_client, real_csv_data, django_assert_num_queries
+):
+    # Dataset version (pre-compressed cache key) and the stored boards.
+    with django_assert_num_queries(2):
+        response = api_client.get("/api/leaderboards/")
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.json()["leaderboards"]) == list(BOARDS)
+
+
+@pytest.mark.parametrize("name", list(BOARDS))
+def test_leaderboard_detail(api_client, real_csv_data, name):
+    response = api_client.get(f"/api/leaderboards/{name}/")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["name"] == name
+    assert [entry["rank"] for entry in data["entries"]] == list(
+        range(1, len(data["entries"]) + 1)
+    )
+
+
+def test_unknown_leaderboard(api_client, real_csv_data):
+    response = api_client.get("/api/leaderboards/most-absent/")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_home_page_shows_leaderboards(django_client, real_csv_data):
+    content = django_client.get("/").content.decode()
+    assert "Most Contested Bills" in content
+    assert "H.R. 5376: Build Back Better Act" in content
@@ -5,12 +5,16 @@ These tests create minimal CSV directories to trigger friendly
 CommandError messages for invalid inputs.
 """
 
+import json
+from io import StringIO
 from pathlib import Path
 
 import pytest
 from django.core.management import call_command
 from django.core.management.base import CommandError
 
+from legislative.models import DatasetManifest, Legislator
+
 
 def write_csv(path: Path, name: str, content: str) -> None:
     p = path / name
@@ -102,3 +106,77 @@ def test_vote_results_invalid_vote_type(csv_dir: Path):
     with pytest.raises(CommandError) as exc:
         call_command("load_data", csv_dir=str(csv_dir))
     assert "Invalid vote_type" in str(exc.value)
+
+
+def test_validate_only_reports_every_problem(csv_dir: Path, tmp_path: Path):
+    write_csv(csv_dir, "legislators.csv", "id,name\n1,Rep A\n2,Rep B\n2,Rep C\n")
+    write_csv(csv_dir, "bills.csv", "id,title,sponsor_id\n10,Bill A,1\n11,Bill B,9\n")
+    write_csv(csv_dir, "votes.csv", "id,bill_id\n100,10\n101,99\n")
+    write_csv(
+        csv_dir,
+        "vote_results.csv",
+        "id,legislator_id,vote_id,vote_type\n"
+        "1000,1,100,1\n"
+        "1001,1,100,2\n"
+        "1002,7,100,3\n"
+        "1003,2,555,1\n",
+    )
+    report = tmp_path / "report.json"
+
+    out = StringIO()
+    with pytest.raises(CommandError, match="7 problem"):
+        call_command(
+            "load_data",
+            csv_dir=str(csv_dir),
+            validate_only=True,
+            report=str(report),
+            stdout=out,
+        )
+
+    problems = {
+        (p["file"], p["message"]): p for p in json.loads(report.read_text())["problems"]
+    }
+    assert set(problems) == {
+        ("legislators.csv", "duplicate id"),
+        ("bills.csv", "sponsor_id not found in legislators.csv"),
+        ("votes.csv", "bill_id not found in bills.csv"),
+        ("vote_results.csv", "legislator_id not found in legislators.csv"),
+        ("vote_results.csv", "vote_id not found in votes.csv"),
+        ("vote_results.csv", "invalid vote_type (expected 1 or 2)"),
+        ("vote_results.csv", "duplicate (legislator_id, vote_id) pair"),
+    }
+    pair = problems[("vote_results.csv", "duplicate (legislator_id, vote_id) pair")]
+    assert pair["count"] == 2
+    assert pair["samples"][0] == {
+        "line": 2,
+        "id": 1000,
+        "legislator_id": 1,
+        "vote_id": 100,
+        "vote_type": 1,
+    }
+    assert "line 4: id=1002, legislator_id=7" in out.getvalue()
+    assert not Legislator.objects.exists()
+
+
+def test_validate_only_missing_columns_and_files(csv_dir: Path):
+    write_csv(csv_dir, "legislators.csv", "id\n1\n")
+    write_csv(csv_dir, "bills.csv", "id,title,sponsor_id\n10,Bill A,1\n")
+    write_csv(csv_dir, "votes.csv", "id,bill_id\n100,10\n")
+
+    out = StringIO()
+    with pytest.raises(CommandError):
+        call_command("load_data", csv_dir=str(csv_dir), validate_only=True, stdout=out)
+    assert "legislators.csv: missing required columns: name" in out.getvalue()
+    assert "vote_results.csv: file not found" in out.getvalue()
+
+
+def test_validate_only_valid_files():
+    out = StringIO()
+    call_command(
+        "load_data",
+        csv_dir=str(Path(__file__).parent / "fixtures"),
+        validate_only=True,
+        stdout=out,
+    )
+    assert "are valid" in out.getvalue()
+    assert not DatasetManifest.objects.exists()
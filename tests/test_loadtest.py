@@ -0,0 +1,89 @@
+"""
+Tests for the loadtest management command.
+"""
+
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from legislative.management.commands.loadtest import load_mix
+
+
+@pytest.fixture
+def request_log(tmp_path, real_csv_data):
+    path = tmp_path / "requests.jsonl"
+    lines = [
+        {"method": "GET", "path": "/api/bills/", "status": 200, "total_ms": 3.1},
+        {
+            "method": "GET",
+            "path": "/api/legislators/",
+            "query": "ordering=-supported_bills_count&limit=5",
+        },
+        {"path": f"/api/legislators/{real_csv_data['john_yarmuth_id']}/", "weight": 3},
+        {"method": "POST", "path": "/api/bills/"},
+        {"method": "GET", "path": "/not-a-route/"},
+        {"method": "GET", "path": "/api/bills/999999/"},
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\nnot json\n")
+    return path
+
+
+def test_load_mix_weights_and_skips(request_log, real_csv_data):
+    mix, skipped = load_mix(request_log)
+    assert skipped == 3
+    assert {route for _, _, _, route in mix} == {
+        "bill-list",
+        "bill-detail",
+        "legislator-list",
+        "legislator-detail",
+    }
+    detail = next(key for key in mix if key[3] == "legislator-detail")
+    assert mix[detail] == 3
+
+
+def test_inprocess_report(request_log):
+    out = StringIO()
+    call_command("loadtest", str(request_log), requests=40, concurrency=4, stdout=out)
+    output = out.getvalue()
+    assert (
+        "Replaying 40 requests over 4 distinct requests (3 log lines skipped)" in output
+    )
+    assert "req/s" in output
+    assert "p99" in output
+    # Only the recorded 404 counts as an error.
+    bill_detail = next(
+        line for line in output.splitlines() if line.startswith("bill-detail")
+    )
+    requests, errors = bill_detail.split()[1], bill_detail.split()[5]
+    assert requests == errors
+    assert "DB queries/request: n/a" not in output
+
+
+def test_log_performance_lines_replay(api_client, real_csv_data, tmp_path, caplog):
+    """The performance log written by ServerTimingMiddleware is a valid input."""
+    logger = logging.getLogger("legislative.performance")
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.INFO, logger="legislative.performance"):
+            api_client.get("/api/bills/?ordering=-supporters_count")
+    finally:
+        logger.removeHandler(caplog.handler)
+    log = tmp_path / "performance.log"
+    log.write_text(caplog.records[-1].getMessage() + "\n")
+
+    mix, skipped = load_mix(log)
+    assert skipped == 0
+    assert list(mix) == [
+        ("GET", "/api/bills/", "ordering=-supporters_count", "bill-list")
+    ]
+
+
+def test_no_replayable_requests(tmp_path):
+    log = tmp_path / "empty.jsonl"
+    log.write_text('{"method": "DELETE", "path": "/api/bills/"}\n')
+    with pytest.raises(CommandError, match="no replayable requests"):
+        call_command("loadtest", str(log), stdout=StringIO())
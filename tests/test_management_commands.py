@@ -2,9 +2,22 @@
 Tests for management commands using real CSV data.
 """
 
+import gzip
+import os
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+import zstandard
 from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from legislative.models import Bill, DatasetManifest, Legislator, Vote, VoteResult
+from legislative.query_plans import HotQuery, audit, plan_findings
 
-from legislative.models import Bill, Legislator, Vote, VoteResult
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FIXTURE_VOTE_RESULTS = 8  # tests/fixtures/vote_results.csv
 
 
 class TestLoadDataCommand:
@@ -65,3 +78,134 @@ class TestLoadDataCommand:
         assert first_bills == second_bills == 2
         assert first_votes == second_votes == 2
         assert first_vote_results == second_vote_results == 38
+
+
+class TestUnchangedInputs:
+    """Test load_data skips CSV files that did not change since the last load."""
+
+    @pytest.fixture
+    def csv_dir(self, tmp_path):
+        for path in FIXTURES_DIR.glob("*.csv"):
+            shutil.copy(path, tmp_path / path.name)
+        call_command("load_data", csv_dir=str(tmp_path), stdout=StringIO())
+        return tmp_path
+
+    def _load(self, csv_dir, **options):
+        out = StringIO()
+        call_command("load_data", csv_dir=str(csv_dir), stdout=out, **options)
+        return out.getvalue()
+
+    def test_unchanged_run_is_a_no_op(self, csv_dir):
+        version = DatasetManifest.current_version()
+        assert "nothing to do" in self._load(csv_dir)
+        assert DatasetManifest.current_version() == version
+
+    def test_touched_identical_file_is_unchanged(self, csv_dir):
+        os.utime(csv_dir / "bills.csv", ns=(0, 0))
+        assert "nothing to do" in self._load(csv_dir)
+
+    def test_force_reloads(self, csv_dir):
+        version = DatasetManifest.current_version()
+        assert "Loaded:" in self._load(csv_dir, force=True)
+        assert DatasetManifest.current_version() == version + 1
+
+    def test_only_changed_files_and_their_dependents_reload(self, csv_dir):
+        lines = (csv_dir / "vote_results.csv").read_text().splitlines(keepends=True)
+        (csv_dir / "vote_results.csv").write_text("".join(lines[:-1]))
+        legislator = Legislator.objects.get(pk=412211)
+        legislator.name = "Kept by the partial load"
+        legislator.save()
+
+        out = self._load(csv_dir)
+
+        assert "kept: legislators.csv, bills.csv, votes.csv" in out
+        assert Legislator.objects.get(pk=412211).name == "Kept by the partial load"
+        assert VoteResult.objects.count() == len(lines) - 2
+        manifest = DatasetManifest.objects.get(pk=1)
+        assert manifest.vote_results == len(lines) - 2
+        assert manifest.source_stats["vote_results.csv"]["size"] == (
+            (csv_dir / "vote_results.csv").stat().st_size
+        )
+
+
+class TestCompressedInputs:
+    """Test load_data reads .csv.gz / .csv.zst variants of the input files."""
+
+    def _compressed_dir(self, tmp_path, suffix, compress):
+        for path in FIXTURES_DIR.glob("*.csv"):
+            shutil.copy(path, tmp_path / path.name)
+        source = tmp_path / "vote_results.csv"
+        (tmp_path / f"vote_results.csv{suffix}").write_bytes(
+            compress(source.read_bytes())
+        )
+        source.unlink()
+        return tmp_path
+
+    def test_gzip(self, tmp_path):
+        csv_dir = self._compressed_dir(tmp_path, ".gz", gzip.compress)
+        call_command("load_data", csv_dir=str(csv_dir), stdout=StringIO())
+        assert VoteResult.objects.count() == FIXTURE_VOTE_RESULTS
+        stats = DatasetManifest.objects.get(pk=1).source_stats
+        assert stats["vote_results.csv"]["name"] == "vote_results.csv.gz"
+
+    def test_zstd(self, tmp_path):
+        csv_dir = self._compressed_dir(
+            tmp_path, ".zst", zstandard.ZstdCompressor().compress
+        )
+        call_command("load_data", csv_dir=str(csv_dir), stdout=StringIO())
+        assert VoteResult.objects.count() == FIXTURE_VOTE_RESULTS
+
+    def test_missing_file(self, tmp_path):
+        csv_dir = self._compressed_dir(tmp_path, ".gz", gzip.compress)
+        (csv_dir / "vote_results.csv.gz").unlink()
+        with pytest.raises(CommandError, match="vote_results.csv"):
+            call_command("load_data", csv_dir=str(csv_dir))
+
+
+class TestExplainHotQueriesCommand:
+    """Test the query plan audit against the loaded dataset."""
+
+    def test_all_hot_queries_pass(self, real_csv_data):
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        output = out.getvalue()
+        assert "FAIL" not in output
+        assert "BillDetailSerializer.get_vote_results" in output
+        assert "passed, 0 failed" in output
+
+    def test_unindexed_filter_fails(self, real_csv_data):
+        """A filter on an unindexed column is reported as a full scan."""
+        (plan,) = audit(
+            [
+                HotQuery(
+                    "by primary_sponsor name",
+                    Bill.objects.filter(
+                        primary_sponsor__name__startswith="Rep."
+                    ).order_by("id"),
+                )
+            ]
+        )
+        assert not plan.passed
+        assert "full scan of legislative_bill" in plan.problems
+
+    def test_failures_exit_with_error(self, monkeypatch):
+        monkeypatch.setattr(
+            "legislative.query_plans.hot_queries",
+            lambda: [HotQuery("sorted", Vote.objects.order_by("-bill_id", "id"))],
+        )
+        with pytest.raises(CommandError, match="0 passed, 1 failed"):
+            call_command("explain_hot_queries", stdout=StringIO())
+
+    def test_plan_findings(self):
+        assert plan_findings("SCAN legislative_bill") == [
+            "full scan of legislative_bill"
+        ]
+        assert (
+            plan_findings("SCAN legislative_bill USING INDEX idx", limited=True) == []
+        )
+        assert plan_findings("USE TEMP B-TREE FOR ORDER BY") == [
+            "temp B-tree for ORDER BY"
+        ]
+        assert plan_findings(
+            "SEARCH legislative_vote USING AUTOMATIC COVERING INDEX (bill_id=?)"
+        ) == ["automatic index on legislative_vote"]
@@ -0,0 +1,158 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from legislative import metrics
+
+
+def scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    return response.content.decode()
+
+
+def sample(text, name, **labels):
+    """Value of the series ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.fullmatch(r"(\w+)(?:\{(.*)\})? (\S+)", line)
+        if not match or match[1] != name:
+            continue
+        series = dict(re.findall(r'(\w+)="([^"]*)"', match[2] or ""))
+        if labels.items() <= series.items():
+            return float(match[3])
+    return None
+
+
+def test_request_counters_and_histograms(api_client, real_csv_data):
+    api_client.get("/api/bills/")
+    api_client.get("/api/bills/")
+    api_client.get("/api/bills/999999/")
+
+    text = scrape(api_client)
+    assert sample(text, "http_requests_total", route="bill-list", status="200") == 2
+    assert sample(text, "http_requests_total", route="bill-detail", status="404") == 1
+    assert sample(text, "http_request_duration_seconds_count", route="bill-list") == 2
+    assert (
+        sample(
+            text, "http_request_duration_seconds_bucket", route="bill-list", le="+Inf"
+        )
+        == 2
+    )
+    assert sample(text, "http_request_db_queries_sum", route="bill-list") >= 2
+    assert "# TYPE http_request_duration_seconds histogram" in text
+
+
+@pytest.mark.urls("core.asgi_urls")
+def test_async_urlconf_serves_metrics(api_client, real_csv_data):
+    api_client.get("/api/stats/")
+    assert sample(scrape(api_client), "http_requests_total", route="stats_api") == 1
+
+
+def test_precompressed_cache_hits_and_misses(api_client, real_csv_data):
+    api_client.get("/api/legislators/")
+    api_client.get("/api/legislators/")
+
+    text = scrape(api_client)
+    assert (
+        sample(text, "cache_requests_total", cache="precompressed", result="miss") == 1
+    )
+    assert (
+        sample(text, "cache_requests_total", cache="precompressed", result="hit") == 1
+    )
+
+
+def test_load_data_metrics(api_client, real_csv_data, tmp_path):
+    with pytest.raises(CommandError):
+        call_command("load_data", csv_dir=str(tmp_path / "missing"))
+
+    text = scrape(api_client)
+    assert sample(text, "load_data_runs_total", status="success") == 1
+    assert sample(text, "load_data_runs_total", status="error") == 1
+    assert sample(text, "load_data_rows", table="legislators") == (
+        real_csv_data["expected_legislators"]
+    )
+    assert sample(text, "load_data_duration_seconds_count") == 2
+    assert sample(text, "load_data_last_success_timestamp_seconds") > 0
+
+
+def test_merges_other_process_snapshots(api_client, settings):
+    """Counters from other workers' snapshot files are summed in."""
+    api_client.get("/api/stats/")
+    other = {
+        "counters": [
+            [
+                "http_requests_total",
+                {"route": "stats_api", "method": "GET", "status": "200"},
+                4,
+            ]
+        ],
+        "gauges": [],
+        "histograms": [],
+    }
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "1.json").write_text(json.dumps(other))
+
+    assert sample(scrape(api_client), "http_requests_total", route="stats_api") == 5
+
+
+def test_exited_process_files_are_retired(api_client, settings):
+    """A dead worker's counters survive the removal of its file."""
+    other = {
+        "counters": [
+            [
+                "http_requests_total",
+                {"route": "stats_api", "method": "GET", "status": "200"},
+                4,
+            ]
+        ],
+        "gauges": [],
+        "histograms": [],
+    }
+    directory = Path(settings.METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    exited = directory / "999999999-1.json"  # above any Linux pid_max
+    exited.write_text(json.dumps(other))
+
+    api_client.get("/api/stats/")
+    first = sample(scrape(api_client), "http_requests_total", route="stats_api")
+    assert first == 5
+    assert not exited.exists()
+    assert (directory / "retired.json").exists()
+    assert sample(scrape(api_client), "http_requests_total", route="stats_api") == 5
+
+
+def _own_file_count(settings, name):
+    path = Path(settings.METRICS_DIR) / metrics.store.file_name
+    counters = json.loads(path.read_text())["counters"]
+    return sum(value for metric, _, value in counters if metric == name)
+
+
+def test_stale_snapshot_is_flushed_without_another_update(settings):
+    settings.METRICS_FLUSH_INTERVAL = 0.05
+    metrics.inc("replica_syncs_total", {"status": "success"})
+    metrics.inc("replica_syncs_total", {"status": "success"})  # within interval
+    assert _own_file_count(settings, "replica_syncs_total") == 1
+
+    deadline = time.monotonic() + 5
+    while _own_file_count(settings, "replica_syncs_total") != 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_exit_hook_writes_pending_updates(settings):
+    settings.METRICS_FLUSH_INTERVAL = 3600
+    metrics.inc("replica_syncs_total", {"status": "success"})
+    metrics.inc("replica_syncs_total", {"status": "success"})
+    metrics._flush_at_exit()
+    assert _own_file_count(settings, "replica_syncs_total") == 2
@@ -0,0 +1,70 @@
+"""
+Tests for the data migrations, run on a database that already holds data.
+"""
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=["default", "readonly"])
+
+
+def _migrate(target):
+    """Migrate the test database to ``target``; returns its historical apps."""
+    executor = MigrationExecutor(connection)
+    executor.migrate([("legislative", target)])
+    return executor.loader.project_state([("legislative", target)]).apps
+
+
+@pytest.fixture
+def migrate():
+    yield _migrate
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+def _add_votes(apps):
+    """Two legislators, one bill, one vote: a Yea and a Nay."""
+    Legislator = apps.get_model("legislative", "Legislator")
+    Bill = apps.get_model("legislative", "Bill")
+    Vote = apps.get_model("legislative", "Vote")
+    VoteResult = apps.get_model("legislative", "VoteResult")
+    yea = Legislator.objects.create(id=1, name="Rep. Yea (D-NY-1)")
+    nay = Legislator.objects.create(id=2, name="Rep. Nay (R-TX-2)")
+    bill = Bill.objects.create(id=10, title="H.R. 1", primary_sponsor=yea)
+    vote = Vote.objects.create(id=100, bill=bill)
+    VoteResult.objects.create(id=1, legislator=yea, vote=vote, vote_type="1")
+    VoteResult.objects.create(id=2, legislator=nay, vote=vote, vote_type="2")
+
+
+def test_vote_totals_are_computed_for_existing_rows(migrate):
+    _add_votes(migrate("0003_search_index"))
+
+    apps = migrate("0004_vote_totals")
+    Legislator = apps.get_model("legislative", "Legislator")
+    Bill = apps.get_model("legislative", "Bill")
+    totals = Legislator.objects.order_by("id").values_list(
+        "supported_bills_total", "opposed_bills_total"
+    )
+    assert list(totals) == [(1, 0), (0, 1)]
+    assert Bill.objects.values_list("supporters_total", "opposers_total").get() == (
+        1,
+        1,
+    )
+
+
+def test_manifest_counts_existing_data_without_manifest(migrate):
+    apps = migrate("0008_leaderboards")
+    _add_votes(apps)
+    assert not apps.get_model("legislative", "DatasetManifest").objects.exists()
+
+    apps = migrate("0009_manifest_counts")
+    manifest = apps.get_model("legislative", "DatasetManifest").objects.get()
+    assert manifest.version == 1
+    assert (manifest.legislators, manifest.bills, manifest.votes) == (2, 1, 1)
+    assert manifest.vote_results == 2
+
+
+def test_manifest_not_created_for_empty_database(migrate):
+    apps = migrate("0009_manifest_counts")
+    assert not apps.get_model("legislative", "DatasetManifest").objects.exists()
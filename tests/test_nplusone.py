@@ -0,0 +1,57 @@
+"""
+Tests for the N+1 query detector.
+"""
+
+import pytest
+
+from legislative.models import Legislator
+from legislative.nplusone import NPlusOneError, detect_n_plus_one, query_shape
+from legislative.serializers import LegislatorStatsSerializer
+
+
+def test_query_shape_collapses_in_lists():
+    assert query_shape("SELECT * FROM t WHERE id IN (%s, %s)") == query_shape(
+        "SELECT *\n  FROM t WHERE id IN (%s, %s, %s)"
+    )
+
+
+def test_serializer_fallback_raises_with_location(real_csv_data):
+    """Without annotations the count fields query once per legislator."""
+    legislators = Legislator.objects.all()
+
+    with pytest.raises(NPlusOneError) as exc:
+        with detect_n_plus_one(mode="raise", threshold=2):
+            LegislatorStatsSerializer(legislators, many=True).data
+
+    assert str(exc.value).index("legislative/models.py") < str(exc.value).index(
+        "legislative/serializers.py"
+    )
+
+
+def test_log_mode_collects_reports(real_csv_data):
+    with detect_n_plus_one(mode="log", threshold=2) as tracker:
+        for legislator in Legislator.objects.all():
+            legislator.opposed_bills_count
+
+    assert len(tracker.reports) == 1
+    location = tracker.reports[0]["location"]
+    assert location.startswith("legislative/models.py")
+    assert "tests/test_nplusone.py" in location
+
+
+def test_endpoints_clean_at_threshold_two(api_client, real_csv_data, settings):
+    """No endpoint repeats a query shape even once (strict mode is autouse)."""
+    settings.NPLUSONE_THRESHOLD = 2
+    for url in [
+        "/",
+        "/legislators/",
+        "/bills/",
+        f"/legislators/{real_csv_data['john_yarmuth_id']}/",
+        f"/bills/{real_csv_data['build_back_better_id']}/",
+        "/api/stats/",
+        "/api/legislators/",
+        "/api/bills/",
+        f"/api/legislators/{real_csv_data['john_yarmuth_id']}/",
+        f"/api/bills/{real_csv_data['build_back_better_id']}/",
+    ]:
+        assert api_client.get(url).status_code == 200
@@ -0,0 +1,134 @@
+"""
+Tests for pre-compressed response storage and Accept-Encoding negotiation.
+"""
+
+import gzip
+import json
+import shutil
+from pathlib import Path
+
+import brotli
+import pytest
+import zstandard
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.test import AsyncClient, RequestFactory
+
+from legislative.middleware import PrecompressedResponseMiddleware
+from legislative.precompressed import cache_key, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, deflate", "identity"),
+        ("*", "br"),
+        ("br;q=1.0, gzip;q=0.5", "br"),
+        ("", "identity"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ["br", "gzip"]) == expected
+
+
+class TestPrecompressedResponses:
+    """Bill and legislator JSON is compressed once per dataset version."""
+
+    def test_gzip_body_matches_identity(self, api_client, real_csv_data):
+        identity = api_client.get("/api/bills/")
+        compressed = api_client.get("/api/bills/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert compressed["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed["Vary"]
+        assert json.loads(gzip.decompress(compressed.content)) == identity.json()
+
+    @pytest.mark.parametrize(
+        "coding, decompress",
+        [
+            ("br", brotli.decompress),
+            ("zstd", zstandard.ZstdDecompressor().decompress),
+        ],
+    )
+    def test_brotli_and_zstd(self, api_client, real_csv_data, coding, decompress):
+        identity = api_client.get("/api/legislators/")
+        compressed = api_client.get(
+            "/api/legislators/", HTTP_ACCEPT_ENCODING=f"{coding}, gzip"
+        )
+
+        assert compressed["Content-Encoding"] == coding
+        assert json.loads(decompress(compressed.content)) == identity.json()
+
+    def test_hit_skips_view(self, api_client, real_csv_data, django_assert_num_queries):
+        url = f"/api/legislators/{real_csv_data['john_yarmuth_id']}/"
+        first = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        # Only the dataset version lookup remains on a hit.
+        with django_assert_num_queries(1):
+            second = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        assert second.content == first.content
+
+    def test_reload_invalidates(self, api_client, real_csv_data, tmp_path):
+        api_client.get("/api/bills/")
+        fixtures = Path(__file__).parent / "fixtures"
+        for name in ["legislators.csv", "votes.csv", "vote_results.csv"]:
+            shutil.copy(fixtures / name, tmp_path / name)
+        bills = (fixtures / "bills.csv").read_text()
+        (tmp_path / "bills.csv").write_text(
+            bills.replace("Build Back Better Act", "Renamed Act")
+        )
+        call_command("load_data", csv_dir=str(tmp_path))
+
+        titles = {b["title"] for b in api_client.get("/api/bills/").json()}
+        assert "H.R. 5376: Renamed Act" in titles
+
+    def test_query_order_shares_an_entry(
+        self, api_client, real_csv_data, django_assert_num_queries
+    ):
+        api_client.get("/api/bills/", {"ordering": "title", "limit": 1})
+        with django_assert_num_queries(1):
+            response = api_client.get("/api/bills/?limit=1&ordering=title")
+        assert len(response.json()) == 1
+
+    def test_unknown_query_params_bypass_the_cache(self, api_client, real_csv_data):
+        request = RequestFactory().get("/api/bills/", {"ordering": "title"})
+        assert cache_key(request, 1) is not None
+        request = RequestFactory().get("/api/bills/", {"supporters_count__gte": 1})
+        assert cache_key(request, 1) is not None
+        request = RequestFactory().get("/api/bills/", {"nonce": "1"})
+        assert cache_key(request, 1) is None
+
+        response = api_client.get(
+            "/api/bills/", {"nonce": "1"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response
+
+    def test_errors_not_stored(self, api_client, django_assert_num_queries):
+        api_client.get("/api/bills/999999/")
+        # Dataset version, stored document and bill lookups: nothing cached.
+        with django_assert_num_queries(3):
+            response = api_client.get("/api/bills/999999/")
+        assert response.status_code == 404
+
+
+class TestPrecompressedAsync:
+    """Under ASGI the middleware runs on the event loop, not in a thread."""
+
+    def test_middleware_is_async_native(self):
+        async def get_response(request):
+            return None
+
+        middleware = PrecompressedResponseMiddleware(get_response)
+        assert iscoroutinefunction(middleware)
+        assert iscoroutinefunction(middleware.process_view)
+
+    @pytest.mark.urls("core.asgi_urls")
+    def test_hit_matches_miss(self, real_csv_data, django_assert_num_queries):
+        get = async_to_sync(AsyncClient().get)
+        first = get("/api/bills/", headers={"Accept-Encoding": "gzip"})
+        with django_assert_num_queries(1):
+            second = get("/api/bills/", headers={"Accept-Encoding": "gzip"})
+
+        assert first["Content-Encoding"] == "gzip"
+        assert second.content == first.content
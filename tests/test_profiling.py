@@ -0,0 +1,128 @@
+"""
+Tests for on-demand and sampled request profiling.
+"""
+
+import io
+import pstats
+import re
+from pathlib import Path
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from legislative import profiling
+
+
+@pytest.fixture
+def staff_client(django_client, django_user_model):
+    user = django_user_model.objects.create_user(
+        "staff", password="secret", is_staff=True
+    )
+    django_client.force_login(user)
+    return django_client
+
+
+def test_anonymous_request_is_not_profiled(api_client, real_csv_data):
+    response = api_client.get("/api/bills/?__profile=1")
+    assert response.status_code == 200
+    assert "X-Profile" not in response
+    assert profiling.list_profiles() == []
+
+
+def test_staff_cprofile_capture(staff_client, real_csv_data):
+    response = staff_client.get(
+        "/api/bills/?__profile=1", HTTP_ACCEPT="application/json"
+    )
+    assert response.status_code == 200
+
+    (capture,) = profiling.list_profiles()
+    assert response["X-Profile"] == f"/profiles/{capture['id']}/"
+    assert capture["path"] == "/api/bills/?__profile=1"
+    assert capture["trigger"] == "on-demand"
+
+    download = staff_client.get(response["X-Profile"])
+    assert download["Content-Disposition"].startswith("attachment")
+    path = Path(profiling.profiles_dir()) / capture["file"]
+    assert b"".join(download.streaming_content) == path.read_bytes()
+    stats = pstats.Stats(str(path), stream=io.StringIO())
+    assert any(func[2] == "list" for func in stats.stats)
+
+    summary = staff_client.get(response["X-Profile"] + "?view=text")
+    assert "cumulative" in summary.content.decode()
+
+
+def test_profiled_request_bypasses_precompressed_cache(staff_client, real_csv_data):
+    staff_client.get("/api/bills/?__profile=1")
+    staff_client.get("/api/bills/?__profile=1")
+    assert all(
+        p["status"] == 200 and p["duration_ms"] > 0 for p in profiling.list_profiles()
+    )
+    assert len(profiling.list_profiles()) == 2
+
+
+def test_token_stacks_capture(django_client, real_csv_data, settings):
+    settings.PROFILING_TOKEN = "s3cret"
+    response = django_client.get(
+        "/bills/?__profile=stacks", HTTP_X_PROFILE_TOKEN="s3cret"
+    )
+    assert response.status_code == 200
+
+    (capture,) = profiling.list_profiles()
+    assert capture["file"].endswith(".folded")
+    folded = (Path(profiling.profiles_dir()) / capture["file"]).read_text()
+    for line in folded.splitlines():
+        assert re.fullmatch(r"\S.* \d+", line)
+
+
+def test_sampling_profiles_every_nth_request(api_client, real_csv_data, settings):
+    settings.PROFILING_SAMPLE_RATE = 2
+    for _ in range(4):
+        response = api_client.get("/api/bills/")
+        assert "X-Profile" not in response
+    profiles = profiling.list_profiles()
+    assert len(profiles) == 2
+    assert {p["trigger"] for p in profiles} == {"sampled"}
+
+
+def test_sampling_skips_other_routes(api_client, settings):
+    settings.PROFILING_SAMPLE_RATE = 1
+    for path in ["/metrics", "/profiles/", "/api/stats/", "/static/missing.css"]:
+        api_client.get(path)
+    assert profiling.list_profiles() == []
+
+
+def test_keeps_newest_profiles(staff_client, real_csv_data, settings):
+    settings.PROFILING_MAX_PROFILES = 2
+    for _ in range(3):
+        staff_client.get("/api/stats/?__profile=1")
+    assert len(profiling.list_profiles()) == 2
+    assert len(list(Path(profiling.profiles_dir()).iterdir())) == 4
+
+
+def test_listing_requires_staff(staff_client):
+    assert staff_client.get("/profiles/").status_code == 200
+    staff_client.logout()
+    assert staff_client.get("/profiles/").status_code == 403
+    assert staff_client.get("/profiles/20260101-000000-00000000/").status_code == 403
+
+
+def test_asgi_requests_are_not_profiled(settings):
+    """The profilers would only see the event loop thread under ASGI."""
+    settings.PROFILING_TOKEN = "s3cret"
+    settings.PROFILING_SAMPLE_RATE = 1
+    get = async_to_sync(AsyncClient().get)
+    response = get("/metrics?__profile=1", headers={"X-Profile-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "X-Profile" not in response
+    assert "ASGI" in response["X-Profile-Error"]
+    assert "X-Profile-Error" not in get("/metrics?__profile=1")
+    assert profiling.list_profiles() == []
+
+
+@pytest.mark.urls("core.asgi_urls")
+def test_listing_under_asgi_urls(staff_client, real_csv_data):
+    staff_client.get("/api/stats/?__profile=1")
+    response = staff_client.get("/profiles/")
+    assert response.status_code == 200
+    assert "GET /api/stats/?__profile=1" in response.content.decode()
@@ -0,0 +1,61 @@
+"""
+Tests for the full-text search endpoint.
+"""
+
+from django.db import router
+from rest_framework import status
+
+from legislative.search import build_match_expression, search
+
+
+class TestSearchAPI:
+    """Test /api/search/ over the FTS5 index filled by load_data."""
+
+    def test_prefix_match_ranks_bill(self, api_client, real_csv_data):
+        response = api_client.get("/api/search/", {"q": "build bac"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["count"] >= 1
+        assert data["results"][0]["type"] == "bill"
+        assert data["results"][0]["id"] == real_csv_data["build_back_better_id"]
+
+    def test_legislator_name(self, api_client, real_csv_data):
+        data = api_client.get("/api/search/", {"q": "yarm", "type": "legislator"})
+        results = data.json()["results"]
+
+        assert [r["id"] for r in results] == [real_csv_data["john_yarmuth_id"]]
+        assert results[0]["text"] == "Rep. John Yarmuth (D-KY-3)"
+
+    def test_pagination(self, api_client, real_csv_data):
+        data = api_client.get("/api/search/", {"q": "rep", "limit": 1}).json()
+
+        assert data["count"] == real_csv_data["expected_legislators"]
+        assert len(data["results"]) == 1
+        assert "offset=1" in data["next"]
+        assert data["previous"] is None
+
+    def test_operators_are_quoted(self, api_client, real_csv_data):
+        response = api_client.get("/api/search/", {"q": 'act" OR NEAR('})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_missing_query(self, api_client):
+        response = api_client.get("/api/search/", {"q": "  "})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_type(self, api_client):
+        response = api_client.get("/api/search/", {"q": "act", "type": "vote"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_search_reads_through_the_router(real_csv_data, monkeypatch):
+    routed = []
+    db_for_read = router.db_for_read
+    monkeypatch.setattr(
+        router,
+        "db_for_read",
+        lambda model, **hints: routed.append(model) or db_for_read(model, **hints),
+    )
+    count, _ = search(build_match_expression("build"))
+    assert count == 1
+    assert routed
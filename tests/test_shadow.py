@@ -0,0 +1,134 @@
+"""
+Tests for shadow-database reloads (``load_data --shadow`` / ``--rollback``).
+"""
+
+import sqlite3
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+
+from legislative import shadow
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def live_database(tmp_path, settings, monkeypatch):
+    """An empty, migrated database file standing in for db.sqlite3."""
+    path = tmp_path / "db.sqlite3"
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+        )
+        schema = [row[0] for row in cursor.fetchall()]
+    conn = sqlite3.connect(path)
+    for sql in schema:
+        try:
+            conn.execute(sql)
+        except sqlite3.OperationalError as e:
+            # FTS5 creates its own backing tables with the virtual table.
+            if "already exists" not in str(e):
+                raise
+    conn.commit()
+    conn.close()
+    settings.SQLITE_GENERATIONS_DIR = tmp_path / "generations"
+    monkeypatch.setattr(shadow, "live_path", lambda: path)
+    return path
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_shadow_load_swaps_in_validated_copy(live_database):
+    out = StringIO()
+    call_command("load_data", csv_dir=str(FIXTURES_DIR), shadow=True, stdout=out)
+
+    assert live_database.is_symlink()
+    assert "Swapped in" in out.getvalue()
+    assert _count(live_database, "legislative_legislator") > 0
+    assert _count(live_database, "legislative_dataset_manifest") == 1
+    assert shadow.previous_generation() is not None
+    assert _count(shadow.previous_generation(), "legislative_legislator") == 0
+    assert not hasattr(connections._connections, "shadow")
+
+
+def test_rollback_restores_previous_generation(live_database):
+    call_command("load_data", csv_dir=str(FIXTURES_DIR), shadow=True, stdout=StringIO())
+    loaded = shadow.current_generation()
+
+    out = StringIO()
+    call_command("load_data", rollback=True, stdout=out)
+
+    assert "Rolled back" in out.getvalue()
+    assert _count(live_database, "legislative_legislator") == 0
+    assert shadow.previous_generation() == loaded
+
+
+def test_rollback_issues_a_new_version(live_database):
+    call_command("load_data", csv_dir=str(FIXTURES_DIR), shadow=True, stdout=StringIO())
+    assert shadow._manifest_version(live_database) == 1
+
+    call_command("load_data", rollback=True, stdout=StringIO())
+    assert shadow._manifest_version(live_database) == 2
+    conn = sqlite3.connect(live_database)
+    try:
+        changes_from = conn.execute(
+            "SELECT changes_from FROM legislative_dataset_manifest"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert changes_from == 2
+
+    call_command("load_data", rollback=True, stdout=StringIO())
+    assert shadow._manifest_version(live_database) == 3
+    assert _count(live_database, "legislative_legislator") > 0
+
+
+def test_rollback_without_previous_generation_fails(live_database):
+    with pytest.raises(CommandError, match="no previous generation"):
+        call_command("load_data", rollback=True)
+
+
+def test_invalid_shadow_is_discarded(live_database, monkeypatch):
+    monkeypatch.setattr(
+        "legislative.management.commands.load_data.refresh_vote_totals",
+        lambda using: None,
+    )
+    with pytest.raises(CommandError, match="failed validation.*vote totals"):
+        call_command("load_data", csv_dir=str(FIXTURES_DIR), shadow=True)
+
+    live = shadow.current_generation()
+    assert list(shadow.generations_dir().glob("db-*.sqlite3")) == [live]
+    assert _count(live, "legislative_legislator") == 0
+
+
+def test_blocked_checkpoint_aborts_adoption(live_database, monkeypatch):
+    monkeypatch.setattr(shadow, "CHECKPOINT_TIMEOUT", 0.1)
+    writer = sqlite3.connect(live_database)
+    writer.execute("PRAGMA journal_mode=WAL")
+    writer.execute("CREATE TABLE t (x INTEGER)")
+    writer.commit()
+    reader = sqlite3.connect(live_database, isolation_level=None)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM t").fetchone()  # pins a WAL snapshot
+    writer.execute("INSERT INTO t VALUES (1)")
+    writer.commit()
+    try:
+        with pytest.raises(shadow.ShadowReloadError, match="checkpoint"):
+            shadow.adopt_live_database()
+        assert not live_database.is_symlink()
+    finally:
+        reader.close()
+        writer.close()
+    shadow.adopt_live_database()
+    assert live_database.is_symlink()
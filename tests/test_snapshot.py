@@ -0,0 +1,123 @@
+"""
+Tests for database-free serving from the memory-mapped snapshot.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import override_settings
+from rest_framework import status
+
+from legislative import precompressed, snapshot
+from legislative.models import DatasetManifest
+
+API_PATHS = [
+    ("/api/stats/", {}),
+    ("/api/legislators/", {}),
+    ("/api/legislators/", {"ordering": "-opposed_bills_count,name", "limit": 2}),
+    ("/api/legislators/", {"supported_bills_count__gte": 1}),
+    ("/api/bills/", {}),
+    ("/api/bills/", {"ordering": "title", "opposers_count__lt": 3}),
+]
+
+
+@pytest.fixture
+def snapshot_dir(settings, tmp_path, real_csv_data):
+    settings.SNAPSHOT_DIR = str(tmp_path / "snapshot")
+    call_command("export_snapshot", stdout=StringIO())
+    return tmp_path / "snapshot"
+
+
+def _detail_paths(data):
+    legislator = f"/api/legislators/{data['john_yarmuth_id']}/"
+    bill = f"/api/bills/{data['build_back_better_id']}/"
+    return [
+        (legislator, {}),
+        (bill, {}),
+        (bill, {"votes_limit": 2}),
+        (bill, {"votes_limit": 2, "votes_offset": 2}),
+    ]
+
+
+def _responses(api_client, paths):
+    return [api_client.get(path, params).content for path, params in paths]
+
+
+def test_export_writes_current_snapshot(snapshot_dir, real_csv_data):
+    current = snapshot.Snapshot(snapshot_dir / snapshot.CURRENT_LINK)
+    assert current.manifest["counts"]["vote_results"] == (
+        real_csv_data["expected_vote_results"]
+    )
+    assert len(current.arrays["legislator_vote_offsets"]) == (
+        real_csv_data["expected_legislators"] + 1
+    )
+
+
+def test_snapshot_answers_like_the_database(
+    api_client, settings, snapshot_dir, real_csv_data
+):
+    paths = API_PATHS + _detail_paths(real_csv_data)
+    from_database = _responses(api_client, paths)
+    cache.clear()  # Same dataset version: skip the pre-compressed copies.
+    settings.SNAPSHOT_SERVING = True
+    assert _responses(api_client, paths) == from_database
+
+
+def test_snapshot_serving_runs_no_queries(
+    api_client, settings, snapshot_dir, real_csv_data, django_assert_num_queries
+):
+    settings.SNAPSHOT_SERVING = True
+    with django_assert_num_queries(0):
+        for path, params in API_PATHS + _detail_paths(real_csv_data):
+            assert api_client.get(path, params).status_code == status.HTTP_200_OK
+
+
+def test_snapshot_errors(api_client, settings, snapshot_dir):
+    settings.SNAPSHOT_SERVING = True
+    assert api_client.get("/api/bills/999999/").status_code == 404
+    response = api_client.get("/api/bills/", {"ordering": "password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_precompressed_keys_follow_the_data_source(
+    api_client, settings, snapshot_dir, real_csv_data, monkeypatch
+):
+    settings.SNAPSHOT_SERVING = True
+    DatasetManifest.objects.update(version=F("version") + 1)  # snapshot is stale
+    versions = []
+    cache_key = precompressed.cache_key
+
+    def spy(request, version):
+        versions.append(version)
+        return cache_key(request, version)
+
+    monkeypatch.setattr(precompressed, "cache_key", spy)
+    api_client.get("/api/legislators/")
+    api_client.get(f"/api/bills/{real_csv_data['build_back_better_id']}/")
+    api_client.get("/api/votes/")
+    current = snapshot.current().version
+    assert versions == [current, current, current + 1]
+
+
+def test_new_export_is_picked_up(api_client, settings, snapshot_dir, real_csv_data):
+    settings.SNAPSHOT_SERVING = True
+    first = snapshot.current()
+    call_command("export_snapshot", stdout=StringIO())
+    assert snapshot.current().path != first.path
+    assert len([p for p in snapshot_dir.iterdir() if not p.is_symlink()]) == 2
+
+
+@pytest.mark.urls("core.asgi_urls")
+def test_async_views_serve_snapshot(api_client, settings, snapshot_dir, real_csv_data):
+    paths = API_PATHS + _detail_paths(real_csv_data)
+    with override_settings(ROOT_URLCONF="core.urls"):
+        expected = [
+            api_client.get(path, params, HTTP_ACCEPT="application/json").json()
+            for path, params in paths
+        ]
+    cache.clear()
+    settings.SNAPSHOT_SERVING = True
+    assert [api_client.get(path, params).json() for path, params in paths] == expected